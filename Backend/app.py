@@ -328,42 +328,30 @@ def upload_declarative():
     for i in range(len(atoms_df)):
         dev_cols.append(f"{atoms_df['type'][i]}_{atoms_df['op_0'][i]}_{atoms_df['op_1'][i]}")
 
-    collect_data = pd.DataFrame(data=0, index=range(len(event_log)), columns=dev_cols)
-    collect_data['case_id'] = None
-
-    for i, d in enumerate(dev_cols):
-        the_atom = None
-        for atom in atoms:
-            expected_ops = [atoms_df['op_0'][i]]
-            if atoms_df['op_1'][i]:
-                expected_ops.append(atoms_df['op_1'][i])
-            if atom.atom_type == atoms_df['type'][i] and atom.operands == expected_ops:
-                the_atom = atom
-                break
-
-        if the_atom is None:
-            continue
-
-        checker = RegexChecker(process_id, event_log)
-        activities = checker.log.unique_activities()
-        activity_map = checker._map_activities_to_letters(activities)
-        variant_frame = checker.create_variant_frame_from_log(activity_map)
-        variant_frame["sat"] = checker.compute_satisfaction(
-            the_atom, variant_frame, activity_map, consider_vacuity=False
-        )
-
-        if i == 0:
-            collect_data['case_id'] = list(
-                val for cases in variant_frame["case_ids"].values for val in cases
-            )
-
-        for j in range(len(variant_frame)):
-            for case_id in variant_frame["case_ids"][j]:
-                ids = collect_data.index[collect_data['case_id'] == case_id]
-                if variant_frame["sat"][j] == 1:
-                    collect_data.loc[ids, d] = 0
-                else:
-                    collect_data.loc[ids, d] = 1
+    atom_by_key = {}
+    for atom in atoms:
+        atom_by_key.setdefault((atom.atom_type, tuple(atom.operands)), atom)
+
+    checked_cols = []
+    checked_atoms = []
+    for i in range(len(dev_cols)):
+        expected_ops = [atoms_df['op_0'][i]]
+        if atoms_df['op_1'][i]:
+            expected_ops.append(atoms_df['op_1'][i])
+        the_atom = atom_by_key.get((atoms_df['type'][i], tuple(expected_ops)))
+        if the_atom is not None:
+            checked_cols.append(i)
+            checked_atoms.append(the_atom)
+
+    # Check all atoms once per variant and broadcast the violations to the cases
+    checker = RegexChecker(process_id, event_log)
+    case_ids, violations = checker.compute_violation_matrix(
+        checked_atoms, consider_vacuity=False
+    )
+    violation_data = np.zeros((len(case_ids), len(dev_cols)), dtype=int)
+    violation_data[:, checked_cols] = violations
+    collect_data = pd.DataFrame(data=violation_data, columns=dev_cols)
+    collect_data['case_id'] = case_ids
 
     # Compute trace duration per case
     if timestamp_col in log_df.columns:
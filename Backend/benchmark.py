@@ -0,0 +1,444 @@
+# benchmark.py
+"""
+Benchmarks of the conformance pipeline of the backend.
+
+Times every step from parsing the log to the causal effects for the event log / process
+model pairs in `uploads/` and for synthetic logs of increasing size, played out from a
+shipped model. The results are written as JSON and compared to a stored baseline:
+
+    python benchmark.py --output results.json
+    python benchmark.py --sizes 10000 --save-baseline
+    python benchmark.py --sizes 10000 --threshold 0.25
+
+The exit code is 1 if a step is slower than its baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pm4py
+from pm4py.objects.conversion.log import converter as log_converter
+from pm4py.objects.log.importer.xes import importer as xes_importer
+
+from process_mining.conformance_alignments import (
+    build_trace_deviation_matrix_df,
+    calculate_alignments,
+)
+from process_mining.process_atoms.generation.loggenerator import (
+    load_bpmn_net,
+    write_synthetic_log,
+)
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    binary_strings,
+    unary_strings,
+)
+from process_mining.process_atoms.mine.declare.regexchecker import RegexChecker
+from process_mining.process_atoms.models.column_types import (
+    CaseID,
+    Categorical,
+    Continuous,
+    EventTime,
+    EventType,
+)
+from process_mining.process_atoms.models.event_log import EventLog, EventLogSchemaTypes
+from process_mining.process_atoms.processatoms import ProcessAtoms
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_FOLDER = os.path.join(BACKEND_DIR, "uploads")
+BENCHMARK_DATA_FOLDER = os.path.join(BACKEND_DIR, "benchmark_data")
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmark_baseline.json")
+
+# event log / process model pairs shipped in uploads/
+UPLOAD_PAIRS = {
+    "bpic12_o": ("Model_O.bpmn", "BPIC12_Log_onlyO.csv"),
+    "loan_application": ("loan_application_simple.bpmn", "loan_application.xes"),
+}
+# the model the synthetic logs are played out from
+SYNTHETIC_MODEL = "Model_O.bpmn"
+SYNTHETIC_SIZES = [10000, 100000, 1000000]
+SYNTHETIC_NOISE_RATE = 0.1
+
+STAGES = [
+    "parse_log",
+    "calculate_alignments",
+    "build_trace_deviation_matrix_df",
+    "build_event_log",
+    "mine_atoms_from_log",
+    "compute_violation_matrix",
+    "configure_dimensions",
+    "compute_causal_effects",
+]
+# steps that are faster than this (in seconds) are not reported as regressions
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def parse_log(log_path):
+    # like the upload endpoints of app.py
+    if os.path.splitext(log_path)[1] == ".csv":
+        log_csv = pd.read_csv(log_path, encoding="utf-8-sig")
+        log_csv["time:timestamp"] = pd.to_datetime(log_csv["time:timestamp"], utc=True)
+        return log_converter.apply(log_csv)
+    return xes_importer.apply(log_path)
+
+
+def build_event_log(xes_log):
+    """
+    Converts a pm4py log to an `EventLog` with the case, activity and timestamp column of
+    XES and the other attributes as categorical or continuous columns.
+    """
+    log_df = pm4py.convert_to_dataframe(xes_log)
+    case_col, activity_col, timestamp_col = (
+        "case:concept:name",
+        "concept:name",
+        "time:timestamp",
+    )
+    case_attrs = {case_col: CaseID}
+    event_attrs = {case_col: CaseID, activity_col: EventType}
+    if timestamp_col in log_df.columns:
+        event_attrs[timestamp_col] = EventTime
+    for col in log_df.columns:
+        if col in event_attrs:
+            continue
+        column_type = (
+            Continuous if pd.api.types.is_numeric_dtype(log_df[col]) else Categorical
+        )
+        if col.startswith("case:"):
+            case_attrs[col] = column_type
+        else:
+            event_attrs[col] = column_type
+    schema = EventLogSchemaTypes(cases=case_attrs, events=event_attrs)
+    return EventLog(
+        log_df[list(case_attrs)].drop_duplicates(subset=case_col),
+        log_df[list(event_attrs)],
+        schema,
+    )
+
+
+def _dimension_configs(deviation_matrix):
+    # one dimension of every computation type of /api/configure-dimensions
+    first_activity = next(
+        (trace[0] for trace in deviation_matrix["activities"] if len(trace) > 0), ""
+    )
+    return [
+        {
+            "dimension": "duration_hours",
+            "computationType": "formula",
+            "config": {"expression": "trace_duration_seconds / 3600"},
+        },
+        {
+            "dimension": "long_trace",
+            "computationType": "rule",
+            "config": {
+                "column": "trace_duration_seconds",
+                "operator": "greater",
+                "value": float(deviation_matrix["trace_duration_seconds"].median()),
+            },
+        },
+        {
+            "dimension": "contains_first_activity",
+            "computationType": "rule",
+            "config": {
+                "column": "activities",
+                "operator": "contains",
+                "value": first_activity,
+            },
+        },
+        {
+            "dimension": "duration",
+            "computationType": "existing",
+            "config": {"column": "trace_duration_seconds"},
+        },
+    ]
+
+
+def _post(client, url, payload):
+    response = client.post(url, json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} failed: {response.get_json()}")
+    return response.get_json()
+
+
+class _Pipeline:
+    """
+    Runs the steps of the pipeline in order, every step works on the results of the
+    previous ones.
+    """
+
+    def __init__(
+        self, backend, model_path, log_path, considered_templates, max_deviations
+    ):
+        # the app module, whose endpoints are called with its test client
+        self.backend = backend
+        self.model_path = model_path
+        self.log_path = log_path
+        self.considered_templates = considered_templates
+        self.max_deviations = max_deviations
+
+    def parse_log(self):
+        self.xes_log = parse_log(self.log_path)
+
+    def calculate_alignments(self):
+        self.alignments = calculate_alignments(self.model_path, self.xes_log)
+
+    def build_trace_deviation_matrix_df(self):
+        self.deviation_matrix, self.deviation_labels = build_trace_deviation_matrix_df(
+            self.xes_log, self.alignments
+        )
+
+    def build_event_log(self):
+        self.event_log = build_event_log(self.xes_log)
+
+    def mine_atoms_from_log(self):
+        self.atoms = ProcessAtoms().mine_atoms_from_log(
+            "benchmark",
+            self.event_log,
+            self.considered_templates,
+            min_support=0.1,
+            local=True,
+            consider_vacuity=False,
+        )
+
+    def compute_violation_matrix(self):
+        RegexChecker("benchmark", self.event_log).compute_violation_matrix(
+            self.atoms, consider_vacuity=False
+        )
+
+    def configure_dimensions(self):
+        self.backend.reset_cache()
+        self.backend.last_uploaded_data.update(
+            bpmn_path=self.model_path,
+            xes_path=self.log_path,
+            xes_log=self.xes_log,
+            alignments=self.alignments,
+            deviation_matrix=self.deviation_matrix,
+            deviation_labels=self.deviation_labels,
+        )
+        self.client = self.backend.app.test_client()
+        self.dimensions = _dimension_configs(self.deviation_matrix)
+        _post(
+            self.client,
+            "/api/configure-dimensions",
+            {"dimensions": self.dimensions},
+        )
+
+    def compute_causal_effects(self):
+        deviations = [
+            col for col in self.deviation_matrix.columns if col.startswith("(")
+        ]
+        _post(
+            self.client,
+            "/api/compute-causal-effects",
+            {
+                "deviations": deviations[: self.max_deviations],
+                "dimensions": [dim["dimension"] for dim in self.dimensions[:2]],
+            },
+        )
+
+
+def synthetic_log(num_traces):
+    """
+    Returns the path of a synthetic log with `num_traces` traces of `SYNTHETIC_MODEL`,
+    which is generated on first use.
+    """
+    model_name = os.path.splitext(SYNTHETIC_MODEL)[0]
+    path = os.path.join(BENCHMARK_DATA_FOLDER, f"{model_name}_{num_traces}.csv")
+    if not os.path.exists(path):
+        os.makedirs(BENCHMARK_DATA_FOLDER, exist_ok=True)
+        net, im, fm = load_bpmn_net(os.path.join(UPLOAD_FOLDER, SYNTHETIC_MODEL))
+        # written under a temporary name, so that aborted runs leave no partial logs
+        write_synthetic_log(
+            net,
+            im,
+            fm,
+            path + ".part.csv",
+            num_traces,
+            noise_rate=SYNTHETIC_NOISE_RATE,
+            seed=0,
+        )
+        os.replace(path + ".part.csv", path)
+    return path
+
+
+def run_benchmark(backend, name, model_path, log_path, stages, repeat, args):
+    """
+    Runs the pipeline `repeat` times and returns the fastest time of every step in
+    `stages`. Steps that are not selected still run if later steps depend on them.
+    """
+    last = max(STAGES.index(stage) for stage in stages)
+    timings = {stage: [] for stage in STAGES[: last + 1]}
+    errors = {}
+    for _ in range(repeat):
+        pipeline = _Pipeline(
+            backend,
+            model_path,
+            log_path,
+            args.templates,
+            max_deviations=args.max_deviations,
+        )
+        for stage in timings:
+            start = time.perf_counter()
+            try:
+                getattr(pipeline, stage)()
+            except Exception as e:
+                errors[stage] = repr(e)
+                break
+            timings[stage].append(time.perf_counter() - start)
+        if errors:
+            break
+    num_traces = len(pipeline.xes_log) if hasattr(pipeline, "xes_log") else None
+    results = []
+    for stage in stages:
+        result = {"dataset": name, "traces": num_traces, "stage": stage}
+        if stage in errors:
+            result["error"] = errors[stage]
+        elif timings[stage]:
+            result["seconds"] = min(timings[stage])
+        else:
+            result["error"] = "skipped after an error in a previous step"
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Returns the results that are slower than the baseline result of the same dataset and
+    step by more than `threshold` (relative).
+    """
+    baseline_seconds = {
+        (result["dataset"], result["stage"]): result["seconds"]
+        for result in baseline["results"]
+        if "seconds" in result
+    }
+    regressions = []
+    for result in results:
+        expected = baseline_seconds.get((result["dataset"], result["stage"]))
+        if expected is None or "seconds" not in result:
+            continue
+        if (
+            result["seconds"] > expected * (1 + threshold)
+            and result["seconds"] - expected > MIN_REGRESSION_SECONDS
+        ):
+            regressions.append(
+                dict(
+                    result,
+                    baseline_seconds=expected,
+                    ratio=result["seconds"] / expected,
+                )
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--datasets",
+        nargs="*",
+        default=list(UPLOAD_PAIRS),
+        choices=list(UPLOAD_PAIRS),
+        help="pairs of uploads/ to benchmark",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="*",
+        type=int,
+        default=SYNTHETIC_SIZES,
+        help="numbers of traces of the synthetic logs",
+    )
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--templates",
+        nargs="*",
+        default=sorted(binary_strings | unary_strings),
+        help="Declare templates to mine (all by default)",
+    )
+    parser.add_argument(
+        "--max-deviations",
+        type=int,
+        default=5,
+        help="number of deviations for the causal effects",
+    )
+    parser.add_argument("--output", default=None, help="JSON file for the results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown that counts as a regression",
+    )
+    args = parser.parse_args(argv)
+    # app.py addresses the uploads relative to the backend folder
+    os.chdir(BACKEND_DIR)
+    import app as backend
+
+    runs = [
+        (name, *(os.path.join(UPLOAD_FOLDER, f) for f in UPLOAD_PAIRS[name]))
+        for name in args.datasets
+    ] + [
+        (
+            f"synthetic_{size}",
+            os.path.join(UPLOAD_FOLDER, SYNTHETIC_MODEL),
+            synthetic_log(size),
+        )
+        for size in args.sizes
+    ]
+    results = []
+    for name, model_path, log_path in runs:
+        results.extend(
+            run_benchmark(
+                backend, name, model_path, log_path, args.stages, args.repeat, args
+            )
+        )
+
+    report = {
+        "created": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "threshold": args.threshold,
+        "results": results,
+        "regressions": [],
+    }
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(dict(report, regressions=None), f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report["regressions"] = find_regressions(
+                results, json.load(f), args.threshold
+            )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    for regression in report["regressions"]:
+        print(
+            f"Regression: {regression['stage']} on {regression['dataset']} took "
+            f"{regression['seconds']:.2f}s (baseline {regression['baseline_seconds']:.2f}s)",
+            file=sys.stderr,
+        )
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
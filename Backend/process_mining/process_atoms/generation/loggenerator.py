@@ -1,11 +1,18 @@
 from __future__ import annotations
 import json
 import random
-from copy import deepcopy
+from operator import attrgetter
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
 
+import numpy as np
+import pandas as pd
+
+from process_mining.process_atoms.constants import XES_NAME, XES_RESOURCE, XES_TIMESTAMP
 from process_mining.process_atoms.mine.behavioral_profile import get_behavioral_profile_as_df
 from process_mining.process_atoms.mine.conversion.bpmnjsonanalyzer import parse_model_elements
 from process_mining.process_atoms.mine.conversion.variantgenerator import VariantGenerator
+from process_mining.process_atoms.models.petri import CompiledNet
 
 
 def _insert_event(trace: list, tasks: set):
@@ -181,16 +188,14 @@ def insert_noise(log: list[list[dict[str, str]]], noisy_trace_prob, min_log_size
     ) = get_behavioral_profile_as_df(activity_sequences)
     if len(activity_sequences) < min_log_size:
         # add additional traces until desired log size reached
-        activity_sequences_cpy = deepcopy(activity_sequences)
+        activity_sequences_cpy = [list(trace) for trace in activity_sequences]
         for i in range(0, min_log_size):
             activity_sequences_cpy.append(
-                deepcopy(activity_sequences[i % len(activity_sequences)])
+                list(activity_sequences[i % len(activity_sequences)])
             )
             if len(activity_sequences_cpy) >= min_log_size:
                 break
         activity_sequences = activity_sequences_cpy
-    else:
-        activity_sequences = deepcopy(activity_sequences)
     classes = _get_event_classes(activity_sequences)
     activity_sequences_new = dict()
     trace_idx_to_noise = dict()
@@ -252,6 +257,270 @@ def insert_noise(log: list[list[dict[str, str]]], noisy_trace_prob, min_log_size
     return activity_sequences_new, trace_idx_to_noise
 
 
+# kinds of noise of `write_synthetic_log`, numbered like the noise types of `insert_noise`
+NOISE_TYPES = ("swap", "insert", "remove")
+SYNTHETIC_LOG_BATCH_SIZE = 10000
+XES_NOISE = "noise"
+_XES_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<log xes.version="1.0" xmlns="http://www.xes-standard.org/">\n'
+    '<extension name="Concept" prefix="concept" '
+    'uri="http://www.xes-standard.org/concept.xesext"/>\n'
+    '<extension name="Time" prefix="time" '
+    'uri="http://www.xes-standard.org/time.xesext"/>\n'
+    '<extension name="Organizational" prefix="org" '
+    'uri="http://www.xes-standard.org/org.xesext"/>\n'
+)
+
+
+def _simulate_runs(compiled: CompiledNet, initial, final, num_runs, rng, max_length):
+    """
+    Plays the token game for `num_runs` runs at once, firing a uniformly chosen enabled
+    transition in every step. Returns the transitions fired by the runs that reach the
+    final marking within `max_length` steps, as rows padded with -1.
+    """
+    markings = np.tile(initial, (num_runs, 1))
+    running = np.arange(num_runs)
+    completed = np.zeros(num_runs, dtype=bool)
+    steps = []
+    for length in range(max_length + 1):
+        at_final = (markings[running] == final).all(axis=1)
+        completed[running[at_final]] = True
+        running = running[~at_final]
+        if len(running) == 0 or length == max_length:
+            break
+        enabled = compiled.enabled(markings[running])
+        # runs in a deadlock are dropped
+        alive = enabled.any(axis=1)
+        running, enabled = running[alive], enabled[alive]
+        fired = np.where(enabled, rng.random(enabled.shape), -1.0).argmax(axis=1)
+        markings[running] = compiled.fire(markings[running], fired)
+        step = np.full(num_runs, -1, dtype=np.int64)
+        step[running] = fired
+        steps.append(step)
+    if not steps:
+        return np.empty((completed.sum(), 0), dtype=np.int64)
+    return np.stack(steps, axis=1)[completed]
+
+
+def _add_noise(cases, activities, num_cases, num_activities, noise_rate, rng):
+    """
+    Swaps two adjacent events, inserts a random activity or removes an event in a share
+    of `noise_rate` of the cases (with at least two events, like `insert_noise`). The
+    events are given by their case and activity code, ordered by case. Returns the noisy
+    events and the type of noise of every case (-1 for none).
+    """
+    lengths = np.bincount(cases, minlength=num_cases)
+    starts = np.cumsum(lengths) - lengths
+    noise = np.where(
+        rng.random(num_cases) < noise_rate,
+        rng.integers(0, len(NOISE_TYPES), num_cases),
+        -1,
+    )
+    noise[lengths < 2] = -1
+    position = rng.random(num_cases)
+    activities = activities.copy()
+    swapped = (starts + position * (lengths - 1)).astype(np.int64)[noise == 0]
+    activities[swapped], activities[swapped + 1] = (
+        activities[swapped + 1],
+        activities[swapped],
+    )
+    kept = np.ones(len(cases), dtype=bool)
+    kept[(starts + position * lengths).astype(np.int64)[noise == 2]] = False
+    # inserted events are ordered before the event at their position
+    inserted = np.flatnonzero(noise == 1)
+    order = np.concatenate(
+        [
+            2 * np.flatnonzero(kept),
+            2 * (starts + position * (lengths + 1)).astype(np.int64)[inserted] - 1,
+        ]
+    )
+    cases = np.concatenate([cases[kept], inserted])
+    activities = np.concatenate(
+        [activities[kept], rng.integers(0, num_activities, len(inserted))]
+    )
+    by_case = np.lexsort((order, cases))
+    return cases[by_case], activities[by_case], noise
+
+
+def _event_times(cases, num_cases, start, case_interval, event_interval, rng):
+    """
+    Returns the time of the events of the cases that start after `start`, with
+    exponentially distributed times between the starts of the cases and between the
+    events of a case. Times are given in nanoseconds since the epoch.
+    """
+    arrivals = rng.exponential(case_interval, num_cases)
+    case_starts = start + np.cumsum(arrivals).astype(np.int64)
+    waiting = rng.exponential(event_interval, len(cases))
+    elapsed = np.cumsum(waiting)
+    lengths = np.bincount(cases, minlength=num_cases)
+    # the time since the start of the case
+    elapsed -= np.repeat(
+        np.concatenate([[0.0], elapsed])[np.cumsum(lengths) - lengths], lengths
+    )
+    return case_starts, case_starts[cases] + elapsed.astype(np.int64)
+
+
+def _write_csv_batch(file, header, case_ids, activities, times, resources, noise):
+    pd.DataFrame(
+        {
+            f"case:{XES_NAME}": case_ids,
+            XES_NAME: activities,
+            XES_TIMESTAMP: times,
+            XES_RESOURCE: resources,
+            f"case:{XES_NOISE}": noise,
+        }
+    ).to_csv(file, header=header, index=False)
+
+
+def _write_xes_batch(file, case_ids, cases, activities, times, resources, noise):
+    lengths = np.bincount(cases, minlength=len(case_ids)).tolist()
+    events = iter(
+        f'<event><string key="{XES_NAME}" value={activity}/>'
+        f'<date key="{XES_TIMESTAMP}" value="{time}"/>'
+        f'<string key="{XES_RESOURCE}" value={resource}/></event>\n'
+        for activity, time, resource in zip(activities, times, resources)
+    )
+    parts = []
+    for case_id, case_noise, length in zip(case_ids, noise, lengths):
+        parts.append(
+            f'<trace><string key="{XES_NAME}" value="{case_id}"/>'
+            f'<string key="{XES_NOISE}" value="{case_noise}"/>\n'
+        )
+        parts.extend(next(events) for _ in range(length))
+        parts.append("</trace>\n")
+    file.write("".join(parts))
+
+
+def write_synthetic_log(
+    net,
+    initial_marking,
+    final_marking,
+    path,
+    num_traces: int,
+    noise_rate: float = 0.0,
+    seed=None,
+    activity_label=None,
+    num_resources: int = 10,
+    start="2024-01-01",
+    case_interval=pd.Timedelta(minutes=10),
+    event_interval=pd.Timedelta(hours=1),
+    max_trace_length: int = 1000,
+    batch_size: int = SYNTHETIC_LOG_BATCH_SIZE,
+):
+    """
+    Writes a synthetic log with `num_traces` random runs of a Petri net to a CSV or XES
+    file (by the suffix of `path`), in batches of `batch_size` traces, so that the memory
+    does not grow with the size of the log.
+
+    Every run fires a uniformly chosen enabled transition until the final marking is
+    reached; runs that deadlock or exceed `max_trace_length` transitions are dropped.
+    The events are labeled with `activity_label(transition)` (by default the label of
+    the transition), transitions labeled `None` are silent. A share of `noise_rate` of
+    the traces gets one kind of noise (see `NOISE_TYPES`), which is recorded in the
+    "noise" attribute of the trace. On average, a case starts every `case_interval`
+    after `start` and its events are `event_interval` apart; every event is assigned one
+    of `num_resources` random resources. The log is the same for the same `seed` and
+    `batch_size`.
+    """
+    path = Path(path)
+    if path.suffix.lower() not in (".csv", ".xes"):
+        raise RuntimeError("The synthetic log can only be written to CSV or XES files.")
+    if activity_label is None:
+        activity_label = attrgetter("label")
+    rng = np.random.default_rng(seed)
+    compiled = CompiledNet(net, places=set(initial_marking) | set(final_marking))
+    initial = compiled.marking_vector(initial_marking)
+    final = compiled.marking_vector(final_marking)
+    labels = [activity_label(t) for t in compiled.transitions]
+    activity_names = list(dict.fromkeys(label for label in labels if label is not None))
+    if not activity_names:
+        raise RuntimeError("The net has no labeled transitions.")
+    # the activity of every transition, silent transitions and padding map to -1
+    transition_activities = np.array(
+        [-1 if label is None else activity_names.index(label) for label in labels]
+        + [-1]
+    )
+    as_xes = path.suffix.lower() == ".xes"
+    if as_xes:
+        activity_names = [quoteattr(name) for name in activity_names]
+        resource_names = [quoteattr(f"Resource {i + 1}") for i in range(num_resources)]
+    else:
+        resource_names = [f"Resource {i + 1}" for i in range(num_resources)]
+    activity_names = np.array(activity_names, dtype=object)
+    resource_names = np.array(resource_names, dtype=object)
+    noise_names = np.array(NOISE_TYPES + ("",), dtype=object)
+    clock = pd.Timestamp(start, tz="UTC").value
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        if as_xes:
+            file.write(_XES_HEADER)
+        while written < num_traces:
+            runs = _simulate_runs(
+                compiled, initial, final, batch_size, rng, max_trace_length
+            )[: num_traces - written]
+            if len(runs) == 0:
+                raise RuntimeError("No run of the net reaches the final marking.")
+            cases, steps = np.nonzero(transition_activities[runs] >= 0)
+            activities = transition_activities[runs[cases, steps]]
+            cases, activities, noise = _add_noise(
+                cases,
+                activities,
+                len(runs),
+                len(activity_names),
+                noise_rate,
+                rng,
+            )
+            case_starts, times = _event_times(
+                cases,
+                len(runs),
+                clock,
+                case_interval / pd.Timedelta(1, "ns"),
+                event_interval / pd.Timedelta(1, "ns"),
+                rng,
+            )
+            clock = int(case_starts[-1])
+            times = np.datetime_as_string(
+                times.astype("datetime64[ns]").astype("datetime64[ms]"),
+                timezone="UTC",
+            )
+            case_ids = np.arange(written, written + len(runs)).astype(str)
+            resources = resource_names[rng.integers(0, num_resources, len(cases))]
+            if as_xes:
+                _write_xes_batch(
+                    file,
+                    case_ids,
+                    cases,
+                    activity_names[activities],
+                    times,
+                    resources,
+                    noise_names[noise],
+                )
+            else:
+                _write_csv_batch(
+                    file,
+                    written == 0,
+                    case_ids[cases],
+                    activity_names[activities],
+                    times,
+                    resources,
+                    noise_names[noise][cases],
+                )
+            written += len(runs)
+        if as_xes:
+            file.write("</log>\n")
+
+
+def load_bpmn_net(model_path):
+    """
+    Converts a BPMN file (e.g. from `uploads/`) to a Petri net with pm4py, for
+    `write_synthetic_log`.
+    """
+    import pm4py
+
+    return pm4py.convert_to_petri_net(pm4py.read_bpmn(str(model_path)))
+
+
 class LogGenerator:
     def __init__(self, model_id: str, model_json: str):
         self.model_id = model_id
@@ -271,3 +540,26 @@ class LogGenerator:
     def generate_noisy_log(self, noisy_trace_prob, min_log_size=10):
         variants_log = self.variant_generator.extract_variants(as_simple_log=True)
         return insert_noise(variants_log, noisy_trace_prob, min_log_size)[0]
+
+    def write_log(self, path, num_traces: int, noise_rate: float = 0.0, **kwargs):
+        """
+        Writes a synthetic log with random runs of the model to a CSV or XES file, see
+        `write_synthetic_log` for the options.
+        """
+        pn, im, fm = self.variant_generator.converter.convert_from_parsed(
+            self.follows, self.labels
+        )
+        write_synthetic_log(
+            pn,
+            im,
+            fm,
+            path,
+            num_traces,
+            noise_rate=noise_rate,
+            activity_label=lambda t: (
+                None
+                if t.label is None
+                else self.variant_generator.activity_label(t.label)
+            ),
+            **kwargs,
+        )
@@ -1,8 +1,11 @@
 from __future__ import annotations
+import os
 from typing import Callable, List
 
 #import faiss
 import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 
 from process_mining.process_atoms.mine.declare.enums.mp_constants import Template, directed_strings
 from process_mining.process_atoms.models.processatom import FittedProcessAtom, ProcessAtom
@@ -39,6 +42,138 @@ def match_activities_based_on_index(
     return matches
 
 
+class NGramIndex:
+    """
+    Offline alternative to the faiss index: labels are represented as TF-IDF weighted
+    character n-grams and searched by cosine similarity. The n-gram counts of every
+    label are cached in `cache_path` (an .npz file), if given.
+    """
+
+    def __init__(
+        self,
+        activities: list[str],
+        cache_path: str = None,
+        ngram_range=(2, 4),
+        n_features=2**18,
+    ) -> None:
+        self.activities = list(activities)
+        self.cache_path = cache_path
+        # hashed features need no vocabulary, so the counts of a label never change
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=ngram_range,
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+        )
+        self._cached_labels, self._cached_counts = self._load_cache()
+        counts = self.ngram_counts(self.activities)
+        self.transformer = TfidfTransformer()
+        if self.activities:
+            self.vectors = self.transformer.fit_transform(counts).tocsr()
+
+    def _load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return {}, []
+        cache = np.load(self.cache_path, allow_pickle=False)
+        if tuple(cache["params"]) != self._params():
+            return {}, []
+        counts = sparse.csr_matrix(
+            (cache["data"], cache["indices"], cache["indptr"]),
+            shape=(len(cache["labels"]), self.vectorizer.n_features),
+        )
+        labels = {label: idx for idx, label in enumerate(cache["labels"].tolist())}
+        return labels, [counts]
+
+    def _params(self):
+        return (*self.vectorizer.ngram_range, self.vectorizer.n_features)
+
+    def _save_cache(self, labels, counts):
+        # written under a temporary name, so that readers never see a partial file
+        tmp_path = self.cache_path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            labels=np.array(labels, dtype=str),
+            data=counts.data,
+            indices=counts.indices,
+            indptr=counts.indptr,
+            params=np.array(self._params()),
+        )
+        os.replace(tmp_path, self.cache_path)
+
+    def ngram_counts(self, labels: list[str]) -> sparse.csr_matrix:
+        """
+        Returns the n-gram counts of the labels, one row per label. Labels that are
+        not cached yet are vectorized in one batch and added to the cache.
+        """
+        missing = list(
+            dict.fromkeys(label for label in labels if label not in self._cached_labels)
+        )
+        if missing:
+            offset = len(self._cached_labels)
+            self._cached_labels.update(
+                (label, offset + idx) for idx, label in enumerate(missing)
+            )
+            self._cached_counts.append(self.vectorizer.transform(missing))
+            self._cached_counts = [sparse.vstack(self._cached_counts, format="csr")]
+            if self.cache_path is not None:
+                self._save_cache(list(self._cached_labels), self._cached_counts[0])
+        if not labels:
+            return sparse.csr_matrix((0, self.vectorizer.n_features))
+        rows = [self._cached_labels[label] for label in labels]
+        return self._cached_counts[0][rows]
+
+    def search(self, labels: list[str], k=1, block_size=1024):
+        """
+        Returns the similarities and indices of the `k` most similar activities for
+        every label, ordered by decreasing similarity, like `faiss.Index.search`.
+        """
+        k = min(k, len(self.activities))
+        similarities = np.zeros((len(labels), k))
+        indices = np.zeros((len(labels), k), dtype=np.int64)
+        if k == 0 or not labels:
+            return similarities, indices
+        queries = self.transformer.transform(self.ngram_counts(labels)).tocsr()
+        vectors_t = self.vectors.T.tocsc()
+        for start in range(0, len(labels), block_size):
+            block = (queries[start : start + block_size] @ vectors_t).toarray()
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_similarities = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_similarities, axis=1, kind="stable")
+            indices[start : start + len(block)] = np.take_along_axis(top, order, axis=1)
+            similarities[start : start + len(block)] = np.take_along_axis(
+                top_similarities, order, axis=1
+            )
+        return similarities, indices
+
+
+def match_activities_based_on_ngrams(
+    index: NGramIndex, log_activities: list[str], k=1, threshold=0.5
+) -> dict[str, list[str]]:
+    """
+    Matches every log activity to its `k` most similar activities of the index, if
+    their cosine similarity is at least `threshold`.
+    """
+    matches = {}
+    similarities, indices = index.search(log_activities, k)
+    for la, la_similarities, la_indices in zip(log_activities, similarities, indices):
+        for similarity, i in zip(la_similarities, la_indices):
+            if similarity >= threshold:
+                matches.setdefault(index.activities[i], []).append(la)
+    return matches
+
+
+def matching_function_from_matches(
+    matches: dict[str, list[str]],
+) -> Callable[[str, str], bool]:
+    """
+    Turns precomputed matches into a matching function for the Matcher, which is
+    called with a log activity and an atom activity.
+    """
+    matched_pairs = {(la, activity) for activity, las in matches.items() for la in las}
+    return lambda log_component, activity: (log_component, activity) in matched_pairs
+
+
 def exact_match(str_1, str_2):
     """
     returns True if the two strings are equal, False otherwise
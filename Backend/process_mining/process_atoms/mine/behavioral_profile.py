@@ -1,18 +1,47 @@
+from collections import Counter
+
 import numpy as np
 import pandas as pd
 
+# upper bound for the number of event pairs that are counted at once
+_MAX_PAIRS = 2**24
+
+
+def _encode_variants(log):
+    # the distinct cases of the log as arrays of activity codes, with their frequencies
+    variants = Counter(tuple(case) for case in log)
+    unique_event_classes = list(dict.fromkeys(e for c in variants for e in c))
+    codes = {event_class: i for i, event_class in enumerate(unique_event_classes)}
+    encoded = [np.array([codes[e] for e in c], dtype=np.int64) for c in variants]
+    return unique_event_classes, encoded, np.array(list(variants.values()), dtype=float)
+
 
 def _get_weak_order_matrix(log, as_df=False):
-    unique_event_classes = list(set([e for c in log for e in c]))
-    wom = np.zeros(shape=(len(unique_event_classes), len(unique_event_classes)))
-    for case in log:
-        activities = [e for e in case]
-        for i in range(0, len(activities) - 1):
-            for j in range(i + 1, len(activities)):
-                wom[
-                    unique_event_classes.index(activities[i]),
-                    unique_event_classes.index(activities[j]),
-                ] += 1
+    unique_event_classes, variants, frequencies = _encode_variants(log)
+    num_classes = len(unique_event_classes)
+    wom = np.zeros(shape=(num_classes, num_classes))
+    lengths = np.array([len(c) for c in variants], dtype=np.int64)
+    # the pairs of events are counted at once for all variants of the same length
+    for length in np.unique(lengths[lengths > 1]).tolist():
+        selected = np.flatnonzero(lengths == length)
+        first, second = np.triu_indices(length, 1)
+        if len(first) > _MAX_PAIRS:
+            # count the events after each event instead
+            for i in selected.tolist():
+                for j in range(length - 1):
+                    wom[variants[i][j]] += frequencies[i] * np.bincount(
+                        variants[i][j + 1 :], minlength=num_classes
+                    )
+            continue
+        batch_size = _MAX_PAIRS // len(first)
+        for start in range(0, len(selected), batch_size):
+            batch = selected[start : start + batch_size]
+            cases = np.array([variants[i] for i in batch.tolist()])
+            wom += np.bincount(
+                (cases[:, first] * num_classes + cases[:, second]).ravel(),
+                weights=np.repeat(frequencies[batch], len(first)),
+                minlength=num_classes * num_classes,
+            ).reshape(num_classes, num_classes)
     if as_df:
         return pd.DataFrame(
             wom, columns=unique_event_classes, index=unique_event_classes
@@ -23,36 +52,21 @@ def _get_weak_order_matrix(log, as_df=False):
 def get_behavioral_profile_as_df(log, as_df=False):
     wom = _get_weak_order_matrix(log, as_df=True)
     cols = wom.columns
-    wom = wom.values
-    wom_len = len(wom)
-    res = np.empty((wom_len, wom_len), dtype=float)
-    strict_order, reverse_strict_order, exclusive, interleaving = (
-        set(),
-        set(),
-        set(),
-        set(),
+    follows = wom.values != 0
+    precedes = follows.T
+    res = np.select(
+        [follows & ~precedes, ~follows & precedes, follows & precedes],
+        [0, 1, 2],
+        default=3,
     )
-    for i in range(wom_len):
-        for j in range(wom_len):
-            if wom[i, j] == 0 and wom[j, i] != 0:
-                res[j, i] = 0
-                reverse_strict_order.add((cols[i], cols[j]))
-                continue
-            if wom[j, i] == 0 and wom[i, j] != 0:
-                res[j, i] = 1
-                strict_order.add((cols[i], cols[j]))
-                continue
-            if wom[i, j] != 0 and wom[j, i] != 0:
-                res[j, i] = 2
-                interleaving.add((cols[i], cols[j]))
-                continue
-            if wom[i, j] == 0 and wom[j, i] == 0:
-                res[j, i] = 3
-                exclusive.add((cols[i], cols[j]))
-                continue
     if as_df:
-        return pd.DataFrame(res, columns=cols, index=cols).replace(
-            [0, 1, 2, 3, 4], ["->", "<-", "||", "+", ""]
+        return pd.DataFrame(
+            np.array(["->", "<-", "||", "+"], dtype=object)[res],
+            columns=cols,
+            index=cols,
         )
-    else:
-        return strict_order, reverse_strict_order, exclusive, interleaving
+    strict_order, reverse_strict_order, interleaving, exclusive = (
+        {(cols[i], cols[j]) for i, j in zip(*np.nonzero(res == relation))}
+        for relation in range(4)
+    )
+    return strict_order, reverse_strict_order, exclusive, interleaving
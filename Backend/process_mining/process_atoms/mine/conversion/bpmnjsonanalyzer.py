@@ -1,5 +1,6 @@
 from __future__ import annotations
 import re
+import warnings
 from collections import deque
 
 from process_mining.process_atoms.constants import (
@@ -62,93 +63,172 @@ def sanitize_label_full(label):
     return label
 
 
-def compute_finite_paths_of_tasks(follows, labels, tasks):
-    node_paths = compute_finite_paths_with_node_ids(follows, labels)
+# Default maximum number of paths that are enumerated for a model
+MAX_PATHS = 100000
+
+
+def compute_finite_paths_of_tasks(follows, labels, tasks, max_paths=MAX_PATHS):
     task_paths = []
-    for path in node_paths:
-        task_path = [node for node in path if node in tasks]
+    seen_task_paths = set()
+    for path in iter_finite_paths_with_node_ids(follows, labels, max_paths):
+        task_path = tuple(node for node in path if node in tasks)
         # ensure task_path is not empty and has not been seen before
-        if task_path and task_path not in task_paths:
-            task_paths.append(task_path)
+        if task_path and task_path not in seen_task_paths:
+            seen_task_paths.add(task_path)
+            task_paths.append(list(task_path))
     return task_paths
 
 
-def compute_finite_paths_with_node_ids(follows, labels):
-    print_info = True
+def compute_finite_paths_with_node_ids(
+    follows, labels, max_paths=MAX_PATHS, print_info=False
+):
+    finite_paths = list(iter_finite_paths_with_node_ids(follows, labels, max_paths))
+
+    # Print source and sink shapes and all finite paths
+    if print_info:
+        source_shapes, sink_shapes = get_source_and_sink_shapes(follows, labels)
+        print()
+        print("Source and sink shapes:")
+        print([labels[s] for s in source_shapes])
+        print([labels[s] for s in sink_shapes])
+        print()
+        print("All finite paths:")
+        for p in finite_paths:
+            print([labels[s] for s in p])
+    return finite_paths
+
+
+def iter_finite_paths_with_node_ids(follows, labels, max_paths=MAX_PATHS):
+    """
+    Generate the finite paths (lists of shape ids) from the source to the sink shapes of
+    a model. At most `max_paths` paths are generated (`None` for no limit), a warning is
+    issued if the model has more paths.
+    """
+    postsets = _Postsets(labels, follows)
 
     # Find source and sink shapes (typically events)
+    source_shapes, sink_shapes = get_source_and_sink_shapes(follows, labels, postsets)
+
+    # Get all finite paths from start to end shapes
+    num_paths = 0
+    for s1 in sorted(source_shapes):
+        for s2 in sorted(sink_shapes):
+            if s1 != s2:
+                for path in iter_possible_paths(labels, follows, s1, s2, postsets):
+                    if max_paths is not None and num_paths >= max_paths:
+                        warnings.warn(
+                            f"Path enumeration stopped after {max_paths} paths, the "
+                            "paths of the model are incomplete"
+                        )
+                        return
+                    num_paths += 1
+                    yield path
+
+
+def get_source_and_sink_shapes(follows, labels, postsets=None):
+    # Returns the shapes without preset (sources) and without postset (sinks)
+    postsets = _Postsets(labels, follows) if postsets is None else postsets
+    # Direct predecessors of every shape, so that presets are not computed with a scan
+    # over all shapes (see `get_preset`)
+    predecessors = {}
+    for s1, shapes in follows.items():
+        for s2 in shapes:
+            if s2 != s1:
+                predecessors.setdefault(s2, set()).add(s1)
+
+    def has_preset(shape):
+        for s1 in predecessors.get(shape, ()):
+            if labels[s1].startswith("MessageFlow"):
+                continue
+            if not labels[s1].startswith("SequenceFlow") or predecessors.get(s1):
+                return True
+        return False
+
     source_shapes = set()
     sink_shapes = set()
     for s in follows.keys():
         # Iterate over all shapes except sequence flows
         irrelevant_shapes = ("SequenceFlow", "DataObject", "Pool", "Lane")
         if not labels[s].startswith(irrelevant_shapes):
-            if len(get_postset(labels, follows, s)) == 0:
+            if len(postsets[s]) == 0:
                 sink_shapes.add(s)
-            if len(get_preset(labels, follows, s)) == 0:
+            if not has_preset(s):
                 source_shapes.add(s)
+    return source_shapes, sink_shapes
 
-    # Print source and sink shapes
-    if print_info:
-        print()
-        print("Source and sink shapes:")
-        print([labels[s] for s in source_shapes])
-        print([labels[s] for s in sink_shapes])
 
-    # Get all finite paths from start to end shapes
-    finite_paths = []
-    for s1 in source_shapes:
-        for s2 in sink_shapes:
-            if s1 != s2:
-                finite_paths = [
-                    *finite_paths,
-                    *get_possible_paths(labels, follows, s1, s2, []),
-                ]
+def get_possible_paths(labels, follows, s1, s2, path=()):
+    # Returns all possible paths from s1 to s2 as a list of lists
+    return list(iter_possible_paths(labels, follows, s1, s2, path=path))
 
-    # Print all finite paths
-    if print_info:
-        print()
-        print("All finite paths:")
-        for p in finite_paths:
-            print([labels[s] for s in p])
-    return finite_paths
 
+def iter_possible_paths(labels, follows, s1, s2, postsets=None, path=()):
+    """
+    Generate all paths from shape `s1` to shape `s2` (as lists of shapes, starting with
+    `path`) that do not visit a shape twice. A path ends as soon as `s2` is in the
+    postset of its last shape.
 
-def get_possible_paths(labels, follows, s1, s2, path=[]):
-    # Returns all possible paths from s1 to s2 as a list of lists
-    postset = get_postset(labels, follows, s1)
-    # if target (s2) is in postset, add current and target shape and return
-    if s2 in postset:
-        path.append(s1)
-        path.append(s2)
-        return [path]
-    # if no shapes in postset, return empty list
-    if len(postset) == 0:
-        return []
-    # Several shapes in postset ...
-    else:
-        path.append(s1)
-        # Determine shapes to be visited (make sure that we don't visit the same shape again and get stuck
-        to_be_visited = postset.difference(set(path))
-        # If no shape is left, return empty list
-        if len(to_be_visited) == 0:
-            return []
+    The traversal is depth-first with an explicit stack. Postsets are computed once per
+    shape and shapes from which `s2` can not be reached are not visited.
+    """
+    postsets = _Postsets(labels, follows) if postsets is None else postsets
+    path = [*path, s1]
+    if s2 in postsets[s1]:
+        yield [*path, s2]
+        return
+    reaching = _shapes_reaching(postsets, s1, s2)
+
+    def successors(shape):
+        return iter(sorted((postsets[shape] & reaching).difference(on_path)))
+
+    on_path = set(path)
+    stack = [successors(s1)]
+    while stack:
+        shape = next(stack[-1], None)
+        if shape is None:
+            stack.pop()
+            on_path.discard(path.pop())
+        elif s2 in postsets[shape]:
+            yield [*path, shape, s2]
         else:
-            paths = []
-            if labels[s1].startswith("ParallelGateway"):
-                print("\t" + str([labels[x] for x in to_be_visited]))
-            # Recursively traverse
-            for s in to_be_visited:
-                recursive_paths = get_possible_paths(
-                    labels, follows, s, s2, path.copy()
-                )
-                if len(recursive_paths) > 0:
-                    if isinstance(recursive_paths[0], list):
-                        for p in recursive_paths:
-                            paths.append(p)
-                    else:
-                        paths.append(recursive_paths)
-            return paths
+            path.append(shape)
+            on_path.add(shape)
+            stack.append(successors(shape))
+
+
+class _Postsets(dict):
+    # Postsets of the shapes of a model, computed on first access
+    def __init__(self, labels, follows):
+        super().__init__()
+        self.labels = labels
+        self.follows = follows
+
+    def __missing__(self, shape):
+        postset = self[shape] = get_postset(self.labels, self.follows, shape)
+        return postset
+
+
+def _shapes_reaching(postsets, source, target):
+    # Returns the shapes reachable from `source` from which `target` can be reached
+    reachable = {source}
+    stack = [source]
+    while stack:
+        for s in postsets[stack.pop()]:
+            if s not in reachable:
+                reachable.add(s)
+                stack.append(s)
+    predecessors = {}
+    for s1 in reachable:
+        for s2 in postsets[s1]:
+            predecessors.setdefault(s2, []).append(s1)
+    reaching = {target}
+    stack = [target]
+    while stack:
+        for s in predecessors.get(stack.pop(), ()):
+            if s not in reaching:
+                reaching.add(s)
+                stack.append(s)
+    return reaching
 
 
 def get_transitive_postset(labels, follows, shape, visited_shapes):
@@ -9,6 +9,12 @@ from process_mining.process_atoms.models.petri import (
 )
 
 
+def _by_name(elements) -> list:
+    # iterating the places and transitions in a fixed order makes the conversion
+    # deterministic, e.g. the names of the additional elements
+    return sorted(elements, key=lambda e: str(e.name))
+
+
 class JsonToPetriNetConverter:
     def __init__(self):
         self.key_index = 0
@@ -107,7 +113,7 @@ class JsonToPetriNetConverter:
                 # Get postset of considered element "s"
                 postset = [
                     x
-                    for x in bpmn_analyzer.get_postset(labels, follows, s)
+                    for x in sorted(bpmn_analyzer.get_postset(labels, follows, s))
                     if bpmn_analyzer.is_relevant(x, labels, irrelevant_shapes)
                 ]
 
@@ -245,7 +251,7 @@ class JsonToPetriNetConverter:
                                         input_p = None
                                         preset = self._get_net_preset(elements[elem])
                                         if len(preset) > 0:
-                                            input_p = preset.pop()
+                                            input_p = _by_name(preset)[0]
 
                                         # If not, create one
                                         if input_p is None:
@@ -286,10 +292,10 @@ class JsonToPetriNetConverter:
                                     add_arc_from_to(elements[s], p, net)
                                     add_arc_from_to(p, elements[elem], net)
         # Correct implicit joins
-        for elem in implicit_joins:
+        for elem in sorted(implicit_joins):
             p = self._get_new_place(net, elements, labels)
             pn_elem = elements[elem]
-            pn_elem_sources = [arc.source for arc in pn_elem.in_arcs]
+            pn_elem_sources = _by_name(arc.source for arc in pn_elem.in_arcs)
             for a in pn_elem.in_arcs:
                 net.arcs.remove(a)
             for s in pn_elem_sources:
@@ -314,7 +320,7 @@ class JsonToPetriNetConverter:
         if len(sources) > 1:
             # print(f"Multiple start events: {sources}")
             p = self._get_new_place(net, elements, labels)
-            for elem in sources:
+            for elem in _by_name(sources):
                 t = self._get_new_transition(net, elements, labels)
                 add_arc_from_to(t, elements[str(elem)], net)
                 add_arc_from_to(p, t, net)
@@ -324,7 +330,7 @@ class JsonToPetriNetConverter:
         if len(sinks) > 1:
             # print(f"Multiple end events: {sinks}")
             p = self._get_new_place(net, elements, labels)
-            for elem in sinks:
+            for elem in _by_name(sinks):
                 t = self._get_new_transition(net, elements, labels)
                 add_arc_from_to(elements[str(elem)], t, net)
                 add_arc_from_to(t, p, net)
@@ -332,7 +338,7 @@ class JsonToPetriNetConverter:
 
         # go through all places and if a place has a non useless label, replace it with a place -> transition -> place construct
         to_remove = []
-        for p in net.places:
+        for p in _by_name(net.places):
             if (
                 p.label is not None
                 and p.label in labels
@@ -377,28 +383,28 @@ class JsonToPetriNetConverter:
         if len(sources) == 0:
             # ("No sources found")
             # check for places with no incoming edges and select the first one as source
-            for p in net.places:
+            for p in _by_name(net.places):
                 if len(p.in_arcs) == 0:
                     sources.add(p)
                     break
-        p = sources.pop()
+        p = _by_name(sources)[0]
         initial_marking[elements[str(p)]] = 1
 
         final_marking = Marking()
         if len(sinks) == 0:
             # print("No sinks found")
             # check for places with no outgoing edges and select the first one as sink
-            for p in net.places:
+            for p in _by_name(net.places):
                 if len(p.out_arcs) == 0:
                     sinks.add(p)
                     break
-        p = sinks.pop()
+        p = _by_name(sinks)[0]
         final_marking[elements[str(p)]] = 1
 
         # Handle attached events
         for s in follows.keys():
             if labels[s] == "AttachedEvent":
-                origin = elements[bpmn_analyzer.get_preset(labels, follows, s).pop()]
+                origin = elements[min(bpmn_analyzer.get_preset(labels, follows, s))]
 
                 origin_output = set()
                 for a in origin.out_arcs:
@@ -408,7 +414,7 @@ class JsonToPetriNetConverter:
                 # If the set origin_output = 0, the event was not properly attached in the modeling editor
                 if len(origin_output) > 0:
                     attached_event_place = elements[s]
-                    split_place = elements[str(origin_output.pop())]
+                    split_place = elements[str(_by_name(origin_output)[0])]
                     for a in attached_event_place.in_arcs:
                         net.arcs.remove(a)
                     t = self._get_new_transition(net, elements, labels)
@@ -467,12 +473,12 @@ class JsonToPetriNetConverter:
         transition_map = {}
         net_copy = PetriNet("net copy")
         index = 1
-        for p in net.places:
+        for p in _by_name(net.places):
             p_new = Place(index)
             index += 1
             net_copy.places.add(p_new)
             place_map[p] = p_new
-        for t in net.transitions:
+        for t in _by_name(net.transitions):
             t_new = Transition(index, t.label)
             index += 1
             net_copy.transitions.add(t_new)
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from typing import Optional
+
 import pandas as pd
 
 from process_mining.process_atoms.constants import (
@@ -36,46 +38,28 @@ class VariantGenerator:
         self.follows = follows
         self.labels = labels
         self.converter = JsonToPetriNetConverter()
+        # whether the last call of `extract_variants` found all variants of the model
+        self.playout_complete = None
 
     def extract_variants(self, as_simple_log=False):
         pn, im, fm = self.converter.convert_from_parsed(self.follows, self.labels)
-        variant_set = petri.net_variants(pn, im, fm)
+        playout = petri.net_playout(pn, im, fm)
+        self.playout_complete = playout.complete
+        variant_set = playout.variants
         simple_log = self.replace_attributes(variant_set)
         if as_simple_log:
             return simple_log
-        # establish log in EventLog format
-        cases = {"c_caseid": CaseID}
-        events = {
-            "c_caseid": CaseID,
-            "c_eventname": EventType,
-            "c_time": EventTime,
-        }
-        schema = EventLogSchemaTypes(
-            # schema for case-level attributes
-            cases=cases,
-            events=events,
-        )
-        cases_df = pd.DataFrame.from_records(
-            [{"c_caseid": str(i)} for i in range(len(simple_log))]
+        return activity_sequences_to_event_log(
+            [[e[XES_NAME] for e in variant] for variant in simple_log]
         )
 
-        events_df = pd.DataFrame.from_records(
-            [
-                {
-                    "c_caseid": str(i),
-                    "c_eventname": str(e[XES_NAME]),
-                    "c_time": pd.Timestamp.now(),
-                }
-                for i, variant in enumerate(simple_log)
-                for e in variant
-                if e[XES_NAME] is not None
-            ]
-        )
-        if len(events_df) == 0:
-            return None
-        events_df["c_time"] = pd.to_datetime(events_df["c_time"], unit="ms")
-        event_log = EventLog(cases_df, events_df, schema)
-        return event_log
+    def activity_label(self, element_id) -> Optional[str]:
+        """
+        Returns the label of the events of a model element in the played out log, or
+        `None` if they are filtered out (see `replace_attributes`).
+        """
+        label = self.model_elements[element_id][LABEL]
+        return label if is_relevant_event_label(label) else None
 
     def replace_attributes(self, variant_set):
         played_out_log = list([{XES_NAME: e} for e in var] for var in variant_set)
@@ -87,16 +71,59 @@ class VariantGenerator:
                 event[XES_NAME] = self.model_elements[e_id][LABEL]
                 event[ELEMENT_CATEGORY] = self.model_elements[e_id][ELEMENT_CATEGORY]
         played_out_log = [
-            [
-                event
-                for event in trace
-                if event[XES_NAME] not in USELESS_LABELS
-                and not sanitize_label_full(
-                    replace_multiple_substrings(event[XES_NAME], USELESS_LABELS, "")
-                )
-                == ""
-                and "?" not in event[XES_NAME]
-            ]
+            [event for event in trace if is_relevant_event_label(event[XES_NAME])]
             for trace in played_out_log
         ]
         return played_out_log
+
+
+def is_relevant_event_label(label) -> bool:
+    return (
+        label not in USELESS_LABELS
+        and not sanitize_label_full(
+            replace_multiple_substrings(label, USELESS_LABELS, "")
+        )
+        == ""
+        and "?" not in label
+    )
+
+
+def activity_sequences_to_event_log(
+    activity_sequences: list[list[str]],
+) -> Optional[EventLog]:
+    """
+    Establishes an `EventLog` with one case per activity sequence, or returns `None` if
+    the sequences contain no events.
+    """
+    cases = {"c_caseid": CaseID}
+    events = {
+        "c_caseid": CaseID,
+        "c_eventname": EventType,
+        "c_time": EventTime,
+    }
+    schema = EventLogSchemaTypes(
+        # schema for case-level attributes
+        cases=cases,
+        events=events,
+    )
+    cases_df = pd.DataFrame.from_records(
+        [{"c_caseid": str(i)} for i in range(len(activity_sequences))]
+    )
+
+    events_df = pd.DataFrame.from_records(
+        [
+            {
+                "c_caseid": str(i),
+                "c_eventname": str(activity),
+                "c_time": pd.Timestamp.now(),
+            }
+            for i, activity_sequence in enumerate(activity_sequences)
+            for activity in activity_sequence
+            if activity is not None
+        ]
+    )
+    if len(events_df) == 0:
+        return None
+    events_df["c_time"] = pd.to_datetime(events_df["c_time"], unit="ms")
+    event_log = EventLog(cases_df, events_df, schema)
+    return event_log
@@ -1,22 +1,17 @@
-from datetime import timedelta
-
 from process_mining.process_atoms.mine.declare.enums.mp_constants import TraceState
 from process_mining.process_atoms.mine.declare.models.checker_result import CheckerResult
 from process_mining.process_atoms.mine.declare.parsers.decl_parser import (
-    parse_data_cond,
-    parse_time_cond,
+    compile_data_cond,
+    compile_time_cond,
 )
 
-# Defining global and local functions/variables to use within eval() to prevent code injection
-glob = {"__builtins__": None}
-
 
 # mp-not-responded-existence constraint checker
 # Description:
 def mp_not_responded_existence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     pendings = []
     num_fulfillments = 0
@@ -25,8 +20,7 @@ def mp_not_responded_existence(trace, done, a, b, rules):
 
     for event in trace:
         if event == a:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 pendings.append(event)
 
     for event in trace:
@@ -35,14 +29,7 @@ def mp_not_responded_existence(trace, done, a, b, rules):
 
         if event == b:
             for A in reversed(pendings):
-                locl = {
-                    "A": A,
-                    "T": event,
-                    "timedelta": timedelta,
-                    "abs": abs,
-                    "float": float,
-                }
-                if eval(correlation_rules, glob, locl) and eval(time_rule, glob, locl):
+                if correlation_rules(A, event) and time_rule(A, event):
                     pendings.remove(A)
                     num_violations += 1
 
@@ -79,9 +66,9 @@ def mp_not_responded_existence(trace, done, a, b, rules):
 # mp-not-response constraint checker
 # Description:
 def mp_not_response(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     pendings = []
     num_fulfillments = 0
@@ -90,20 +77,12 @@ def mp_not_response(trace, done, a, b, rules):
 
     for event in trace:
         if event == a:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 pendings.append(event)
 
         if pendings and event == b:
             for A in reversed(pendings):
-                locl = {
-                    "A": A,
-                    "T": event,
-                    "timedelta": timedelta,
-                    "abs": abs,
-                    "float": float,
-                }
-                if eval(correlation_rules, glob, locl) and eval(time_rule, glob, locl):
+                if correlation_rules(A, event) and time_rule(A, event):
                     pendings.remove(A)
                     num_violations += 1
 
@@ -140,9 +119,9 @@ def mp_not_response(trace, done, a, b, rules):
 # mp-not-chain-response constraint checker
 # Description:
 def mp_not_chain_response(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_violations = 0
@@ -150,22 +129,13 @@ def mp_not_chain_response(trace, done, a, b, rules):
 
     for index, event in enumerate(trace):
         if event == a:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 if index < len(trace) - 1:
                     if trace[index + 1] == b:
-                        locl = {
-                            "A": event,
-                            "T": trace[index + 1],
-                            "timedelta": timedelta,
-                            "abs": abs,
-                            "float": float,
-                        }
-                        if eval(correlation_rules, glob, locl) and eval(
-                            time_rule, glob, locl
+                        if correlation_rules(event, trace[index + 1]) and time_rule(
+                            event, trace[index + 1]
                         ):
                             num_violations += 1
                 else:
@@ -200,9 +170,9 @@ def mp_not_chain_response(trace, done, a, b, rules):
 # mp-not-precedence constraint checker
 # Description:
 def mp_not_precedence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_violations = 0
@@ -213,22 +183,11 @@ def mp_not_precedence(trace, done, a, b, rules):
             Ts.append(event)
 
         if event == b:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 for T in Ts:
-                    locl = {
-                        "A": event,
-                        "T": T,
-                        "timedelta": timedelta,
-                        "abs": abs,
-                        "float": float,
-                    }
-                    if eval(correlation_rules, glob, locl) and eval(
-                        time_rule, glob, locl
-                    ):
+                    if correlation_rules(event, T) and time_rule(event, T):
                         num_violations += 1
                         break
 
@@ -260,30 +219,21 @@ def mp_not_precedence(trace, done, a, b, rules):
 # mp-not-chain-precedence constraint checker
 # Description:
 def mp_not_chain_precedence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_violations = 0
 
     for index, event in enumerate(trace):
         if event == b:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 if index != 0 and trace[index - 1] == a:
-                    locl = {
-                        "A": event,
-                        "T": trace[index - 1],
-                        "timedelta": timedelta,
-                        "abs": abs,
-                        "float": float,
-                    }
-                    if eval(correlation_rules, glob, locl) and eval(
-                        time_rule, glob, locl
+                    if correlation_rules(event, trace[index - 1]) and time_rule(
+                        event, trace[index - 1]
                     ):
                         num_violations += 1
 
@@ -1,15 +1,10 @@
-from datetime import timedelta
-
 from process_mining.process_atoms.mine.declare.enums.mp_constants import TraceState
 from process_mining.process_atoms.mine.declare.models.checker_result import CheckerResult
 from process_mining.process_atoms.mine.declare.parsers.decl_parser import (
-    parse_data_cond,
-    parse_time_cond,
+    compile_data_cond,
+    compile_time_cond,
 )
 
-# Defining global and local functions/variables to use within eval() to prevent code injection
-glob = {"__builtins__": None}
-
 
 # mp-responded-existence constraint checker
 # Description:
@@ -18,9 +13,9 @@ glob = {"__builtins__": None}
 # then event b occurs in the trace as well.
 # Event a activates the constraint.
 def mp_responded_existence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     pendings = []
     num_fulfillments = 0
@@ -29,8 +24,7 @@ def mp_responded_existence(trace, done, a, b, rules):
 
     for event in trace:
         if event == a:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 pendings.append(event)
 
     for event in trace:
@@ -39,14 +33,7 @@ def mp_responded_existence(trace, done, a, b, rules):
 
         if event == b:
             for A in reversed(pendings):
-                locl = {
-                    "A": A,
-                    "T": event,
-                    "timedelta": timedelta,
-                    "abs": abs,
-                    "float": float,
-                }
-                if eval(correlation_rules, glob, locl) and eval(time_rule, glob, locl):
+                if correlation_rules(A, event) and time_rule(A, event):
                     pendings.remove(A)
                     num_fulfillments += 1
 
@@ -88,9 +75,9 @@ def mp_responded_existence(trace, done, a, b, rules):
 # if event a occurs in the trace, then event b occurs after a.
 # Event a activates the constraint.
 def mp_response(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     pendings = []
     num_fulfillments = 0
@@ -99,20 +86,12 @@ def mp_response(trace, done, a, b, rules):
 
     for event in trace:
         if event == a:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 pendings.append(event)
 
         if pendings and event == b:
             for A in reversed(pendings):
-                locl = {
-                    "A": A,
-                    "T": event,
-                    "timedelta": timedelta,
-                    "abs": abs,
-                    "float": float,
-                }
-                if eval(correlation_rules, glob, locl) and eval(time_rule, glob, locl):
+                if correlation_rules(A, event) and time_rule(A, event):
                     pendings.remove(A)
                     num_fulfillments += 1
 
@@ -155,9 +134,9 @@ def mp_response(trace, done, a, b, rules):
 # before event a recurs.
 # Event a activates the constraint.
 def mp_alternate_response(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     pending = None
     num_activations = 0
@@ -166,20 +145,12 @@ def mp_alternate_response(trace, done, a, b, rules):
 
     for event in trace:
         if event == a:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 pending = event
                 num_activations += 1
 
         if event == b and pending is not None:
-            locl = {
-                "A": pending,
-                "T": event,
-                "timedelta": timedelta,
-                "abs": abs,
-                "float": float,
-            }
-            if eval(correlation_rules, glob, locl) and eval(time_rule, glob, locl):
+            if correlation_rules(pending, event) and time_rule(pending, event):
                 pending = None
                 num_fulfillments += 1
 
@@ -219,9 +190,9 @@ def mp_alternate_response(trace, done, a, b, rules):
 # each time event a occurs in the trace, event b occurs immediately afterwards.
 # Event a activates the constraint.
 def mp_chain_response(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_fulfillments = 0
@@ -229,22 +200,13 @@ def mp_chain_response(trace, done, a, b, rules):
 
     for index, event in enumerate(trace):
         if event == a:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 if index < len(trace) - 1:
                     if trace[index + 1] == b:
-                        locl = {
-                            "A": event,
-                            "T": trace[index + 1],
-                            "timedelta": timedelta,
-                            "abs": abs,
-                            "float": float,
-                        }
-                        if eval(correlation_rules, glob, locl) and eval(
-                            time_rule, glob, locl
+                        if correlation_rules(event, trace[index + 1]) and time_rule(
+                            event, trace[index + 1]
                         ):
                             num_fulfillments += 1
                 else:
@@ -283,9 +245,9 @@ def mp_chain_response(trace, done, a, b, rules):
 # The history-based constraint precedence(a,b) indicates that event b occurs
 # only in the trace, if preceded by a. Event b activates the constraint.
 def mp_precedence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_fulfillments = 0
@@ -296,22 +258,11 @@ def mp_precedence(trace, done, a, b, rules):
             Ts.append(event)
 
         if event == b:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 for T in Ts:
-                    locl = {
-                        "A": event,
-                        "T": T,
-                        "timedelta": timedelta,
-                        "abs": abs,
-                        "float": float,
-                    }
-                    if eval(correlation_rules, glob, locl) and eval(
-                        time_rule, glob, locl
-                    ):
+                    if correlation_rules(event, T) and time_rule(event, T):
                         num_fulfillments += 1
                         break
 
@@ -347,9 +298,9 @@ def mp_precedence(trace, done, a, b, rules):
 # it is preceded by event a and no other event b can recur in between.
 # Event b activates the constraint.
 def mp_alternate_precedence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_fulfillments = 0
@@ -360,20 +311,10 @@ def mp_alternate_precedence(trace, done, a, b, rules):
             Ts.append(event)
 
         if event == b:
-            locl = {"A": event}
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
                 for T in Ts:
-                    locl = {
-                        "A": event,
-                        "T": T,
-                        "timedelta": timedelta,
-                        "abs": abs,
-                        "float": float,
-                    }
-                    if eval(correlation_rules, glob, locl) and eval(
-                        time_rule, glob, locl
-                    ):
+                    if correlation_rules(event, T) and time_rule(event, T):
                         num_fulfillments += 1
                         break
                 Ts = []
@@ -409,30 +350,21 @@ def mp_alternate_precedence(trace, done, a, b, rules):
 # each time event b occurs in the trace, event a occurs immediately beforehand.
 # Event b activates the constraint.
 def mp_chain_precedence(trace, done, a, b, rules):
-    activation_rules = parse_data_cond(rules["activation"])
-    correlation_rules = parse_data_cond(rules["correlation"])
-    time_rule = parse_time_cond(rules["time"])
+    activation_rules = compile_data_cond(rules["activation"])
+    correlation_rules = compile_data_cond(rules["correlation"])
+    time_rule = compile_time_cond(rules["time"])
 
     num_activations = 0
     num_fulfillments = 0
 
     for index, event in enumerate(trace):
         if event == b:
-            locl = {"A": event}
-
-            if eval(activation_rules, glob, locl):
+            if activation_rules(event):
                 num_activations += 1
 
                 if index != 0 and trace[index - 1] == a:
-                    locl = {
-                        "A": event,
-                        "T": trace[index - 1],
-                        "timedelta": timedelta,
-                        "abs": abs,
-                        "float": float,
-                    }
-                    if eval(correlation_rules, glob, locl) and eval(
-                        time_rule, glob, locl
+                    if correlation_rules(event, trace[index - 1]) and time_rule(
+                        event, trace[index - 1]
                     ):
                         num_fulfillments += 1
 
@@ -6,15 +6,20 @@ import warnings
 from itertools import combinations, product
 from typing import List
 
+import numpy as np
 import pandas as pd
+from scipy import sparse
 from mlxtend.frequent_patterns import apriori, fpgrowth
 from mlxtend.preprocessing import TransactionEncoder
 from tqdm import tqdm
 
 from process_mining.process_atoms.mine.declare.enums.mp_constants import Template, TraceState
 from process_mining.process_atoms.mine.declare.functions import (
-    check_trace_conformance,
+    compile_model,
+    discover_binary_constraints,
     discover_constraint,
+    execute_plan,
+    query_candidates,
     query_constraint,
 )
 from process_mining.process_atoms.mine.declare.models.checker_result import CheckerResult
@@ -99,7 +104,8 @@ class Declare:
         min_support: float
             the minimum support of the returned item sets.
         algorithm : str, optional
-            the algorithm for extracting frequent itemsets, choose between 'fpgrowth' (default) and 'apriori'.
+            the algorithm for extracting frequent itemsets, choose between 'fpgrowth' (default), 'apriori' and
+            'pairs'. 'pairs' only supports item sets up to length 2.
         len_itemset : int, optional
             the maximum length of the extracted itemsets.
         """
@@ -107,6 +113,15 @@ class Declare:
             raise RuntimeError("You must load a log before.")
         if not 0 <= min_support <= 1:
             raise RuntimeError("Min. support must be in range [0, 1].")
+        if algorithm == "pairs":
+            if len_itemset is None or len_itemset > 2:
+                raise RuntimeError(
+                    "The pairs algorithm only supports item sets up to length 2."
+                )
+            self.frequent_item_sets = self.compute_pair_supports(
+                min_support, len_itemset
+            )
+            return
         if min_support == 0:
             # Calculate all unique item sets up to length 2
             lst = list(self.log.unique_activities())
@@ -147,6 +162,88 @@ class Declare:
                 (frequent_itemsets["length"] <= len_itemset)
             ]
 
+    def compute_pair_supports(
+        self, min_support: float, len_itemset: int = 2
+    ) -> pd.DataFrame:
+        """
+        Compute the support of all activities and activity pairs with a single sparse matrix product.
+
+        The activity-by-variant incidence matrix is weighted by the variant frequencies, so that the product with
+        its transpose holds the number of traces in which each pair of activities co-occurs.
+
+        Parameters
+        ----------
+        min_support: float
+            the minimum support of the returned item sets.
+        len_itemset : int, optional
+            the maximum length of the returned item sets, either 1 or 2 (default 2).
+
+        Returns
+        -------
+        frequent_item_sets
+            data frame with the columns 'support', 'itemsets' and 'length' like the one of compute_frequent_itemsets.
+            Pairs that never co-occur are only included for a min. support of 0, as with the other algorithms.
+        """
+        activities = list(self.log.unique_activities())
+        activity_index = {activity: i for i, activity in enumerate(activities)}
+        rows, cols, frequencies = [], [], []
+        for j, (variant, case_ids) in enumerate(self.log.trace_variants.items()):
+            for activity in set(variant):
+                rows.append(activity_index[activity])
+                cols.append(j)
+            frequencies.append(len(case_ids))
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(activities), len(frequencies)),
+        )
+        num_traces = sum(frequencies)
+        co_occurrence = (
+            incidence @ sparse.diags(np.asarray(frequencies, dtype=float)) @ incidence.T
+        ).tocoo()
+
+        singleton_support = (
+            co_occurrence.diagonal() / num_traces
+            if num_traces > 0
+            else np.zeros(len(activities))
+        )
+        singletons = np.flatnonzero(
+            (singleton_support > 0) & (singleton_support >= min_support)
+        )
+        item_sets = [frozenset([activities[i]]) for i in singletons]
+        supports = list(singleton_support[singletons])
+        if len_itemset == 2 and min_support == 0:
+            # negative and choice constraints also hold for pairs that never co-occur
+            first, second = np.triu_indices(len(activities), 1)
+            pair_support = (
+                np.asarray(co_occurrence.tocsr()[first, second]).ravel() / num_traces
+                if num_traces > 0
+                else np.zeros(len(first))
+            )
+            pairs = list(zip(first, second, pair_support))
+        elif len_itemset == 2 and num_traces > 0:
+            pair_support = co_occurrence.data / num_traces
+            is_pair = (
+                (co_occurrence.row < co_occurrence.col)
+                & (pair_support > 0)
+                & (pair_support >= min_support)
+            )
+            pairs = sorted(
+                zip(
+                    co_occurrence.row[is_pair],
+                    co_occurrence.col[is_pair],
+                    pair_support[is_pair],
+                )
+            )
+        else:
+            pairs = []
+        item_sets += [frozenset([activities[i], activities[j]]) for i, j, _ in pairs]
+        supports += [support for _, _, support in pairs]
+        frequent_item_sets = pd.DataFrame({"support": supports, "itemsets": item_sets})
+        frequent_item_sets["length"] = frequent_item_sets["itemsets"].apply(
+            lambda x: len(x)
+        )
+        return frequent_item_sets
+
     def conformance_checking(
         self, consider_vacuity: bool
     ) -> dict[tuple[int, str] : dict[str:CheckerResult]]:
@@ -175,10 +272,12 @@ class Declare:
             )
 
         self.conformance_checking_results = {}
+        # compile the model once and only execute the plan per variant
+        plan = compile_model(self.model, consider_vacuity)
         # get unique traces from events data frame
         variants = self.log.trace_variants
         for variant, case_idxs in variants.items():
-            trc_res = check_trace_conformance(variant, self.model, consider_vacuity)
+            trc_res = execute_plan(variant, plan)
             for case_idx in case_idxs:
                 self.conformance_checking_results[case_idx] = {
                     const
@@ -225,6 +324,12 @@ class Declare:
         if considered_templates is None:
             considered_templates = self.supported_templates
         self.discovery_results = {}
+        variant_positions = self.trace_variant_positions()
+        binary_templates = [
+            templ
+            for templ in Template.get_binary_templates()
+            if templ.templ_str in considered_templates
+        ]
         for item_set in tqdm(self.frequent_item_sets["itemsets"]):
             length = len(item_set)
             if do_unary and length == 1:
@@ -247,24 +352,43 @@ class Declare:
                                 )
 
             elif length == 2:
-                for templ in Template.get_binary_templates():
-                    if templ.templ_str in considered_templates:
-                        constraint = {
-                            "template": templ,
-                            "activities": list(item_set),
-                            "condition": ("", "", ""),
-                        }
-                        self.discovery_results |= discover_constraint(
-                            self.log, constraint, consider_vacuity
-                        )
-
-                        constraint["activities"] = list(reversed(list(item_set)))
-                        self.discovery_results |= discover_constraint(
-                            self.log, constraint, consider_vacuity
-                        )
+                # all binary templates in both directions with one pass over the variants
+                self.discovery_results |= discover_binary_constraints(
+                    variant_positions,
+                    list(item_set),
+                    binary_templates,
+                    consider_vacuity,
+                )
 
         return self.discovery_results
 
+    def trace_variant_positions(self) -> dict[tuple[str], list[int]]:
+        """
+        Map every variant of the log to the positions of its traces, i.e. the indices under which the traces are
+        enumerated when iterating over the log.
+        """
+        index = self.log.variant_index
+        case_positions = self.log.case_index.case_positions
+        return {
+            variant: np.sort(case_positions[cases]).tolist()
+            for variant, cases in zip(index.variants, index.variant_cases)
+        }
+
+    def activity_variant_index(
+        self, variants: list[tuple[str]]
+    ) -> dict[str, np.ndarray]:
+        """
+        Compute for every activity of the log a boolean mask of the given variants in which it occurs.
+        """
+        activity_variants = {
+            activity: np.zeros(len(variants), dtype=bool)
+            for activity in self.log.unique_activities()
+        }
+        for idx, variant in enumerate(variants):
+            for activity in set(variant):
+                activity_variants[activity][idx] = True
+        return activity_variants
+
     def filter_discovery(
         self, min_support: float = 0
     ) -> dict[str : dict[tuple[int, str] : CheckerResult]]:
@@ -392,7 +516,11 @@ class Declare:
 
         templates_to_check = list()
         if is_template_given:
-            templates_to_check.append(template_str)
+            if template.supports_cardinality:
+                for card in range(max_declare_cardinality):
+                    templates_to_check.append(template_str + str(card + 1))
+            else:
+                templates_to_check.append(template_str)
         else:
             templates_to_check += list(
                 map(lambda t: t.templ_str, Template.get_binary_templates())
@@ -417,6 +545,16 @@ class Declare:
             )
         )
 
+        # inverted index of the variants in which each activity occurs, most frequent variants first
+        variant_positions = self.trace_variant_positions()
+        variants = sorted(
+            variant_positions, key=lambda v: len(variant_positions[v]), reverse=True
+        )
+        frequencies = np.array([len(variant_positions[v]) for v in variants])
+        activity_variants = self.activity_variant_index(variants)
+        no_variants = np.zeros(len(variants), dtype=bool)
+        num_traces = len(self.log)
+
         self.query_checking_results = {}
 
         for template_str in templates_to_check:
@@ -434,8 +572,22 @@ class Declare:
                 for couple in activity_combos:
                     constraint["activities"] = couple
 
+                    candidates = query_candidates(
+                        template.templ_str,
+                        activity_variants.get(couple[0], no_variants),
+                        activity_variants.get(couple[1], no_variants),
+                        consider_vacuity,
+                        act_cond,
+                        trg_cond,
+                    )
                     constraint_str = query_constraint(
-                        self.log, constraint, consider_vacuity, min_support
+                        variants,
+                        frequencies,
+                        num_traces,
+                        constraint,
+                        consider_vacuity,
+                        min_support,
+                        candidates,
                     )
                     if constraint_str:
                         res_value = {
@@ -453,10 +605,23 @@ class Declare:
             else:  # unary template
                 constraint["condition"] = (act_cond, time_cond)
                 for activity in activations_to_check:
-                    constraint["activities"] = activity
-
+                    constraint["activities"] = [activity]
+
+                    candidates = query_candidates(
+                        template.templ_str,
+                        activity_variants.get(activity, no_variants),
+                        no_variants,
+                        consider_vacuity,
+                        act_cond,
+                    )
                     constraint_str = query_constraint(
-                        self.log, constraint, consider_vacuity, min_support
+                        variants,
+                        frequencies,
+                        num_traces,
+                        constraint,
+                        consider_vacuity,
+                        min_support,
+                        candidates,
                     )
                     if constraint_str:
                         res_value = {
@@ -1,4 +1,6 @@
-from math import ceil
+from functools import partial
+
+import numpy as np
 
 from process_mining.process_atoms.mine.declare.checkers.choice import mp_choice, mp_exclusive_choice
 from process_mining.process_atoms.mine.declare.checkers.existence import (
@@ -27,283 +29,368 @@ from process_mining.process_atoms.mine.declare.checkers.relation import (
 from process_mining.process_atoms.mine.declare.enums.mp_constants import Template, TraceState
 from process_mining.process_atoms.mine.declare.models.checker_result import CheckerResult
 from process_mining.process_atoms.mine.declare.models.decl_model import DeclModel
+from process_mining.process_atoms.mine.declare.parsers.decl_parser import (
+    compile_data_cond,
+    compile_time_cond,
+)
 from process_mining.process_atoms.models.event_log import EventLog
 
 
-def check_trace_conformance(trace, model, consider_vacuity):
-    """
-    Check the conformance of a trace with a model.
-    TODO currently trace is an activity sequence only (no event)
+# Checker functions per template. The tables are keyed by template string, as all
+# `Template` members compare equal as str.
+UNARY_CHECKERS = {
+    Template.EXISTENCE.templ_str: mp_existence,
+    Template.ABSENCE.templ_str: mp_absence,
+    Template.INIT.templ_str: mp_init,
+    Template.END.templ_str: mp_end,
+    Template.EXACTLY.templ_str: mp_exactly,
+}
+
+BINARY_CHECKERS = {
+    Template.CHOICE.templ_str: mp_choice,
+    Template.EXCLUSIVE_CHOICE.templ_str: mp_exclusive_choice,
+    Template.RESPONDED_EXISTENCE.templ_str: mp_responded_existence,
+    Template.RESPONSE.templ_str: mp_response,
+    Template.ALTERNATE_RESPONSE.templ_str: mp_alternate_response,
+    Template.CHAIN_RESPONSE.templ_str: mp_chain_response,
+    Template.PRECEDENCE.templ_str: mp_precedence,
+    Template.ALTERNATE_PRECEDENCE.templ_str: mp_alternate_precedence,
+    Template.CHAIN_PRECEDENCE.templ_str: mp_chain_precedence,
+    Template.NOT_RESPONDED_EXISTENCE.templ_str: mp_not_responded_existence,
+    Template.NOT_CO_EXISTENCE.templ_str: mp_not_responded_existence,
+    Template.NOT_RESPONSE.templ_str: mp_not_response,
+    Template.NOT_CHAIN_RESPONSE.templ_str: mp_not_chain_response,
+    Template.NOT_PRECEDENCE.templ_str: mp_not_precedence,
+    Template.NOT_CHAIN_PRECEDENCE.templ_str: mp_not_chain_precedence,
+}
+
+# Succession templates are checked as the conjunction of a response and a precedence
+SUCCESSION_CHECKERS = {
+    Template.SUCCESSION.templ_str: (mp_response, mp_precedence),
+    Template.ALTERNATE_SUCCESSION.templ_str: (
+        mp_alternate_response,
+        mp_alternate_precedence,
+    ),
+    Template.CHAIN_SUCCESSION.templ_str: (mp_chain_response, mp_chain_precedence),
+}
+
+
+def mp_succession(trace, done, a, b, rules, response_checker, precedence_checker):
+    trace_results_response = response_checker(trace, done, a, b, rules)
+    trace_results_precedence = precedence_checker(trace, done, a, b, rules)
+    return CheckerResult(
+        num_fulfillments=trace_results_response.num_fulfillments,
+        num_violations=trace_results_response.num_violations,
+        num_pendings=None,
+        num_activations=trace_results_response.num_activations,
+        state=TraceState.VIOLATED
+        if trace_results_response.state == TraceState.VIOLATED
+        or trace_results_precedence.state == TraceState.VIOLATED
+        else TraceState.SATISFIED,
+    )
+
+
+def compile_constraint(constraint, consider_vacuity):
     """
-    rules = {"vacuous_satisfaction": consider_vacuity}
+    Bind a constraint to its checker function.
 
-    # Set containing all constraints that raised SyntaxError in checker functions
-    error_constraint_set = set()
+    The rules of the constraint are built once and its conditions are compiled up front,
+    so that a malformed condition raises a SyntaxError here instead of for every trace.
+    Returns None for templates that have no checker.
+    """
+    template = constraint["template"]
+    rules = {
+        "vacuous_satisfaction": consider_vacuity,
+        "activation": constraint["condition"][0],
+        # time condition is always at last position
+        "time": constraint["condition"][-1],
+    }
+    if template.supports_cardinality:
+        rules["n"] = constraint["n"]
+    if template.is_binary:
+        rules["correlation"] = constraint["condition"][1]
+
+    compile_data_cond(rules["activation"])
+    compile_time_cond(rules["time"])
+    if template.is_binary:
+        compile_data_cond(rules["correlation"])
+
+    activities = constraint["activities"]
+    templ_str = template.templ_str
+    if templ_str in UNARY_CHECKERS:
+        return partial(
+            UNARY_CHECKERS[templ_str], done=True, a=activities[0], rules=rules
+        )
+    if templ_str in BINARY_CHECKERS:
+        return partial(
+            BINARY_CHECKERS[templ_str],
+            done=True,
+            a=activities[0],
+            b=activities[1],
+            rules=rules,
+        )
+    if templ_str in SUCCESSION_CHECKERS:
+        response_checker, precedence_checker = SUCCESSION_CHECKERS[templ_str]
+        return partial(
+            mp_succession,
+            done=True,
+            a=activities[0],
+            b=activities[1],
+            rules=rules,
+            response_checker=response_checker,
+            precedence_checker=precedence_checker,
+        )
+    return None
 
-    trace_results = {}
 
+def compile_model(model, consider_vacuity):
+    """
+    Compile a DeclModel into a plan, i.e. a flat list of (constraint string, bound checker)
+    pairs that can be executed on any number of traces with `execute_plan`.
+    """
+    plan = []
     for idx, constraint in enumerate(model.constraints):
         constraint_str = model.serialized_constraints[idx]
-        rules["activation"] = constraint["condition"][0]
-
-        if constraint["template"].supports_cardinality:
-            rules["n"] = constraint["n"]
-        if constraint["template"].is_binary:
-            rules["correlation"] = constraint["condition"][1]
-
-        rules["time"] = constraint["condition"][
-            -1
-        ]  # time condition is always at last position
-
         try:
-            if constraint["template"] is Template.EXISTENCE:
-                trace_results[constraint_str] = mp_existence(
-                    trace, True, constraint["activities"][0], rules
-                )
-
-            elif constraint["template"] is Template.ABSENCE:
-                trace_results[constraint_str] = mp_absence(
-                    trace, True, constraint["activities"][0], rules
-                )
-
-            elif constraint["template"] is Template.INIT:
-                trace_results[constraint_str] = mp_init(
-                    trace, True, constraint["activities"][0], rules
-                )
-
-            elif constraint["template"] is Template.END:
-                trace_results[constraint_str] = mp_end(
-                    trace, True, constraint["activities"][0], rules
-                )
-
-            elif constraint["template"] is Template.EXACTLY:
-                trace_results[constraint_str] = mp_exactly(
-                    trace, True, constraint["activities"][0], rules
-                )
-
-            elif constraint["template"] is Template.CHOICE:
-                trace_results[constraint_str] = mp_choice(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-
-            elif constraint["template"] is Template.EXCLUSIVE_CHOICE:
-                trace_results[constraint_str] = mp_exclusive_choice(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-
-            elif constraint["template"] is Template.RESPONDED_EXISTENCE:
-                trace_results[constraint_str] = mp_responded_existence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-
-            elif constraint["template"] is Template.RESPONSE:
-                trace_results[constraint_str] = mp_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-
-            elif constraint["template"] is Template.ALTERNATE_RESPONSE:
-                trace_results[constraint_str] = mp_alternate_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
+            checker = compile_constraint(constraint, consider_vacuity)
+        except SyntaxError:
+            print(
+                'Condition not properly formatted for constraint "'
+                + constraint_str
+                + '".'
+            )
+            continue
+        if checker is not None:
+            plan.append((constraint_str, checker))
+    return plan
 
-            elif constraint["template"] is Template.CHAIN_RESPONSE:
-                trace_results[constraint_str] = mp_chain_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
 
-            elif constraint["template"] is Template.PRECEDENCE:
-                trace_results[constraint_str] = mp_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
+def execute_plan(trace, plan):
+    """
+    Check the conformance of a trace with a compiled plan.
+    """
+    return {constraint_str: checker(trace) for constraint_str, checker in plan}
 
-            elif constraint["template"] is Template.ALTERNATE_PRECEDENCE:
-                trace_results[constraint_str] = mp_alternate_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
 
-            elif constraint["template"] is Template.CHAIN_PRECEDENCE:
-                trace_results[constraint_str] = mp_chain_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-            elif constraint["template"] is Template.SUCCESSION:
-                trace_results_response = mp_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                trace_results_precedence = mp_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                res = CheckerResult(
-                    num_fulfillments=trace_results_response.num_fulfillments,
-                    num_violations=trace_results_response.num_violations,
-                    num_pendings=None,
-                    num_activations=trace_results_response.num_activations,
-                    state=TraceState.VIOLATED
-                    if trace_results_response.state == TraceState.VIOLATED
-                    or trace_results_precedence.state == TraceState.VIOLATED
-                    else TraceState.SATISFIED,
-                )
-                trace_results[constraint_str] = res
-
-            elif constraint["template"] is Template.ALTERNATE_SUCCESSION:
-                trace_results_response = mp_alternate_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                trace_results_precedence = mp_alternate_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                res = CheckerResult(
-                    num_fulfillments=trace_results_response.num_fulfillments,
-                    num_violations=trace_results_response.num_violations,
-                    num_pendings=None,
-                    num_activations=trace_results_response.num_activations,
-                    state=TraceState.VIOLATED
-                    if trace_results_response.state == TraceState.VIOLATED
-                    or trace_results_precedence.state == TraceState.VIOLATED
-                    else TraceState.SATISFIED,
-                )
-                trace_results[constraint_str] = res
-
-            elif constraint["template"] is Template.CHAIN_SUCCESSION:
-                trace_results_response = mp_chain_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                trace_results_precedence = mp_chain_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-                res = CheckerResult(
-                    num_fulfillments=trace_results_response.num_fulfillments,
-                    num_violations=trace_results_response.num_violations,
-                    num_pendings=None,
-                    num_activations=trace_results_response.num_activations,
-                    state=TraceState.VIOLATED
-                    if trace_results_response.state == TraceState.VIOLATED
-                    or trace_results_precedence.state == TraceState.VIOLATED
-                    else TraceState.SATISFIED,
-                )
-                trace_results[constraint_str] = res
-
-            elif constraint["template"] is Template.NOT_RESPONDED_EXISTENCE:
-                trace_results[constraint_str] = mp_not_responded_existence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
-            elif constraint["template"] is Template.NOT_CO_EXISTENCE:
-                trace_results[constraint_str] = mp_not_responded_existence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
+def check_trace_conformance(trace, model, consider_vacuity):
+    """
+    Check the conformance of a trace with a model.
+    TODO currently trace is an activity sequence only (no event)
+    """
+    return execute_plan(trace, compile_model(model, consider_vacuity))
+
+
+def _relation_result(
+    num_activations, num_fulfillments, num_violations, num_pendings, consider_vacuity
+):
+    if not consider_vacuity and num_activations == 0:
+        state = TraceState.VIOLATED
+    elif num_violations > 0:
+        state = TraceState.VIOLATED
+    else:
+        state = TraceState.SATISFIED
+    return CheckerResult(
+        num_fulfillments=num_fulfillments,
+        num_violations=num_violations,
+        num_pendings=num_pendings,
+        num_activations=num_activations,
+        state=state,
+    )
+
+
+def _scan_direction(
+    merged, pos_a, pos_b, first_a, last_b, num_chains, consider_vacuity
+):
+    """
+    Derive the results of all (non-choice) binary templates for the direction (a, b) from
+    the shared counts of a single scan. Mirrors the checker functions for completed traces
+    without conditions.
+    """
+    num_a, num_b = len(pos_a), len(pos_b)
+    num_responses = sum(1 for i in pos_a if i < last_b)
+    num_precedences = sum(1 for i in pos_b if i > first_a)
+    num_alternate_responses = 0
+    num_alternate_precedences = 0
+    pending_a = False
+    for is_a in merged:
+        if is_a:
+            pending_a = True
+        elif pending_a:
+            num_alternate_responses += 1
+            num_alternate_precedences += 1
+            pending_a = False
+    num_responded = num_a if num_b > 0 else 0
+
+    results = {}
+    for templ, num_activations, num_fulfillments, num_pendings in (
+        (Template.RESPONDED_EXISTENCE, num_a, num_responded, 0),
+        (Template.RESPONSE, num_a, num_responses, 0),
+        (Template.ALTERNATE_RESPONSE, num_a, num_alternate_responses, 0),
+        (Template.CHAIN_RESPONSE, num_a, num_chains, 0),
+        (Template.PRECEDENCE, num_b, num_precedences, None),
+        (Template.ALTERNATE_PRECEDENCE, num_b, num_alternate_precedences, None),
+        (Template.CHAIN_PRECEDENCE, num_b, num_chains, None),
+    ):
+        results[templ.templ_str] = _relation_result(
+            num_activations,
+            num_fulfillments,
+            num_activations - num_fulfillments,
+            num_pendings,
+            consider_vacuity,
+        )
+    # negative templates count the fulfilments of their positive counterpart as violations
+    for templ, num_activations, num_violations, num_pendings in (
+        (Template.NOT_RESPONDED_EXISTENCE, num_a, num_responded, 0),
+        (Template.NOT_CO_EXISTENCE, num_a, num_responded, 0),
+        (Template.NOT_RESPONSE, num_a, num_responses, 0),
+        (Template.NOT_CHAIN_RESPONSE, num_a, num_chains, 0),
+        (Template.NOT_PRECEDENCE, num_b, num_precedences, None),
+        (Template.NOT_CHAIN_PRECEDENCE, num_b, num_chains, None),
+    ):
+        results[templ.templ_str] = _relation_result(
+            num_activations,
+            num_activations - num_violations,
+            num_violations,
+            num_pendings,
+            consider_vacuity,
+        )
+    for templ, (response, precedence) in (
+        (Template.SUCCESSION, (Template.RESPONSE, Template.PRECEDENCE)),
+        (
+            Template.ALTERNATE_SUCCESSION,
+            (Template.ALTERNATE_RESPONSE, Template.ALTERNATE_PRECEDENCE),
+        ),
+        (
+            Template.CHAIN_SUCCESSION,
+            (Template.CHAIN_RESPONSE, Template.CHAIN_PRECEDENCE),
+        ),
+    ):
+        response_res = results[response.templ_str]
+        precedence_res = results[precedence.templ_str]
+        results[templ.templ_str] = CheckerResult(
+            num_fulfillments=response_res.num_fulfillments,
+            num_violations=response_res.num_violations,
+            num_pendings=None,
+            num_activations=response_res.num_activations,
+            state=TraceState.VIOLATED
+            if response_res.state == TraceState.VIOLATED
+            or precedence_res.state == TraceState.VIOLATED
+            else TraceState.SATISFIED,
+        )
+    return results
 
-            elif constraint["template"] is Template.NOT_RESPONSE:
-                trace_results[constraint_str] = mp_not_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
 
-            elif constraint["template"] is Template.NOT_CHAIN_RESPONSE:
-                trace_results[constraint_str] = mp_not_chain_response(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
-                )
+def scan_binary_templates(trace, a, b, consider_vacuity):
+    """
+    Compute the results of all binary templates with a checker for the pair (a, b) in both
+    directions with a single traversal of a completed trace. Conditions are not supported,
+    as in discovery.
 
-            elif constraint["template"] is Template.NOT_PRECEDENCE:
-                trace_results[constraint_str] = mp_not_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
+    Returns a dict mapping (template string, (activation, target)) to a CheckerResult.
+    """
+    pos_a, pos_b, merged = [], [], []
+    # number of directly following pairs (a, b) and (b, a)
+    num_chains_ab = 0
+    num_chains_ba = 0
+    previous = None
+    for index, event in enumerate(trace):
+        if event == a:
+            pos_a.append(index)
+            merged.append(True)
+            if previous == b:
+                num_chains_ba += 1
+        elif event == b:
+            pos_b.append(index)
+            merged.append(False)
+            if previous == a:
+                num_chains_ab += 1
+        previous = event
+
+    first_a = pos_a[0] if pos_a else len(trace)
+    first_b = pos_b[0] if pos_b else len(trace)
+    last_a = pos_a[-1] if pos_a else -1
+    last_b = pos_b[-1] if pos_b else -1
+    forward = _scan_direction(
+        merged, pos_a, pos_b, first_a, last_b, num_chains_ab, consider_vacuity
+    )
+    backward = _scan_direction(
+        [not is_a for is_a in merged],
+        pos_b,
+        pos_a,
+        first_b,
+        last_a,
+        num_chains_ba,
+        consider_vacuity,
+    )
+    a_occurs, b_occurs = len(pos_a) > 0, len(pos_b) > 0
+    choice = CheckerResult(
+        num_fulfillments=None,
+        num_violations=None,
+        num_pendings=None,
+        num_activations=None,
+        state=TraceState.SATISFIED if a_occurs or b_occurs else TraceState.VIOLATED,
+    )
+    exclusive_choice = CheckerResult(
+        num_fulfillments=None,
+        num_violations=None,
+        num_pendings=None,
+        num_activations=None,
+        state=TraceState.SATISFIED if a_occurs ^ b_occurs else TraceState.VIOLATED,
+    )
+    results = {}
+    for templ_str in forward:
+        results[(templ_str, (a, b))] = forward[templ_str]
+        results[(templ_str, (b, a))] = backward[templ_str]
+    for activities in ((a, b), (b, a)):
+        results[(Template.CHOICE.templ_str, activities)] = choice
+        results[(Template.EXCLUSIVE_CHOICE.templ_str, activities)] = exclusive_choice
+    return results
+
+
+def discover_binary_constraints(variants, item_set, templates, consider_vacuity):
+    """
+    Discover all given binary templates for an activity pair in both directions with a
+    single pass over the variants.
+
+    Parameters
+    ----------
+    variants : dict[tuple[str], list[int]]
+        activity sequences mapped to the positions of their traces in the log.
+    item_set : list[str]
+        the activity pair.
+    templates : list[Template]
+        the binary templates to discover.
+    consider_vacuity : bool
+        True means that vacuously satisfied traces are considered as satisfied.
+
+    Returns
+    -------
+    discovery_res
+        dictionary in the format of discover_constraint for all discovered constraints.
+    """
+    a, b = item_set
+    satisfied = {}
+    for variant, trace_positions in variants.items():
+        for key, checker_res in scan_binary_templates(
+            variant, a, b, consider_vacuity
+        ).items():
+            if checker_res.state == TraceState.SATISFIED:
+                satisfied.setdefault(key, {}).update(
+                    {i: checker_res for i in trace_positions}
                 )
 
-            elif constraint["template"] is Template.NOT_CHAIN_PRECEDENCE:
-                trace_results[constraint_str] = mp_not_chain_precedence(
-                    trace,
-                    True,
-                    constraint["activities"][0],
-                    constraint["activities"][1],
-                    rules,
+    # same order of constraints as discovering the templates one by one
+    discovery_res = {}
+    for templ in templates:
+        for activities in ((a, b), (b, a)):
+            if (templ.templ_str, activities) in satisfied:
+                constraint_str = (
+                    templ.templ_str + "[" + ", ".join(activities) + "] | | |"
                 )
-        except SyntaxError:
-            if constraint_str not in error_constraint_set:
-                error_constraint_set.add(constraint_str)
-                print(
-                    'Condition not properly formatted for constraint "'
-                    + constraint_str
-                    + '".'
+                discovery_res[constraint_str] = dict(
+                    sorted(satisfied[(templ.templ_str, activities)].items())
                 )
-
-    return trace_results
+    return discovery_res
 
 
 def discover_constraint(log: EventLog, constraint, consider_vacuity):
@@ -311,14 +398,13 @@ def discover_constraint(log: EventLog, constraint, consider_vacuity):
     model = DeclModel()
     model.constraints.append(constraint)
     model.set_constraints()
+    plan = compile_model(model, consider_vacuity)
     discovery_res = {}
 
-    for i, trace in enumerate(log):
-        if len(trace.events) == 0:
+    for i, trace in enumerate(log.iter_cases(case_attributes=())):
+        if len(trace) == 0:
             continue
-        trc_res = check_trace_conformance(
-            trace.get_activity_sequence(), model, consider_vacuity
-        )
+        trc_res = execute_plan(trace.get_activity_sequence(), plan)
         if not trc_res:  # Occurring when constraint data conditions are formatted bad
             break
 
@@ -335,29 +421,148 @@ def discover_constraint(log: EventLog, constraint, consider_vacuity):
     return discovery_res
 
 
-def query_constraint(log, constraint, consider_vacuity, min_support):
+def query_candidates(
+    templ_str, a_variants, b_variants, consider_vacuity, act_cond=None, trg_cond=None
+):
+    """
+    Restrict the variants to check for a constraint to those that can satisfy it, based on
+    which of its activities occur in each variant. Constraints with an activation or target
+    condition are not restricted, since events of an activity need not meet the condition.
+
+    Parameters
+    ----------
+    templ_str : str
+        the template of the constraint.
+    a_variants : np.ndarray
+        boolean mask of the variants containing the activation activity (first activity).
+    b_variants : np.ndarray
+        boolean mask of the variants containing the target activity. Ignored for unary templates.
+    consider_vacuity : bool
+        True means that vacuously satisfied traces are considered as satisfied.
+    act_cond : str, optional
+        activation condition of the constraint.
+    trg_cond : str, optional
+        target condition of the constraint.
+
+    Returns
+    -------
+    candidates
+        boolean mask of the variants that may satisfy the constraint.
+    """
+    if act_cond or trg_cond:
+        return np.ones(len(a_variants), dtype=bool)
+    # templates activated by their first / second activity
+    activated_by_a = (
+        Template.RESPONDED_EXISTENCE.templ_str,
+        Template.RESPONSE.templ_str,
+        Template.ALTERNATE_RESPONSE.templ_str,
+        Template.CHAIN_RESPONSE.templ_str,
+    )
+    activated_by_b = (
+        Template.PRECEDENCE.templ_str,
+        Template.ALTERNATE_PRECEDENCE.templ_str,
+        Template.CHAIN_PRECEDENCE.templ_str,
+    )
+    if templ_str in (
+        Template.EXISTENCE.templ_str,
+        Template.EXACTLY.templ_str,
+        Template.INIT.templ_str,
+        Template.END.templ_str,
+    ):
+        return a_variants
+    if templ_str == Template.CHOICE.templ_str:
+        return a_variants | b_variants
+    if templ_str == Template.EXCLUSIVE_CHOICE.templ_str:
+        return a_variants ^ b_variants
+    if templ_str in activated_by_a + activated_by_b + tuple(SUCCESSION_CHECKERS):
+        if not consider_vacuity:
+            # a non-vacuous fulfilment needs both activities
+            return a_variants & b_variants
+        if templ_str in activated_by_a:
+            return ~a_variants | b_variants
+        if templ_str in activated_by_b:
+            return ~b_variants | a_variants
+        return ~(a_variants ^ b_variants)
+    if templ_str in (
+        Template.NOT_RESPONDED_EXISTENCE.templ_str,
+        Template.NOT_CO_EXISTENCE.templ_str,
+    ):
+        if not consider_vacuity:
+            return a_variants & ~b_variants
+        return ~(a_variants & b_variants)
+    if not consider_vacuity:
+        if templ_str in (
+            Template.NOT_RESPONSE.templ_str,
+            Template.NOT_CHAIN_RESPONSE.templ_str,
+        ):
+            return a_variants
+        if templ_str in (
+            Template.NOT_PRECEDENCE.templ_str,
+            Template.NOT_CHAIN_PRECEDENCE.templ_str,
+        ):
+            return b_variants
+    return np.ones(len(a_variants), dtype=bool)
+
+
+def query_constraint(
+    variants,
+    frequencies,
+    num_traces,
+    constraint,
+    consider_vacuity,
+    min_support,
+    candidates,
+):
+    """
+    Check whether a constraint reaches the minimum support in the log.
+
+    Parameters
+    ----------
+    variants : list[tuple[str]]
+        activity sequences of the log, by decreasing frequency.
+    frequencies : np.ndarray
+        number of traces of each variant.
+    num_traces : int
+        number of traces in the log.
+    constraint : dict
+        the constraint to check.
+    consider_vacuity : bool
+        True means that vacuously satisfied traces are considered as satisfied.
+    min_support : float
+        the minimum support of the constraint.
+    candidates : np.ndarray
+        boolean mask of the variants that may satisfy the constraint (see query_candidates).
+
+    Returns
+    -------
+    constraint_str
+        the serialized constraint if it reaches the minimum support, None otherwise.
+    """
+    # Upper bound of the support, the variants that are no candidate cannot satisfy the constraint
+    remaining = int(frequencies[candidates].sum())
+    if remaining == 0 or remaining / num_traces < min_support:
+        return None
+
     # Fake model composed by a single constraint
     model = DeclModel()
     model.constraints.append(constraint)
+    model.set_constraints()
+    plan = compile_model(model, consider_vacuity)
+    if not plan:  # Occurring when constraint data conditions are formatted bad
+        return None
+    constraint_str, checker = plan[0]
 
     sat_ctr = 0
-    for i, trace in enumerate(log):
-        trc_res = check_trace_conformance(
-            trace.get_activity_sequence(), model, consider_vacuity
-        )
-        if not trc_res:  # Occurring when constraint data conditions are formatted bad
-            break
-
-        constraint_str, checker_res = next(
-            iter(trc_res.items())
-        )  # trc_res will always have only one element inside
-        if checker_res.state == TraceState.SATISFIED:
-            sat_ctr += 1
+    for idx in np.flatnonzero(candidates):
+        frequency = int(frequencies[idx])
+        if checker(variants[idx]).state == TraceState.SATISFIED:
+            sat_ctr += frequency
             # If the constraint is already above the minimum support, return it directly
-            if sat_ctr / len(log) >= min_support:
+            if sat_ctr / num_traces >= min_support:
                 return constraint_str
+        remaining -= frequency
         # If there aren't enough more traces to reach the minimum support, return nothing
-        if len(log) - (i + 1) < ceil(len(log) * min_support) - sat_ctr:
+        if (sat_ctr + remaining) / num_traces < min_support:
             return None
 
     return None
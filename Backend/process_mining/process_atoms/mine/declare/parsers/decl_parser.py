@@ -1,4 +1,6 @@
 import re
+from datetime import timedelta
+from functools import lru_cache
 
 from process_mining.process_atoms.mine.declare.enums.mp_constants import Template
 from process_mining.process_atoms.mine.declare.models.decl_model import DeclModel
@@ -182,6 +184,51 @@ def parse_time_cond(condition):
         raise SyntaxError
 
 
+# Defining global and local functions/variables to use within eval() to prevent code injection
+glob = {"__builtins__": None}
+
+
+def _always_true(A, T=None):
+    return True
+
+
+def _compile_cond(py_cond):
+    # The trivial condition needs no eval at all
+    if py_cond == "True":
+        return _always_true
+    code = compile(py_cond, "<condition>", "eval")
+
+    def check(A, T=None):
+        locl = {
+            "A": A,
+            "T": T,
+            "timedelta": timedelta,
+            "abs": abs,
+            "float": float,
+        }
+        return eval(code, glob, locl)
+
+    return check
+
+
+@lru_cache(maxsize=1024)
+def compile_data_cond(cond):
+    """
+    Compile a data condition into a function of the activation event `A` and the
+    (optional) target event `T`. The results of the most recent conditions are cached.
+    """
+    return _compile_cond(parse_data_cond(cond))
+
+
+@lru_cache(maxsize=1024)
+def compile_time_cond(condition):
+    """
+    Compile a time condition into a function of the activation event `A` and the
+    target event `T`. The results of the most recent conditions are cached.
+    """
+    return _compile_cond(parse_time_cond(condition))
+
+
 def parse_decl_from_file(path):
     fo = open(path, "r+")
     lines = fo.readlines()
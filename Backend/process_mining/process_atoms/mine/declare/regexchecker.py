@@ -1,9 +1,14 @@
 from __future__ import annotations
-import string
+import multiprocessing
+import os
+from functools import lru_cache
+from itertools import product
 from typing import List
 from uuid import uuid4
 import re
-from pandas import DataFrame
+
+import numpy as np
+from pandas import DataFrame, Series
 from tqdm import tqdm
 
 from process_mining.process_atoms.mine.declare.declare import Declare
@@ -29,6 +34,32 @@ time_factors = {
     "y": 31556952 * 10**9,
 }
 
+# Private use areas of the BMP (6400 code points) and of plane 15 (65534 code points)
+# are used to encode activities as single characters
+_PRIVATE_USE_AREAS = ((0xE000, 0xF8FF), (0xF0000, 0xFFFFD))
+MAX_ENCODABLE_ACTIVITIES = sum(end - start + 1 for start, end in _PRIVATE_USE_AREAS)
+
+
+def encode_activity(index: int) -> str:
+    """
+    Return the single character symbol for the activity with the given index.
+
+    Args:
+        index (int): The index of the activity.
+
+    Returns:
+        str: A code point from one of the Unicode private use areas.
+    """
+    offset = index
+    for start, end in _PRIVATE_USE_AREAS:
+        if offset <= end - start:
+            return chr(start + offset)
+        offset -= end - start + 1
+    raise ValueError(
+        f"Cannot encode more than {MAX_ENCODABLE_ACTIVITIES} distinct activities"
+    )
+
+
 regex_representations = {
     Template.ABSENCE.templ_str: "^[^a]*(a[^a]*){0,m}[^a]*$",
     Template.EXISTENCE.templ_str: "^[^a]*(a[^a]*){n,}[^a]*$",
@@ -71,6 +102,19 @@ def is_activated(templ_str, a, b, string: str):
     return True
 
 
+def activation_bitset(templ_str, a_bits: np.ndarray, b_bits: np.ndarray):
+    """
+    Bitset counterpart of `is_activated` that works on activity bitsets over variants.
+    """
+    if activation_based_on[templ_str] == [0]:
+        return a_bits
+    elif activation_based_on[templ_str] == [1]:
+        return b_bits
+    elif activation_based_on[templ_str] == [0, 1]:
+        return a_bits | b_bits
+    return np.ones_like(a_bits)
+
+
 def instantiate_unary_regex(templ_str, a: str, m, n):
     return (
         regex_representations[templ_str]
@@ -85,6 +129,67 @@ def instantiate_binary_regex(templ_str, a: str, b: str):
     return res
 
 
+@lru_cache(maxsize=None)
+def template_automaton(
+    templ_str, cardinality=1, depth=None
+) -> tuple[list[dict[str, int]], list[bool]]:
+    """
+    Builds a deterministic automaton for the regex of a template.
+
+    The automaton reads the symbols "a" and, for binary templates, "b" for the operands
+    and "c" for any other activity. Its states are the classes of prefixes that are
+    accepted with the same suffixes of up to `depth` symbols. By default these are at
+    least `cardinality + 1` symbols, which distinguishes the states of the (small)
+    automata of all templates, including the counting states of unary templates.
+
+    Args:
+        templ_str (str): The template.
+        cardinality (int): The cardinality of unary templates.
+        depth (int): The maximum length of the suffixes that distinguish states
+            (optional).
+
+    Returns:
+        tuple[list[dict[str, int]], list[bool]]: The transitions from every state for
+        every symbol and whether every state is accepting. State 0 is the initial state.
+    """
+    if depth is None:
+        depth = max(4, cardinality + 1)
+    if templ_str in unary_strings:
+        symbols = "ac"
+
+        def accepts(string):
+            return RegexChecker.check_unary_regex(
+                templ_str, "a", cardinality, cardinality, string
+            )
+
+    else:
+        symbols = "abc"
+
+        def accepts(string):
+            return RegexChecker.check_binary_regex(templ_str, "a", "b", string)
+
+    suffixes = [
+        "".join(suffix)
+        for length in range(depth + 1)
+        for suffix in product(symbols, repeat=length)
+    ]
+
+    def signature(prefix):
+        return tuple(accepts(prefix + suffix) for suffix in suffixes)
+
+    states = {signature(""): 0}
+    prefixes = [""]
+    transitions = []
+    for prefix in prefixes:
+        transitions.append({})
+        for symbol in symbols:
+            state = states.setdefault(signature(prefix + symbol), len(prefixes))
+            if state == len(prefixes):
+                prefixes.append(prefix + symbol)
+            transitions[-1][symbol] = state
+    return transitions, [accepts(prefix) for prefix in prefixes]
+
+
 def replace_with_hierarchy(activity, string, event_hierarchy, activity_map):
     for low, high in event_hierarchy.items():
         if low in activity_map and high == activity:
@@ -92,6 +197,24 @@ def replace_with_hierarchy(activity, string, event_hierarchy, activity_map):
     return string
 
 
+# Read-only state of a parallel discovery run, handed to every worker process once
+_discovery_worker_state = None
+
+
+def _init_discovery_worker(state):
+    global _discovery_worker_state
+    _discovery_worker_state = state
+
+
+def _discover_item_set_shard(item_sets):
+    checker, discovery_args = _discovery_worker_state
+    return [
+        atom
+        for item_set in item_sets
+        for atom in checker.discover_item_set(item_set, **discovery_args)
+    ]
+
+
 class RegexChecker:
     def __init__(self, process, event_log: EventLog, event_hierarchy: dict = None):
         self.process = process
@@ -101,26 +224,13 @@ class RegexChecker:
         self.signal_query_builder = SignalQueryBuilder()
 
     def _map_activities_to_letters(self, activities):
-        # List of single letters A-Z
-        letters = list(string.ascii_uppercase) + list(string.ascii_lowercase[2:])
-
-        # If there are more than 50 activities get all possible combinations of 4 letters
-        if len(activities) > len(letters):
-            letters = [
-                f"{letters[idx1]}a{letters[idx2]}a{letters[idx3]}a{letters[idx4]}"
-                for idx1 in range(len(letters))
-                for idx2 in range(len(letters))
-                for idx3 in range(len(letters))
-                for idx4 in range(len(letters))
-            ]
-
-        # Create a mapping dictionary
-        activity_to_letter = {
-            activity: letters[i] for i, activity in enumerate(activities)
+        # Each activity is encoded as a single Unicode code point from the private use
+        # areas, so the mapping is O(n), a symbol can never clash with the placeholder
+        # letters of the regex templates and character classes such as `[^a]` stay valid
+        return {
+            activity: encode_activity(i) for i, activity in enumerate(activities)
         }
 
-        return activity_to_letter
-
     def create_variant_frame_with_duration(self, activity_map):
         variant_frame = self.create_variant_frame_from_log(activity_map)
         variant_frame["durations"] = variant_frame["variant tuple"].apply(
@@ -129,18 +239,17 @@ class RegexChecker:
         return variant_frame
 
     def create_variant_frame_from_log(self, activity_map):
-        variants = self.log.trace_variants
-        data = {"variant tuple": list(variants.keys())}
+        index = self.log.variant_index
+        data = {"variant tuple": index.variants}
         variant_frame = DataFrame(data)
         variant_frame["enc_variant_string"] = variant_frame["variant tuple"].apply(
             lambda x: "".join([activity_map[activity] for activity in x])
         )
-        variant_frame["variant_frequency"] = variant_frame["variant tuple"].apply(
-            lambda x: len(variants[x])
-        )
-        variant_frame["case_ids"] = variant_frame["variant tuple"].apply(
-            lambda x: variants[x]
-        )
+        variant_frame["variant_frequency"] = index.frequencies
+        case_ids = self.log.case_index.case_ids
+        variant_frame["case_ids"] = [
+            case_ids[cases].tolist() for cases in index.variant_cases
+        ]
         return variant_frame
 
     def compute_satisfaction(
@@ -212,6 +321,88 @@ class RegexChecker:
             return ds
         return None
 
+    def compute_satisfaction_matrix(
+        self,
+        process_atoms: List[ProcessAtom],
+        variant_frame: DataFrame,
+        activity_map: dict,
+        consider_vacuity: bool = True,
+    ) -> np.ndarray:
+        """
+        Computes the satisfaction of all process atoms for all variants of the variant frame.
+
+        Args:
+            process_atoms (List[ProcessAtom]): The process atoms to check.
+            variant_frame (DataFrame): The variant frame created with `activity_map`.
+            activity_map (dict): The mapping of activities to their encoding.
+            consider_vacuity (bool): Whether vacuously satisfied variants count as satisfied.
+
+        Returns:
+            np.ndarray: A boolean matrix of shape (variants, atoms). Atoms that cannot be
+            checked are treated as satisfied by every variant.
+        """
+        satisfaction = np.ones((len(variant_frame), len(process_atoms)), dtype=bool)
+        for i, atom in enumerate(process_atoms):
+            atom_satisfaction = self.compute_satisfaction(
+                atom, variant_frame, activity_map, consider_vacuity
+            )
+            if atom_satisfaction is not None:
+                satisfaction[:, i] = atom_satisfaction.to_numpy(dtype=bool)
+        return satisfaction
+
+    @staticmethod
+    def get_case_variant_ids(variant_frame: DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Flattens the case ids of the variant frame.
+
+        Args:
+            variant_frame (DataFrame): The variant frame.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The case ids in variant order and, for each
+            case, the row position of its variant in the variant frame.
+        """
+        case_ids = np.array(
+            [case_id for cases in variant_frame["case_ids"] for case_id in cases],
+            dtype=object,
+        )
+        variant_ids = np.repeat(
+            np.arange(len(variant_frame)),
+            variant_frame["case_ids"].apply(len).to_numpy(dtype=int),
+        )
+        return case_ids, variant_ids
+
+    def compute_violation_matrix(
+        self, process_atoms: List[ProcessAtom], consider_vacuity=True
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Checks all process atoms against all cases of the event log at once.
+
+        The atoms are evaluated once per variant and the resulting variants-by-atoms
+        matrix is broadcast to the cases through their variant ids.
+
+        Args:
+            process_atoms (List[ProcessAtom]): The process atoms to check.
+            consider_vacuity (bool): Whether vacuously satisfied cases count as satisfied.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The case ids and a boolean matrix of shape
+            (cases, atoms) that is True where a case violates an atom.
+        """
+        atom_activities = {
+            operand for atom in process_atoms for operand in atom.operands
+        }
+        activities = list(
+            dict.fromkeys(self.log.unique_activities() + sorted(atom_activities))
+        )
+        activity_map = self._map_activities_to_letters(activities)
+        variant_frame = self.create_variant_frame_from_log(activity_map)
+        satisfaction = self.compute_satisfaction_matrix(
+            process_atoms, variant_frame, activity_map, consider_vacuity
+        )
+        case_ids, variant_ids = self.get_case_variant_ids(variant_frame)
+        return case_ids, ~satisfaction[variant_ids]
+
     def compute_activation(
         self, process_atom: ProcessAtom, variant_frame: DataFrame, activity_map: dict
     ):
@@ -235,6 +426,30 @@ class RegexChecker:
             )
         return None
 
+    def create_activity_bitsets(
+        self, variant_frame: DataFrame, activity_map: dict[str, str]
+    ) -> dict[str, np.ndarray]:
+        """
+        Computes for every activity a bitset over the variants of the variant frame.
+
+        Args:
+            variant_frame (DataFrame): The variant frame created with `activity_map`.
+            activity_map (dict[str, str]): The mapping of activities to their encoding.
+
+        Returns:
+            dict[str, np.ndarray]: For every activity, a boolean array that is True for
+            the variants that contain the activity.
+        """
+        activity_of_symbol = {symbol: activity for activity, symbol in activity_map.items()}
+        bitsets = {
+            activity: np.zeros(len(variant_frame), dtype=bool)
+            for activity in activity_map
+        }
+        for i, enc_variant_string in enumerate(variant_frame["enc_variant_string"]):
+            for symbol in set(enc_variant_string):
+                bitsets[activity_of_symbol[symbol]][i] = True
+        return bitsets
+
     def discover_binary(
         self,
         variant_frame: DataFrame,
@@ -244,43 +459,46 @@ class RegexChecker:
         consider_vacuity: bool,
         min_support: float,
         atoms: list[ProcessAtom],
+        activity_bitsets: dict[str, np.ndarray] = None,
     ):
-        variant_frame["activation"] = variant_frame["enc_variant_string"].apply(
-            lambda x: is_activated(
-                template, activity_map[item_set[0]], activity_map[item_set[1]], x
+        if activity_bitsets is None:
+            activity_bitsets = self.create_activity_bitsets(variant_frame, activity_map)
+        a, b = activity_map[item_set[0]], activity_map[item_set[1]]
+        a_bits, b_bits = activity_bitsets[item_set[0]], activity_bitsets[item_set[1]]
+        frequencies = variant_frame["variant_frequency"].to_numpy()
+        enc_variant_strings = variant_frame["enc_variant_string"].to_numpy()
+
+        activation = activation_bitset(template, a_bits, b_bits)
+        num_activations = frequencies[activation].sum()
+        if num_activations == 0:
+            return
+        # Variants that contain neither operand are all decided the same way by vacuity,
+        # so the regex only runs once for them
+        contains_operand = a_bits | b_bits
+        satisfaction = np.zeros(len(variant_frame), dtype=bool)
+        if consider_vacuity and not contains_operand.all():
+            satisfaction[~contains_operand] = self.check_binary_regex(
+                template, a, b, enc_variant_strings[np.argmin(contains_operand)]
             )
-        )
-        variant_frame["satisfaction"] = variant_frame["enc_variant_string"].apply(
-            lambda x: self.check_binary_regex(
-                template, activity_map[item_set[0]], activity_map[item_set[1]], x
+        to_check = contains_operand if consider_vacuity else activation
+        # upper bound on the support before any variant is checked
+        max_satisfactions = frequencies[to_check].sum() + frequencies[satisfaction].sum()
+        if max_satisfactions == 0 or max_satisfactions / len(self.log) < min_support:
+            return
+        for i in np.flatnonzero(to_check):
+            satisfaction[i] = self.check_binary_regex(
+                template, a, b, enc_variant_strings[i]
             )
-        )
-        variant_frame["satisfied_when_activated"] = (
-            variant_frame["satisfaction"] & variant_frame["activation"]
-        )
+
+        satisfied_when_activated = satisfaction & activation
         if not consider_vacuity:
-            variant_frame["satisfaction"] = variant_frame["satisfied_when_activated"]
-        num_satisfactions = (
-            variant_frame["variant_frequency"]
-            .where(variant_frame["satisfaction"])
-            .sum()
-        )
-        num_satisfactions_when_activated = (
-            variant_frame["variant_frequency"]
-            .where(variant_frame["satisfied_when_activated"])
-            .sum()
-        )
-        support = num_satisfactions / len(self.log)
-        num_activations = (
-            variant_frame["variant_frequency"].where(variant_frame["activation"]).sum()
-        )
-        if (consider_vacuity and num_activations == 0) or num_satisfactions == 0:
+            satisfaction = satisfied_when_activated
+        num_satisfactions = frequencies[satisfaction].sum()
+        num_satisfactions_when_activated = frequencies[satisfied_when_activated].sum()
+        if num_satisfactions == 0:
             return
-        confidence = (
-            num_satisfactions_when_activated / num_activations
-            if num_activations > 0
-            else 0.0
-        )
+        support = float(num_satisfactions / len(self.log))
+        confidence = float(num_satisfactions_when_activated / num_activations)
         if support >= min_support:
             ops = [item_set[0], item_set[1]]
             atom_str = f"{template}[{item_set[0]}, {item_set[1]}] | | |"
@@ -320,36 +538,34 @@ class RegexChecker:
         consider_vacuity: bool,
         min_support: float,
         atoms: list[ProcessAtom],
+        activity_bitsets: dict[str, np.ndarray] = None,
     ):
+        if activity_bitsets is None:
+            activity_bitsets = self.create_activity_bitsets(variant_frame, activity_map)
+        a = activity_map[item_set[0]]
+        a_bits = activity_bitsets[item_set[0]]
+        frequencies = variant_frame["variant_frequency"].to_numpy()
+        enc_variant_strings = variant_frame["enc_variant_string"].to_numpy()
         for i in [1]:
-            variant_frame["satisfaction"] = variant_frame["enc_variant_string"].apply(
-                lambda x: self.check_unary_regex(
-                    template, activity_map[item_set[0]], i, i, x
+            # Variants without the activity are all decided the same way, so the regex
+            # only runs once for them
+            satisfaction = np.zeros(len(variant_frame), dtype=bool)
+            if not a_bits.all():
+                satisfaction[~a_bits] = self.check_unary_regex(
+                    template, a, i, i, enc_variant_strings[np.argmin(a_bits)]
                 )
-            )
-            variant_frame["activation"] = variant_frame["enc_variant_string"].apply(
-                lambda x: is_activated(template, activity_map[item_set[0]], None, x)
-            )
-            num_satisfactions = (
-                variant_frame["variant_frequency"]
-                .where(variant_frame["satisfaction"])
-                .sum()
-            )
+            for j in np.flatnonzero(a_bits):
+                satisfaction[j] = self.check_unary_regex(
+                    template, a, i, i, enc_variant_strings[j]
+                )
+            activation = activation_bitset(template, a_bits, None)
+            num_satisfactions = frequencies[satisfaction].sum()
             if num_satisfactions == 0:
                 continue
-            support = num_satisfactions / len(self.log)
-            num_activations = (
-                variant_frame["variant_frequency"]
-                .where(variant_frame["activation"])
-                .sum()
-            )
+            support = float(num_satisfactions / len(self.log))
+            num_activations = frequencies[activation].sum()
             confidence = (
-                variant_frame["variant_frequency"]
-                .where(variant_frame["satisfaction"])
-                .sum()
-                / num_activations
-                if num_activations > 0
-                else 0
+                float(num_satisfactions / num_activations) if num_activations > 0 else 0
             )
             if support >= min_support:
                 ops = [item_set[0]]
@@ -391,61 +607,118 @@ class RegexChecker:
         min_support=0.0,
         consider_vacuity=True,
         get_result=False,
+        n_jobs=1,
     ) -> list[ProcessAtom]:
         atoms = []
         if considered_templates is None:
             return atoms
         self.d4py.compute_frequent_itemsets(
-            min_support=min_support, len_itemset=2, algorithm="apriori"
+            min_support=min_support, len_itemset=2, algorithm="pairs"
         )
         activities = self.log.unique_activities()
         activity_map = self._map_activities_to_letters(activities)
         variant_frame = self.create_variant_frame_from_log(activity_map)
-        item_sets = self.d4py.frequent_item_sets["itemsets"]
+        activity_bitsets = self.create_activity_bitsets(variant_frame, activity_map)
+        discovery_args = {
+            "considered_templates": considered_templates,
+            "variant_frame": variant_frame,
+            "activity_map": activity_map,
+            "activity_bitsets": activity_bitsets,
+            "consider_vacuity": consider_vacuity,
+            "min_support": min_support,
+        }
+        item_sets = [
+            list(item_set) for item_set in self.d4py.frequent_item_sets["itemsets"]
+        ]
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        if n_jobs is not None and n_jobs > 1 and len(item_sets) > 1:
+            return self._run_parallel(item_sets, discovery_args, n_jobs)
         for item_set in tqdm(item_sets):
-            item_set = list(item_set)
-            atoms_per_item_set = []
-            for template in considered_templates:
-                if (
-                    len(item_set) == 2
-                    and template in binary_strings
-                    and item_set[0] != item_set[1]
-                ):
-                    self.discover_binary(
-                        variant_frame,
-                        item_set,
-                        template,
-                        activity_map,
-                        consider_vacuity,
-                        min_support,
-                        atoms_per_item_set,
-                    )
-                    self.discover_binary(
-                        variant_frame,
-                        item_set[::-1],
-                        template,
-                        activity_map,
-                        consider_vacuity,
-                        min_support,
-                        atoms_per_item_set,
-                    )
+            atoms.extend(self.discover_item_set(item_set, **discovery_args))
+        return atoms
 
-                if len(item_set) == 1 and template in unary_strings:
-                    self.discover_unary(
-                        variant_frame,
-                        item_set,
-                        template,
-                        activity_map,
-                        consider_vacuity,
-                        min_support,
-                        atoms_per_item_set,
-                    )
-            # TODO apply the pruning strategy based on
-            # * number of activations
-            # * hierarchy of the templates
-            atoms.extend(atoms_per_item_set)
+    def _run_parallel(
+        self, item_sets: list[list[str]], discovery_args: dict, n_jobs: int
+    ) -> list[ProcessAtom]:
+        """
+        Shards the item sets into contiguous chunks and discovers them in worker processes.
+
+        The checker and the discovery arguments are handed to every worker once, which
+        shares them copy-on-write when the fork start method is available. Shards are
+        collected in order, so the atoms are returned in the same order as in a serial run.
+        """
+        start_methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+        num_shards = min(len(item_sets), n_jobs * 4)
+        bounds = np.linspace(0, len(item_sets), num_shards + 1).astype(int)
+        shards = [item_sets[s:e] for s, e in zip(bounds[:-1], bounds[1:])]
+        atoms = []
+        with ctx.Pool(
+            processes=n_jobs,
+            initializer=_init_discovery_worker,
+            initargs=((self, discovery_args),),
+        ) as pool:
+            for shard_atoms in tqdm(
+                pool.imap(_discover_item_set_shard, shards), total=len(shards)
+            ):
+                atoms.extend(shard_atoms)
         return atoms
 
+    def discover_item_set(
+        self,
+        item_set: list[str],
+        considered_templates: list[str],
+        variant_frame: DataFrame,
+        activity_map: dict[str, str],
+        activity_bitsets: dict[str, np.ndarray],
+        consider_vacuity: bool,
+        min_support: float,
+    ) -> list[ProcessAtom]:
+        atoms_per_item_set = []
+        for template in considered_templates:
+            if (
+                len(item_set) == 2
+                and template in binary_strings
+                and item_set[0] != item_set[1]
+            ):
+                self.discover_binary(
+                    variant_frame,
+                    item_set,
+                    template,
+                    activity_map,
+                    consider_vacuity,
+                    min_support,
+                    atoms_per_item_set,
+                    activity_bitsets,
+                )
+                self.discover_binary(
+                    variant_frame,
+                    item_set[::-1],
+                    template,
+                    activity_map,
+                    consider_vacuity,
+                    min_support,
+                    atoms_per_item_set,
+                    activity_bitsets,
+                )
+
+            if len(item_set) == 1 and template in unary_strings:
+                self.discover_unary(
+                    variant_frame,
+                    item_set,
+                    template,
+                    activity_map,
+                    consider_vacuity,
+                    min_support,
+                    atoms_per_item_set,
+                    activity_bitsets,
+                )
+        # TODO apply the pruning strategy based on
+        # * number of activations
+        # * hierarchy of the templates
+        return atoms_per_item_set
+
     @staticmethod
     def check_unary_regex(templ_str, a, m, n, string) -> bool:
         # unary constraints are always activated -> there is no need to check for activation here
@@ -496,6 +769,32 @@ class RegexChecker:
             return max(0, dur - limit)
         raise ValueError("Invalid function")
 
+    def check_time_constraint_violations(
+        self, atom: ProcessAtom, function, limit, unit
+    ) -> Series:
+        """
+        Check the time constraint for all cases of the log at once.
+
+        Args:
+            atom (ProcessAtom): The atom to check.
+            function (str): The function to check (e.g., "min", "max").
+            limit (int): The limit to check against.
+            unit (str): The unit of the limit (e.g., "s", "m", "h").
+
+        Returns:
+            Series: For each case ID, 0 if the constraint is satisfied, the time
+            difference otherwise. NaN for cases in which an operand does not occur.
+        """
+        dur = self.log.inter_activity_durations(atom.operands[0], atom.operands[1])
+        dur = dur / time_factors[unit] if unit in time_factors else dur
+        if function == "min":
+            violation = np.maximum(0, limit - dur)
+        elif function == "max":
+            violation = np.maximum(0, dur - limit)
+        else:
+            raise ValueError("Invalid function")
+        return Series(violation, index=self.log.case_index.case_ids)
+
     def check(
         self, process_atoms: List[ProcessAtom], consider_vacuity=True
     ) -> List[Violation]:
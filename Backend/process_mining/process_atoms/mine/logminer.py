@@ -21,6 +21,7 @@ class LogMiner:
         local=False,
         d4py=False,
         consider_vacuity=True,
+        n_jobs=1,
     ) -> list[ProcessAtom]:
         if local:
             if d4py:
@@ -33,6 +34,7 @@ class LogMiner:
             considered_templates,
             min_support=min_support,
             consider_vacuity=consider_vacuity,
+            n_jobs=n_jobs,
         )
 
     def mine_directly_from_log(
@@ -43,7 +45,7 @@ class LogMiner:
     ) -> list[ProcessAtom]:
         d4py = Declare(self.log)
         d4py.compute_frequent_itemsets(
-            min_support=min_support, len_itemset=2, algorithm="apriori"
+            min_support=min_support, len_itemset=2, algorithm="pairs"
         )
         res = d4py.discovery(
             consider_vacuity=consider_vacuity,
@@ -93,10 +95,12 @@ class LogMiner:
         considered_templates: list[str] = None,
         min_support=0.0,
         consider_vacuity=True,
+        n_jobs=1,
     ) -> list[ProcessAtom]:
         checker = RegexChecker(self.process, self.log)
         return checker.run(
             considered_templates=considered_templates,
             min_support=min_support,
             consider_vacuity=consider_vacuity,
+            n_jobs=n_jobs,
         )
@@ -1,11 +1,17 @@
 from __future__ import annotations
 import json
+import warnings
+from collections import deque
+from typing import Optional
 from uuid import uuid4
 
 from process_mining.process_atoms.mine.bpmnconstraints.compiler.bpmn_compiler import Compiler
 from process_mining.process_atoms.mine.bpmnconstraints.parser.bpmn_parser import Parser
 from process_mining.process_atoms.mine.conversion.bpmnjsonanalyzer import parse_model_elements
-from process_mining.process_atoms.mine.conversion.variantgenerator import VariantGenerator
+from process_mining.process_atoms.mine.conversion.variantgenerator import (
+    VariantGenerator,
+    activity_sequences_to_event_log,
+)
 from process_mining.process_atoms.mine.declare.enums.mp_constants import (
     Template,
     activation_based_on,
@@ -13,7 +19,11 @@ from process_mining.process_atoms.mine.declare.enums.mp_constants import (
     unary_strings,
 )
 from process_mining.process_atoms.mine.declare.parsers.decl_parser import parse_single_constraint
-from process_mining.process_atoms.mine.declare.regexchecker import RegexChecker
+from process_mining.process_atoms.mine.declare.regexchecker import (
+    RegexChecker,
+    template_automaton,
+)
+from process_mining.process_atoms.models import petri
 from process_mining.process_atoms.models.processatom import ProcessAtom
 from process_mining.process_atoms.utils import reduce_redundancies, remove_useless_atoms
 
@@ -62,21 +72,41 @@ class ModelMiner:
         )
 
     def mine_with_petri(
-        self, considered_templates: list[str] = None
+        self, considered_templates: list[str] = None, structural: bool = False
     ) -> list[ProcessAtom]:
-        variant_log = self.variant_generator.extract_variants()
-        if variant_log is None:
-            return []
-        regex_checker = RegexChecker(self.model_id, variant_log)
-        process_atoms = regex_checker.run(
-            considered_templates=considered_templates, consider_vacuity=True
+        """
+        Mines the atoms that hold (with support and confidence 1) in every variant of the
+        model's Petri net.
+
+        By default the variants are played out and checked. With `structural=True` the
+        atoms are derived from the reachability graph of the net instead, so that the
+        variants are never enumerated (see `mine_structurally`). If the reachability
+        graph is too large, e.g. because the net is unbounded, the variants are played
+        out after all. If the playout stops early, a warning is issued, since the atoms
+        are then only checked on the variants found so far.
+        """
+        process_atoms = (
+            self.mine_structurally(considered_templates) if structural else None
         )
-        # only keep atoms with support of 1
-        process_atoms = [
-            atom
-            for atom in process_atoms
-            if atom.support == 1 and atom.attributes["confidence"] == 1
-        ]
+        if process_atoms is None:
+            variant_log = self.variant_generator.extract_variants()
+            if not self.variant_generator.playout_complete:
+                warnings.warn(
+                    f"The playout of model {self.model_id} is incomplete, the mined "
+                    "atoms may not hold on all of its variants"
+                )
+            if variant_log is None:
+                return []
+            regex_checker = RegexChecker(self.model_id, variant_log)
+            process_atoms = regex_checker.run(
+                considered_templates=considered_templates, consider_vacuity=True
+            )
+            # only keep atoms with support of 1
+            process_atoms = [
+                atom
+                for atom in process_atoms
+                if atom.support == 1 and atom.attributes["confidence"] == 1
+            ]
         if len(process_atoms) == 0:
             return []
         process_atoms = remove_useless_atoms(process_atoms)
@@ -87,6 +117,71 @@ class ModelMiner:
             atom.providers = [self.model_id]
         return process_atoms
 
+    def mine_structurally(
+        self, considered_templates: list[str] = None, max_states=100000
+    ) -> Optional[list[ProcessAtom]]:
+        """
+        Derives the atoms with support and confidence 1 from the reachability graph of
+        the model's Petri net, without enumerating its variants.
+
+        Candidates are mined from a small witness log: a shortest run through every edge
+        of the graph and a run for every pair of co-occurring activities, so that every
+        activity and pair is considered. Every candidate is then checked on all runs with
+        the product of the graph and the automaton of its template.
+
+        Unlike the playout, loops are not bounded, i.e. the atoms hold for any number of
+        iterations. Returns `None` if the graph has more than `max_states` states.
+        """
+        pn, im, fm = self.variant_generator.converter.convert_from_parsed(
+            self.follows, self.labels
+        )
+        graph = petri.reachability_graph(pn, im, fm, max_states=max_states)
+        if not graph.complete:
+            print(f"Reachability graph exceeds {max_states} states")
+            return None
+        if graph.final < 0:
+            return []
+        activities = [
+            (
+                _sanitize_activity(self.variant_generator.activity_label(t.label))
+                if t.label is not None
+                else None
+            )
+            for t in graph.net.transitions
+        ]
+        edges = _edges_to_final(
+            len(graph.markings),
+            graph.final,
+            [
+                (source, activities[transition], target)
+                for source, transition, target in zip(
+                    graph.sources.tolist(),
+                    graph.transitions.tolist(),
+                    graph.targets.tolist(),
+                )
+            ],
+        )
+        witness_log = activity_sequences_to_event_log(
+            _witness_runs(len(graph.markings), graph.final, edges)
+        )
+        if witness_log is None:
+            return []
+        candidates = [
+            atom
+            for atom in RegexChecker(self.model_id, witness_log).run(
+                considered_templates=considered_templates, consider_vacuity=True
+            )
+            if atom.support == 1 and atom.attributes["confidence"] == 1
+        ]
+        successors = [[] for _ in graph.markings]
+        for source, activity, target in edges:
+            successors[source].append((activity, target))
+        return [
+            atom
+            for atom in candidates
+            if _holds_on_all_runs(atom, successors, graph.final)
+        ]
+
     def mine(self, considered_templates: list[str] = None) -> list[ProcessAtom]:
         res = Parser(
             bpmn=self.model_obj, is_file=False, transitivity=True, sanitize=True
@@ -138,3 +233,147 @@ class ModelMiner:
         atom_objects = remove_useless_atoms(atom_objects)
         atom_objects = reduce_redundancies(atom_objects)
         return atom_objects
+
+
+def _sanitize_activity(activity: Optional[str]) -> Optional[str]:
+    # labels of event types are sanitized like in `EventLog`
+    if activity is None:
+        return None
+    return str(activity).replace("[", "(").replace("]", ")").replace("|", " ")
+
+
+def _edges_to_final(num_states, final, edges):
+    # Returns the edges of the states from which the final state can be reached
+    predecessors = [[] for _ in range(num_states)]
+    for source, _, target in edges:
+        predecessors[target].append(source)
+    to_final = {final}
+    stack = [final]
+    while stack:
+        for source in predecessors[stack.pop()]:
+            if source not in to_final:
+                to_final.add(source)
+                stack.append(source)
+    return [edge for edge in edges if edge[0] in to_final and edge[2] in to_final]
+
+
+def _witness_runs(num_states, final, edges) -> list[list[str]]:
+    """
+    Returns activity sequences of runs from the initial state (0) to the final state:
+    a shortest run through every edge and, for every pair of activities that occur in a
+    common run, a run with both. `edges` must only contain states on such runs.
+    """
+    successors = [[] for _ in range(num_states)]
+    predecessors = [[] for _ in range(num_states)]
+    for i, (source, _, target) in enumerate(edges):
+        successors[source].append(i)
+        predecessors[target].append(i)
+
+    def forward_tree(starts):
+        # edge through which every state is first reached from one of the `starts`
+        tree = {start: None for start in starts}
+        queue = deque(starts)
+        while queue:
+            for i in successors[queue.popleft()]:
+                if edges[i][2] not in tree:
+                    tree[edges[i][2]] = i
+                    queue.append(edges[i][2])
+        return tree
+
+    def path_to(tree, state):
+        # edges from a start of the forward tree to `state`
+        path = []
+        while tree[state] is not None:
+            path.append(tree[state])
+            state = edges[tree[state]][0]
+        return path[::-1]
+
+    # edge through which the final state is reached first from every state
+    to_final = {final: None}
+    queue = deque([final])
+    while queue:
+        for i in predecessors[queue.popleft()]:
+            if edges[i][0] not in to_final:
+                to_final[edges[i][0]] = i
+                queue.append(edges[i][0])
+
+    def path_from(state):
+        path = []
+        while to_final[state] is not None:
+            path.append(to_final[state])
+            state = edges[to_final[state]][2]
+        return path
+
+    def activities(path):
+        return tuple(edges[i][1] for i in path if edges[i][1] is not None)
+
+    from_initial = forward_tree([0])
+    runs = set()
+    for i, (source, _, target) in enumerate(edges):
+        runs.add(activities(path_to(from_initial, source) + [i] + path_from(target)))
+    # the empty run, if the final state can be reached with silent transitions only
+    silent = {0}
+    stack = [0]
+    while stack:
+        for i in successors[stack.pop()]:
+            if edges[i][1] is None and edges[i][2] not in silent:
+                silent.add(edges[i][2])
+                stack.append(edges[i][2])
+    if final in silent:
+        runs.add(())
+
+    # runs for pairs of activities that occur in a common run, but in no run so far
+    covered = {(a, b) for run in runs for a in run for b in run}
+    activity_edges = {}
+    for i, (_, activity, _) in enumerate(edges):
+        if activity is not None:
+            activity_edges.setdefault(activity, []).append(i)
+    for a, a_edges in activity_edges.items():
+        after_a = forward_tree([edges[i][2] for i in a_edges])
+        # an edge with activity `a` into every start state of the tree
+        a_edge_into = {edges[i][2]: i for i in a_edges}
+        for b, b_edges in activity_edges.items():
+            if (a, b) in covered:
+                continue
+            for j in b_edges:
+                if edges[j][0] not in after_a:
+                    continue
+                middle = path_to(after_a, edges[j][0])
+                i = a_edge_into[edges[middle[0]][0] if middle else edges[j][0]]
+                run = activities(
+                    path_to(from_initial, edges[i][0])
+                    + [i]
+                    + middle
+                    + [j]
+                    + path_from(edges[j][2])
+                )
+                runs.add(run)
+                covered.update((x, y) for x in run for y in run)
+                break
+    return [list(run) for run in sorted(runs)]
+
+
+def _holds_on_all_runs(atom: ProcessAtom, successors, final) -> bool:
+    # Checks the atom on all runs from the initial state (0) to the final state with the
+    # product of the graph and the automaton of the atom's template
+    transitions, accepting = template_automaton(atom.atom_type, atom.cardinality)
+    symbols = dict(zip(atom.operands, "ab"))
+    start = (0, 0)
+    visited = {start}
+    stack = [start]
+    while stack:
+        state, automaton_state = stack.pop()
+        if state == final:
+            if not accepting[automaton_state]:
+                return False
+            continue
+        for activity, target in successors[state]:
+            next_automaton_state = (
+                automaton_state
+                if activity is None
+                else transitions[automaton_state][symbols.get(activity, "c")]
+            )
+            if (target, next_automaton_state) not in visited:
+                visited.add((target, next_automaton_state))
+                stack.append((target, next_automaton_state))
+    return True
@@ -1,11 +1,13 @@
 from __future__ import annotations
+import json
 from dataclasses import dataclass
-from typing import Any, Iterable, Iterator, Mapping, Union, overload
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, Optional, Union, overload
 from typing import Dict, Type
 
 import numpy as np
 import pandas as pd
-from pydantic import BaseModel, model_serializer, model_validator
+from pydantic import BaseModel, TypeAdapter, model_serializer, model_validator
 
 from process_mining.process_atoms.models.column_types import (
     COLUMN_TYPES,
@@ -180,6 +182,116 @@ class Case:
         return self.events[self.schema.get_event_column(EventType)].tolist()
 
 
+@dataclass
+class CaseIndex:
+    """
+    Offset index (CSR layout) over the events of an event log, which are sorted by case:
+    the events of case `i` are the rows `offsets[i]:offsets[i + 1]` of the events data
+    frame. Cases are enumerated in the order of their events (i.e. sorted by case ID).
+    """
+
+    # Case ID of each case
+    case_ids: pd.Index
+    # Position of each case in the cases data frame
+    case_positions: np.ndarray
+    # Offset of the first event of each case, followed by the number of events
+    offsets: np.ndarray
+    # Case of each event
+    event_cases: np.ndarray
+    # Activity labels and the code (position in `activities`) of each event's activity
+    activities: pd.Index
+    activity_codes: np.ndarray
+    # Timestamp of each event in nanoseconds since the epoch (UTC)
+    timestamps: np.ndarray
+
+    @property
+    def case_starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def case_lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def get_case(self, case_id) -> int:
+        """
+        Return the number of the case with ID `case_id`.
+
+        Raise a `KeyError` if there is no such case.
+        """
+        return self.case_ids.get_loc(case_id)
+
+    def case_slice(self, case: int) -> slice:
+        """
+        Return the slice of the events of a case.
+        """
+        return slice(self.offsets[case], self.offsets[case + 1])
+
+    def activity_code(self, activity) -> int:
+        """
+        Return the code of an activity, or -1 if it does not occur in the log.
+        """
+        return self.activities.get_indexer([activity])[0]
+
+    def first_occurrences(self, activity) -> np.ndarray:
+        """
+        Return for every case the position of the first event with `activity`, or -1 if
+        the activity does not occur in the case.
+        """
+        first = np.full(len(self.case_ids), -1, dtype=np.int64)
+        code = self.activity_code(activity)
+        if code < 0:
+            return first
+        positions = np.flatnonzero(self.activity_codes == code)
+        # events are sorted, so the first position of each case is its first occurrence
+        cases, first_positions = np.unique(
+            self.event_cases[positions], return_index=True
+        )
+        first[cases] = positions[first_positions]
+        return first
+
+
+@dataclass
+class VariantIndex:
+    """
+    Index of the trace variants of an event log. Cases are numbered as in the
+    `CaseIndex` of the log and variant ids are assigned in the order of the first case
+    of each variant.
+    """
+
+    # Activity sequence of each variant
+    variants: list[tuple]
+    # Variant id of each case
+    case_variants: np.ndarray
+    # Number of cases of each variant
+    frequencies: np.ndarray
+    # Cases of each variant, in case order
+    variant_cases: list[np.ndarray]
+
+
+@dataclass
+class CaseView:
+    """
+    Lightweight view of a case, as yielded by `EventLog.iter_cases`. The event data are
+    NumPy slices into arrays of the whole log, i.e. nothing is copied per case.
+    """
+
+    # Position of the case in the cases data frame
+    position: int
+    # Case-level attributes
+    attributes: Mapping[str, Any]
+    # Activities and timestamps of the case's events, in order
+    activities: np.ndarray
+    timestamps: np.ndarray
+    # Selected event attributes of the case's events
+    event_attributes: Mapping[str, np.ndarray]
+
+    def __len__(self):
+        return len(self.activities)
+
+    def get_activity_sequence(self):
+        return self.activities.tolist()
+
+
 def _get_first_column_of_type(
     coltypes: Dict[str, _ColumnType], C: Type[ColumnType], error=False
 ) -> str:
@@ -194,6 +306,142 @@ def _get_first_column_of_type(
             return None
 
 
+def _sort_codes(values: pd.Series) -> np.ndarray:
+    """
+    Return integer codes that sort like `values`, with missing values last.
+    """
+    codes, _ = pd.factorize(values, sort=True, use_na_sentinel=False)
+    return codes
+
+
+_COLUMNAR_VERSION = 1
+_COLUMNAR_MANIFEST = "manifest.json"
+_COLUMN_TYPE_ADAPTER = TypeAdapter(ColumnType)
+
+
+def _write_array(directory: Path, name: str, values: np.ndarray) -> str:
+    file = f"{name}.npy"
+    np.save(directory / file, values, allow_pickle=False)
+    return file
+
+
+def _write_column(directory: Path, name: str, column: pd.Series) -> Dict[str, Any]:
+    """
+    Write a column as a `.npy` file and return its manifest entry.
+    """
+    dtype = column.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        # stored as UTC, the time zone is restored when reading
+        values = column.dt.tz_convert(None).to_numpy()
+        return {
+            "kind": "datetime",
+            "file": _write_array(directory, name, values),
+            "tz": str(dtype.tz),
+        }
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        return {
+            "kind": "array",
+            "file": _write_array(directory, name, column.to_numpy()),
+        }
+
+    codes, labels = pd.factorize(column)
+    # the smallest signed integer type that fits all codes
+    codes = codes.astype(np.min_scalar_type(-len(labels) - 1))
+    labels_file = f"{name}.labels.json"
+    try:
+        with open(directory / labels_file, "w") as f:
+            json.dump(labels.tolist(), f)
+    except TypeError as e:
+        raise ValueError(f"Column {column.name} can not be stored: {e}") from e
+    return {
+        "kind": "dictionary",
+        "file": _write_array(directory, name, codes),
+        "labels": labels_file,
+    }
+
+
+def _read_column(
+    directory: Path, entry: Dict[str, Any], mmap_mode: Optional[str]
+) -> pd.Series:
+    values = np.load(directory / entry["file"], mmap_mode=mmap_mode)
+    if entry["kind"] == "dictionary":
+        with open(directory / entry["labels"]) as f:
+            labels = json.load(f)
+        values = pd.Categorical.from_codes(values, categories=labels, validate=False)
+    elif entry["kind"] == "datetime":
+        unit, _ = np.datetime_data(values.dtype)
+        return pd.Series(
+            values.view(np.int64),
+            dtype=pd.DatetimeTZDtype(unit=unit, tz=entry["tz"]),
+            copy=False,
+        )
+    return pd.Series(values, copy=False)
+
+
+def _write_frame(directory: Path, table: str, frame: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Write the index and the columns of a data frame and return its manifest entry.
+    """
+    index = frame.index
+    if isinstance(index, pd.MultiIndex):
+        index_entry = {
+            "names": list(index.names),
+            "levels": [
+                _write_array(directory, f"{table}.index.{i}.levels", level.to_numpy())
+                for i, level in enumerate(index.levels)
+            ],
+            "codes": [
+                _write_array(directory, f"{table}.index.{i}.codes", codes)
+                for i, codes in enumerate(index.codes)
+            ],
+        }
+    else:
+        index_entry = {
+            "name": index.name,
+            "values": _write_array(directory, f"{table}.index", index.to_numpy()),
+        }
+    columns = []
+    for i, name in enumerate(frame.columns):
+        entry = _write_column(directory, f"{table}.{i}", frame[name])
+        entry["name"] = name
+        columns.append(entry)
+    return {"index": index_entry, "columns": columns}
+
+
+def _read_frame(
+    directory: Path, entry: Dict[str, Any], mmap_mode: Optional[str]
+) -> pd.DataFrame:
+    index_entry = entry["index"]
+    if "levels" in index_entry:
+        index = pd.MultiIndex(
+            levels=[
+                np.load(directory / file, mmap_mode=mmap_mode)
+                for file in index_entry["levels"]
+            ],
+            codes=[
+                np.load(directory / file, mmap_mode=mmap_mode)
+                for file in index_entry["codes"]
+            ],
+            names=index_entry["names"],
+            verify_integrity=False,
+        )
+    else:
+        index = pd.Index(
+            np.load(directory / index_entry["values"], mmap_mode=mmap_mode),
+            name=index_entry["name"],
+            copy=False,
+        )
+    frame = pd.DataFrame(
+        {
+            column["name"]: _read_column(directory, column, mmap_mode)
+            for column in entry["columns"]
+        },
+        copy=False,
+    )
+    # the columns have a default index, which is replaced without aligning them
+    return frame.set_axis(index) if len(entry["columns"]) else pd.DataFrame(index=index)
+
+
 @dataclass
 class EventLog:
     """
@@ -213,10 +461,7 @@ class EventLog:
     ):
         self.cases = cases
         self.events = events
-        self._unique_activities = None
-        self._activity_counts = None
-        self._trace_variant_durations = None
-        self._trace_variants = None
+        self._clear_caches()
 
         # Use the data to instantiate the `ColumnType`s
         if isinstance(schema, EventLogSchemaTypes):
@@ -226,38 +471,60 @@ class EventLog:
         else:
             self.schema = schema
 
+        case_col: str = self.schema.get_event_column(CaseID)
+        time_col: str = self.schema.get_event_column(EventTime)
+        activity_col: str = self.schema.get_event_column(EventType)
+
         # For performance reasons and so that code working with `EventLog` can make some
-        # assumptions, we create a multi-level index on the events and also sort them by
-        # time.
+        # assumptions, we sort the events by case id and event time and create a
+        # multi-level index on them. The case ids of the events are factorized once, their
+        # order and position in the cases are only looked up for the unique ids.
+        case_codes, case_uniques = pd.factorize(
+            self.events[case_col], use_na_sentinel=False
+        )
+        case_ranks = _sort_codes(pd.Series(case_uniques))[case_codes]
+        time_codes = _sort_codes(self.events[time_col])
+        # A single stable sort on a combined integer key. Already sorted events (e.g.
+        # of a sub-log) are not copied.
+        order = np.argsort(
+            case_ranks * (time_codes.max(initial=0) + 1) + time_codes, kind="stable"
+        )
+        if np.any(order[1:] < order[:-1]):
+            self.events = self.events.take(order)
+            case_codes = case_codes[order]
+
         # If an index with the correct name is already there, we assume we don't need to
         # reindex the event log
         if not self.events.index.names == ["case_id", "event_id"]:
-            # Sort events by time before creating an index
-            self.events = self.events.sort_values(
-                self.schema.get_event_column(EventTime)
-            )
-
             # Create integer IDs for cases and events. Using the (string) case and event IDs
             # is not performant, as building the index requires sorting values.
-            case_id_col: str = self.schema.get_case_column(CaseID)
-            case_ids_orig = self.cases[case_id_col]
-            case_ids = np.arange(len(self.cases))
-            event_ids = np.arange(len(self.events))
-            id_to_i = {
-                case_id: i for (case_id, i) in zip(case_ids_orig, range(1000000000))
-            }
-            case_ids_events = self.events[self.schema.get_event_column(CaseID)].map(
-                id_to_i
+            case_ids_orig = pd.Index(self.cases[self.schema.get_case_column(CaseID)])
+            # as in a mapping of case ids, the last case with a given id wins
+            unique_cases = ~case_ids_orig.duplicated(keep="last")
+            positions = case_ids_orig[unique_cases].get_indexer(case_uniques)
+            positions = np.where(
+                positions >= 0, np.flatnonzero(unique_cases)[positions], -1
             )
+            case_ids_events = positions[case_codes]
+            event_ids = np.arange(len(self.events))
 
             # Set index for cases
-            self.cases = self.cases.set_index(case_ids)
-            self.cases.index.rename("case_id", inplace=True)
+            self.cases = self.cases.set_axis(
+                pd.Index(np.arange(len(self.cases)), name="case_id")
+            )
 
             # Set multi-level index on case ID and event ID. This allows efficiently
             # getting all events for a case.
-            self.events = self.events.set_index([case_ids_events, event_ids])
-            self.events.index.rename(["case_id", "event_id"], inplace=True)
+            # The integer IDs are used as codes directly, events of unknown cases get a
+            # missing case ID.
+            self.events = self.events.set_axis(
+                pd.MultiIndex(
+                    levels=[np.arange(len(self.cases)), event_ids],
+                    codes=[case_ids_events, event_ids],
+                    names=["case_id", "event_id"],
+                    verify_integrity=False,
+                )
+            )
 
         # Change name of case ID column to not conflict with index
         if "case_id" in self.cases.columns:
@@ -272,21 +539,29 @@ class EventLog:
             self.events.rename(columns={"event_id": "_event_id"}, inplace=True)
             self.schema.events["_event_id"] = self.schema.events["event_id"]
             del self.schema.events["event_id"]
-        # sanitize labels for Event Type
-        self.events[self.schema.get_event_column(EventType)] = (
-            self.events[self.schema.get_event_column(EventType)]
+        # sanitize labels for Event Type. Only the unique labels are processed and then
+        # mapped back to the events.
+        codes, labels = pd.factorize(self.events[activity_col])
+        labels = (
+            pd.Series(labels, dtype=object)
             .str.replace("[", "(")
             .str.replace("]", ")")
             .str.replace("|", " ")
+            .to_numpy()
         )
-        # sort events by case id and event time
-        self.events = self.events.sort_values(
-            [
-                self.schema.get_event_column(CaseID),
-                self.schema.get_event_column(EventTime),
-            ]
+        self.events[activity_col] = np.where(
+            codes >= 0, labels.take(codes, mode="clip"), np.nan
         )
 
+    def _clear_caches(self):
+        self._unique_activities = None
+        self._activity_counts = None
+        self._trace_variant_durations = None
+        self._trace_variants = None
+        self._case_index = None
+        self._variant_index = None
+        self._occurrence_timestamps = {}
+
     @overload
     def __getitem__(self, i: Union[int, str]) -> Case:
         ...
@@ -356,6 +631,60 @@ class EventLog:
     def __iter__(self):
         return _EventLogIterator(self)
 
+    def iter_cases(
+        self,
+        event_attributes: Iterable[str] = (),
+        case_attributes: Iterable[str] = None,
+    ) -> Iterator[CaseView]:
+        """
+        Iterate over the cases (in the same order as iterating over the log) without
+        building a `Case` with its events data frame for every case.
+
+        Args:
+            event_attributes (Iterable[str]): The event attributes to include in the
+                views, besides activities and timestamps.
+            case_attributes (Iterable[str]): The case attributes to include in the views
+                (default all).
+
+        Yields:
+            CaseView: A view of each case.
+        """
+        index = self.case_index
+        activities = self.events[self.schema.get_event_column(EventType)].to_numpy()
+        timestamps = index.timestamps.view("datetime64[ns]")
+        event_columns = {
+            attribute: self.events[attribute].to_numpy()
+            for attribute in event_attributes
+        }
+        if case_attributes is None:
+            case_attributes = self.cases.columns
+        case_columns = {
+            attribute: self.cases[attribute].to_numpy() for attribute in case_attributes
+        }
+
+        # case of the case index for each position in the cases data frame, cases
+        # without events get an empty slice
+        has_events = index.case_positions >= 0
+        starts = np.zeros(len(self.cases), dtype=np.int64)
+        ends = np.zeros(len(self.cases), dtype=np.int64)
+        starts[index.case_positions[has_events]] = index.case_starts[has_events]
+        ends[index.case_positions[has_events]] = index.offsets[1:][has_events]
+
+        for position, (si, ei) in enumerate(zip(starts.tolist(), ends.tolist())):
+            yield CaseView(
+                position=position,
+                attributes={
+                    attribute: column[position]
+                    for attribute, column in case_columns.items()
+                },
+                activities=activities[si:ei],
+                timestamps=timestamps[si:ei],
+                event_attributes={
+                    attribute: column[si:ei]
+                    for attribute, column in event_columns.items()
+                },
+            )
+
     def __repr__(self):
         return (
             f"EventLog(\n    cases = (DataFrame with {len(self.cases)} cases)),\n    "
@@ -379,6 +708,97 @@ class EventLog:
         schema = case.schema
         return EventLog(pd.DataFrame(case_attributes), pd.concat(events), schema)
 
+    @classmethod
+    def from_arrow(
+        cls,
+        cases,
+        events,
+        schema: Union[EventLogSchema, EventLogSchemaTypes],
+    ):
+        """
+        Construct an `EventLog` from Arrow tables (e.g. `pyarrow.Table`s read from Parquet
+        or Feather files).
+
+        The columns are converted without consolidating them into blocks, so numeric and
+        timestamp columns without missing values are not copied.
+        """
+        return cls(
+            cases.to_pandas(split_blocks=True),
+            events.to_pandas(split_blocks=True),
+            schema,
+        )
+
+    def save_columnar(self, path: Union[str, Path]):
+        """
+        Write the event log to the directory `path` in a columnar format that can be
+        opened with `EventLog.from_columnar`.
+
+        Every column (and index level) is stored as a `.npy` file, described by a small
+        JSON manifest that also contains the schema. Numeric, boolean and timestamp
+        columns are stored as they are, all other columns are dictionary-encoded into
+        integer codes and a JSON list of labels.
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": _COLUMNAR_VERSION,
+            "schema": {
+                "cases": {
+                    col: coltype.model_dump(mode="json")
+                    for (col, coltype) in self.schema.cases.items()
+                },
+                "events": {
+                    col: coltype.model_dump(mode="json")
+                    for (col, coltype) in self.schema.events.items()
+                },
+            },
+            "cases": _write_frame(directory, "cases", self.cases),
+            "events": _write_frame(directory, "events", self.events),
+        }
+        # the manifest is written last, so that an incomplete log can not be opened
+        with open(directory / _COLUMNAR_MANIFEST, "w") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def from_columnar(
+        cls, path: Union[str, Path], mmap_mode: Optional[str] = "r"
+    ) -> "EventLog":
+        """
+        Open an event log written with `EventLog.save_columnar`.
+
+        The columns are memory-mapped (see `numpy.load`), so opening a log does not read
+        its data and processes that open the same log share its pages. Dictionary-encoded
+        columns are opened as `pd.Categorical`s on top of the memory-mapped codes. With
+        the default `mmap_mode="r"` the data frames are read-only, use `mmap_mode="c"`
+        to modify them in memory or `None` to read the log into memory.
+
+        The stored data are already sorted, indexed and sanitized, so they are not
+        processed again.
+        """
+        directory = Path(path)
+        with open(directory / _COLUMNAR_MANIFEST) as f:
+            manifest = json.load(f)
+        if manifest["version"] != _COLUMNAR_VERSION:
+            raise ValueError(
+                f"Unsupported columnar event log version {manifest['version']}"
+            )
+
+        log = cls.__new__(cls)
+        log.cases = _read_frame(directory, manifest["cases"], mmap_mode)
+        log.events = _read_frame(directory, manifest["events"], mmap_mode)
+        log.schema = EventLogSchema(
+            cases={
+                col: _COLUMN_TYPE_ADAPTER.validate_python(coltype)
+                for (col, coltype) in manifest["schema"]["cases"].items()
+            },
+            events={
+                col: _COLUMN_TYPE_ADAPTER.validate_python(coltype)
+                for (col, coltype) in manifest["schema"]["events"].items()
+            },
+        )
+        log._clear_caches()
+        return log
+
     def unique_activities(self):
         if self._unique_activities is not None:
             return self._unique_activities
@@ -401,132 +821,224 @@ class EventLog:
             .to_dict()
         )
 
+    @property
+    def case_index(self) -> CaseIndex:
+        if self._case_index is not None:
+            return self._case_index
+        case_ids = self.events[self.schema.get_event_column(CaseID)]
+        # dictionary-encoded (e.g. memory-mapped) case ids are compared by their codes
+        case_keys = (
+            case_ids.cat.codes.to_numpy()
+            if isinstance(case_ids.dtype, pd.CategoricalDtype)
+            else case_ids.to_numpy()
+        )
+        activity_codes, activities = pd.factorize(
+            self.events[self.schema.get_event_column(EventType)],
+            use_na_sentinel=False,
+        )
+
+        # events are sorted by case, so every case is a contiguous block of events
+        boundaries = np.ones(len(case_keys), dtype=bool)
+        boundaries[1:] = case_keys[1:] != case_keys[:-1]
+        case_starts = np.flatnonzero(boundaries)
+        offsets = np.append(case_starts, len(case_keys))
+
+        self._case_index = CaseIndex(
+            case_ids=pd.Index(case_ids.iloc[case_starts].to_numpy()),
+            case_positions=self.cases.index.get_indexer(
+                self.events.index.get_level_values(0)[case_starts]
+            ),
+            offsets=offsets,
+            event_cases=np.repeat(np.arange(len(case_starts)), np.diff(offsets)),
+            activities=activities,
+            activity_codes=activity_codes,
+            timestamps=np.asarray(
+                self.events[self.schema.get_event_column(EventTime)].array,
+                dtype="datetime64[ns]",
+            ).view(np.int64),
+        )
+        return self._case_index
+
+    @property
+    def variant_index(self) -> VariantIndex:
+        if self._variant_index is not None:
+            return self._variant_index
+        case_index = self.case_index
+        activity_codes = case_index.activity_codes
+        activities = case_index.activities.to_numpy()
+        offsets = case_index.offsets.tolist()
+
+        # hash the int-coded activity sequence of every case into a variant id
+        variant_ids = {}
+        case_variants = np.empty(len(case_index.case_ids), dtype=np.int64)
+        for i, (si, ei) in enumerate(zip(offsets[:-1], offsets[1:])):
+            case_variants[i] = variant_ids.setdefault(
+                activity_codes[si:ei].tobytes(), len(variant_ids)
+            )
+        # variant ids are assigned in order of the first case of each variant
+        _, first_cases = np.unique(case_variants, return_index=True)
+        variants = [
+            tuple(activities[activity_codes[case_index.case_slice(case)]])
+            for case in first_cases
+        ]
+        frequencies = np.bincount(case_variants, minlength=len(variants))
+        variant_cases = np.split(
+            np.argsort(case_variants, kind="stable"), np.cumsum(frequencies)[:-1]
+        )
+
+        self._variant_index = VariantIndex(
+            variants=variants,
+            case_variants=case_variants,
+            frequencies=frequencies,
+            variant_cases=variant_cases,
+        )
+        return self._variant_index
+
+    def get_case_activities(self, case_id) -> np.ndarray:
+        """
+        Return the activities of the events of a case, in order.
+        """
+        index = self.case_index
+        codes = index.activity_codes[index.case_slice(index.get_case(case_id))]
+        return index.activities.to_numpy()[codes]
+
+    def get_case_timestamps(self, case_id) -> np.ndarray:
+        """
+        Return the timestamps of the events of a case (as a view on the case index).
+        """
+        index = self.case_index
+        return index.timestamps[index.case_slice(index.get_case(case_id))].view(
+            "datetime64[ns]"
+        )
+
     def activity_sequences(self):
-        cases = self.events[self.schema.get_event_column(CaseID)].to_numpy()
-        activities = self.events[self.schema.get_event_column(EventType)].to_numpy()
-        _, c_ind, c_counts = np.unique(cases, return_index=True, return_counts=True)
-        activity_sequences = []
-        for i in range(len(c_ind)):
-            si = c_ind[i]
-            ei = si + c_counts[i]
-            acts = tuple(activities[si:ei])
-            activity_sequences.append(acts)
-        return activity_sequences
+        index = self.variant_index
+        return [index.variants[v] for v in index.case_variants]
 
     @property
     def trace_variants(self):
         if self._trace_variants is not None:
             return self._trace_variants
-        cases = self.events[self.schema.get_event_column(CaseID)].to_numpy()
-        activities = self.events[self.schema.get_event_column(EventType)].to_numpy()
-
-        c_unq, c_ind, c_counts = np.unique(cases, return_index=True, return_counts=True)
-        variants = {}
-
-        for i in range(len(c_ind)):
-            si = c_ind[i]
-            ei = si + c_counts[i]
-            acts = tuple(activities[si:ei])
-            if acts not in variants:
-                variants[acts] = [c_unq[i]]
-            else:
-                variants[acts].append(c_unq[i])
-        self._trace_variants = variants
-        return variants
+        index = self.variant_index
+        case_ids = self.case_index.case_ids
+        self._trace_variants = {
+            variant: case_ids[cases].tolist()
+            for variant, cases in zip(index.variants, index.variant_cases)
+        }
+        return self._trace_variants
 
     @property
     def trace_variant_durations(self):
         if self._trace_variant_durations is not None:
             return self._trace_variant_durations
-        cases = self.events[self.schema.get_event_column(CaseID)].to_numpy()
-        activities = self.events[self.schema.get_event_column(EventType)].to_numpy()
-        timestamps = self.events[self.schema.get_event_column(EventTime)].to_numpy()
-
-        c_unq, c_ind, c_counts = np.unique(cases, return_index=True, return_counts=True)
-        variants = {}
-
-        for i in range(len(c_ind)):
-            si = c_ind[i]
-            ei = si + c_counts[i]
-            acts = tuple(activities[si:ei])
-            if acts not in variants:
-                # add duration in seconds
-                variants[acts] = [int(timestamps[ei - 1] - timestamps[si])]
-            else:
-                variants[acts].append(int(timestamps[ei - 1] - timestamps[si]))
-        self._trace_variant_durations = variants
-        return variants
+        index = self.variant_index
+        case_index = self.case_index
+        # duration of every case in nanoseconds
+        durations = (
+            case_index.timestamps[case_index.offsets[1:] - 1]
+            - case_index.timestamps[case_index.case_starts]
+        )
+        self._trace_variant_durations = {
+            variant: durations[cases].tolist()
+            for variant, cases in zip(index.variants, index.variant_cases)
+        }
+        return self._trace_variant_durations
 
     def get_inter_activity_duration(self, case_id, a, b):
-        this_case = self.events[
-            self.events[self.schema.get_event_column(CaseID)] == case_id
-        ][self.schema.get_event_column(CaseID)].to_numpy()
-        activities = self.events[
-            self.events[self.schema.get_event_column(CaseID)] == case_id
-        ][self.schema.get_event_column(EventType)].to_numpy()
-        timestamps = self.events[
-            self.events[self.schema.get_event_column(CaseID)] == case_id
-        ][self.schema.get_event_column(EventTime)].to_numpy()
-        c_unq, c_ind, c_counts = np.unique(
-            this_case, return_index=True, return_counts=True
-        )
-        if len(c_ind) == 0:
-            print(f"Case {case_id} not found. {len(c_ind)}")
+        index = self.case_index
+        try:
+            events = index.case_slice(index.get_case(case_id))
+        except KeyError:
+            print(f"Case {case_id} not found.")
             return 0
-        si = c_ind[0]
-        ei = si + c_counts[0]
-        acts = tuple(activities[si:ei])
-        # get index of activity a
-        a_ind = [i for i, act in enumerate(acts) if act == a]
-        # get index of activity b
-        b_ind = [i for i, act in enumerate(acts) if act == b]
+        activity_codes = index.activity_codes[events]
+        timestamps = index.timestamps[events]
+        # get the first index of activities a and b
+        a_ind = np.flatnonzero(activity_codes == index.activity_code(a))
+        b_ind = np.flatnonzero(activity_codes == index.activity_code(b))
         # check if both activities are in the trace
         if len(a_ind) > 0 and len(b_ind) > 0:
-            # get the first index of activity a
-            a_ind = a_ind[0]
-            # get the first index of activity b
-            b_ind = b_ind[0]
-            # check if activity b is after activity a
-            if a_ind < b_ind:
-                # get duration
-                return int(timestamps[si + b_ind] - timestamps[si + a_ind])
-            else:
-                return int(timestamps[si + a_ind] - timestamps[si + b_ind])
+            return abs(int(timestamps[b_ind[0]] - timestamps[a_ind[0]]))
 
-    def activity_pair_durations(self, a, b):
-        cases = self.events[self.schema.get_event_column(CaseID)].to_numpy()
-        activities = self.events[self.schema.get_event_column(EventType)].to_numpy()
-        timestamps = self.events[self.schema.get_event_column(EventTime)].to_numpy()
-
-        c_unq, c_ind, c_counts = np.unique(cases, return_index=True, return_counts=True)
-        durations = []
-
-        for i in range(len(c_ind)):
-            si = c_ind[i]
-            ei = si + c_counts[i]
-            acts = tuple(activities[si:ei])
-            # get index of activity a
-            a_ind = [i for i, act in enumerate(acts) if act == a]
-            # get index of activity b
-            b_ind = [i for i, act in enumerate(acts) if act == b]
-            # check if both activities are in the trace
-            if len(a_ind) > 0 and len(b_ind) > 0:
-                # get the first index of activity a
-                a_ind = a_ind[0]
-                # get the first index of activity b
-                b_ind = b_ind[0]
-                # check if activity b is after activity a
-                if a_ind < b_ind:
-                    # add duration in seconds
-                    durations.append(
-                        int(timestamps[si + b_ind] - timestamps[si + a_ind])
-                    )
-                else:
-                    durations.append(
-                        int(timestamps[si + a_ind] - timestamps[si + b_ind])
-                    )
+    def inter_activity_durations(self, a, b) -> np.ndarray:
+        """
+        Compute for all cases at once the duration between the first occurrences of
+        activities `a` and `b` (as `get_inter_activity_duration`).
+
+        Returns:
+            np.ndarray: The duration in nanoseconds for every case of the case index,
+            NaN for cases in which `a` or `b` does not occur.
+        """
+        index = self.case_index
+        first_a = index.first_occurrences(a)
+        first_b = index.first_occurrences(b)
+        durations = np.full(len(index.case_ids), np.nan)
+        both = (first_a >= 0) & (first_b >= 0)
+        durations[both] = np.abs(
+            index.timestamps[first_b[both]] - index.timestamps[first_a[both]]
+        )
+        return durations
+
+    def occurrence_timestamps(self, last: bool = False) -> np.ndarray:
+        """
+        Return a cases x activities matrix with the timestamp of the first (or, with
+        `last`, the last) occurrence of each activity in each case. Rows follow the cases
+        of the case index and columns its activities, activities that do not occur in a
+        case are NaT. The matrix is built once and cached.
+        """
+        if last in self._occurrence_timestamps:
+            return self._occurrence_timestamps[last]
+        index = self.case_index
+        num_activities = len(index.activities)
+        keys = index.event_cases * num_activities + index.activity_codes
+        if last:
+            # the first occurrences in the reversed events are the last ones
+            _, positions = np.unique(keys[::-1], return_index=True)
+            positions = len(keys) - 1 - positions
+        else:
+            _, positions = np.unique(keys, return_index=True)
+        # column-major, so that the column of an activity is contiguous
+        matrix = np.full(
+            (len(index.case_ids), num_activities),
+            np.datetime64("NaT", "ns"),
+            order="F",
+        )
+        matrix[index.event_cases[positions], index.activity_codes[positions]] = (
+            index.timestamps[positions].view("datetime64[ns]")
+        )
+        self._occurrence_timestamps[last] = matrix
+        return matrix
+
+    def pair_durations(
+        self, pairs: Iterable[tuple[str, str]]
+    ) -> Dict[tuple[str, str], np.ndarray]:
+        """
+        Compute the durations between the first occurrences of many activity pairs at
+        once (as `activity_pair_durations`), as differences of the columns of the
+        first-occurrence matrix.
+
+        Returns:
+            dict[tuple[str, str], np.ndarray]: The durations in nanoseconds of each pair,
+            for the cases in which both activities occur.
+        """
+        pairs = list(pairs)
+        matrix = self.occurrence_timestamps()
+        columns = self.case_index.activities.get_indexer(
+            [activity for pair in pairs for activity in pair]
+        )
+        durations = {}
+        for pair, a_col, b_col in zip(pairs, columns[::2], columns[1::2]):
+            if a_col < 0 or b_col < 0:
+                durations[pair] = np.empty(0, dtype=np.int64)
+                continue
+            pair_durations = matrix[:, b_col] - matrix[:, a_col]
+            pair_durations = pair_durations[~np.isnat(pair_durations)]
+            durations[pair] = np.abs(pair_durations.astype(np.int64))
         return durations
 
+    def activity_pair_durations(self, a, b):
+        return self.pair_durations([(a, b)])[(a, b)].tolist()
+
     def get_avg_duration(self) -> float:
         # group events by case id then get the difference between the first and last timestamp of each case, finally get the mean and return it as a float in seconds
         return (
@@ -557,6 +1069,11 @@ def split_on_case_attribute(self, attribute: str) -> Dict[str, EventLog]:
     """
     Split the event log on a case attribute.
 
+    The events are grouped with a single stable reordering of the parent's events, so
+    that the events of every sub-log are one contiguous block. The sub-logs are slices
+    of the reordered data frames (and keep the case and event index of the parent), no
+    data is copied per sub-log.
+
     Args:
         attribute (str): The case attribute to split on.
 
@@ -564,18 +1081,30 @@ def split_on_case_attribute(self, attribute: str) -> Dict[str, EventLog]:
         dict[str, EventLog]: A dictionary mapping the unique values of the case attribute
         to the corresponding event logs.
     """
-    unique_values = self.cases[attribute].unique()
+    case_groups, values = pd.factorize(self.cases[attribute], use_na_sentinel=False)
+    case_order = np.argsort(case_groups, kind="stable")
+    case_bounds = np.searchsorted(case_groups[case_order], np.arange(len(values) + 1))
+    cases = self.cases.take(case_order)
+
+    # group of every event, events of unknown cases are dropped
+    index = self.case_index
+    event_groups = np.full(len(self.events), len(values), dtype=np.int64)
+    has_case = index.case_positions[index.event_cases] >= 0
+    event_groups[has_case] = case_groups[
+        index.case_positions[index.event_cases[has_case]]
+    ]
+    # stable, so the events stay sorted by case and time within every group
+    event_order = np.argsort(event_groups, kind="stable")
+    event_bounds = np.searchsorted(
+        event_groups[event_order], np.arange(len(values) + 1)
+    )
+    events = self.events.take(event_order)
+
     split_logs = {}
-    for value in unique_values:
-        mask = self.cases[attribute] == value
-        cases = self.cases[mask]
-        case_ids = cases[self.schema.get_case_column(CaseID)].values
-        events = self.events.loc[
-            self.events[self.schema.get_event_column(CaseID)].isin(case_ids)
-        ]
+    for group, value in enumerate(values):
         split_logs[value] = EventLog(
-            cases=cases.copy(deep=True),
-            events=events.copy(deep=True),
+            cases=cases.iloc[case_bounds[group] : case_bounds[group + 1]],
+            events=events.iloc[event_bounds[group] : event_bounds[group + 1]],
             schema=self.schema,
         )
     return split_logs
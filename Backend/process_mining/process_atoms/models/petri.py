@@ -4,14 +4,17 @@ import random
 import time
 from collections import Counter
 from copy import copy, deepcopy
+from dataclasses import dataclass
 from typing import Collection, Optional, Set
 
+import numpy as np
+
 
 class Marking(Counter):
     pass
 
     def __hash__(self):
-        return frozenset(self).__hash__()
+        return frozenset(self.items()).__hash__()
 
     def __eq__(self, other):
         if not self.keys() == other.keys():
@@ -333,7 +336,316 @@ def add_arc_from_to(fr, to, net: PetriNet, weight=1) -> Arc:
     return a
 
 
-def net_variants(net, initial_marking, final_marking, time_out=1, max_loop=3):
+@dataclass
+class Playout:
+    """
+    Result of playing out a net with `net_playout`.
+    """
+
+    # Label sequences of the runs from the initial to the final marking
+    variants: Set[tuple]
+    # Whether all reachable states were explored, i.e. `variants` contains every
+    # variant of the net (with transitions fired at most `max_loop` times)
+    complete: bool
+    # Number of explored states
+    states: int
+
+
+def _sorted_by_name(elements) -> list:
+    return sorted(elements, key=lambda e: str(e.name))
+
+
+class CompiledNet:
+    """
+    Matrix form of a Petri net for playing the token game on NumPy arrays.
+
+    Places and transitions are sorted by name and numbered. `pre[t, p]` is the number of
+    tokens transition `t` consumes from place `p` and `post[t, p]` the number of tokens
+    it produces. A marking is an int vector over the places, several markings are the
+    rows of a matrix.
+    """
+
+    def __init__(self, net: PetriNet, places: Collection[Place] = ()):
+        # additional places, e.g. of markings, that are not part of the net
+        self.places = _sorted_by_name(set(net.places) | set(places))
+        self.place_index = {p: i for i, p in enumerate(self.places)}
+        self.transitions = _sorted_by_name(net.transitions)
+        self.pre = np.zeros((len(self.transitions), len(self.places)), dtype=np.int32)
+        self.post = np.zeros_like(self.pre)
+        for i, t in enumerate(self.transitions):
+            for a in t.in_arcs:
+                self.pre[i, self.place_index[a.source]] += a.weight
+            for a in t.out_arcs:
+                self.post[i, self.place_index[a.target]] += a.weight
+        # A transition is enabled if no input place has fewer tokens than the arc weight.
+        # The missing inputs are counted with one matrix product per distinct weight.
+        self._weight_arcs = [
+            (weight, (self.pre == weight).T.astype(np.float32))
+            for weight in np.unique(self.pre[self.pre > 0]).tolist()
+        ]
+
+    @property
+    def incidence(self) -> np.ndarray:
+        return self.post - self.pre
+
+    def marking_vector(self, marking: Marking) -> np.ndarray:
+        vector = np.zeros(len(self.places), dtype=np.int32)
+        for p, tokens in marking.items():
+            vector[self.place_index[p]] += tokens
+        return vector
+
+    def marking(self, vector: np.ndarray) -> Marking:
+        return Marking({self.places[p]: int(vector[p]) for p in np.flatnonzero(vector)})
+
+    def enabled(self, markings: np.ndarray) -> np.ndarray:
+        """
+        Return a boolean array with the transitions that are enabled in a marking, or a
+        matrix with one row per marking if `markings` is a matrix.
+        """
+        missing = np.zeros(
+            np.shape(markings)[:-1] + (len(self.transitions),), dtype=np.float32
+        )
+        for weight, arcs in self._weight_arcs:
+            missing += (markings < weight).astype(np.float32) @ arcs
+        return missing == 0
+
+    def fire(self, markings: np.ndarray, transitions) -> np.ndarray:
+        """
+        Return the markings after firing `transitions` (one per marking row) without
+        checking whether they are enabled.
+        """
+        return markings - self.pre[transitions] + self.post[transitions]
+
+
+@dataclass
+class _TraceTrie:
+    """
+    Partial traces of a playout as nodes of a prefix tree, node 0 is the empty trace.
+    """
+
+    labels: list
+    parents: list
+    label_codes: list
+    children: dict
+
+    @classmethod
+    def empty(cls, labels: list) -> "_TraceTrie":
+        return cls(labels=labels, parents=[-1], label_codes=[-1], children={})
+
+    def extend(self, nodes: np.ndarray, label_codes: np.ndarray) -> np.ndarray:
+        """
+        Return the nodes of the traces `nodes` extended by a label each, code -1 (a
+        silent transition) keeps the trace.
+        """
+        extended = nodes.copy()
+        labeled = label_codes >= 0
+        keys = nodes[labeled].astype(np.int64) * len(self.labels) + label_codes[labeled]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        children = np.empty(len(unique_keys), dtype=nodes.dtype)
+        for i, key in enumerate(unique_keys.tolist()):
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = len(self.parents)
+                self.parents.append(key // len(self.labels))
+                self.label_codes.append(key % len(self.labels))
+            children[i] = child
+        extended[labeled] = children[inverse]
+        return extended
+
+    def trace(self, node: int) -> tuple:
+        trace = []
+        while node > 0:
+            trace.append(self.labels[self.label_codes[node]])
+            node = self.parents[node]
+        return tuple(reversed(trace))
+
+
+# Number of states that are expanded together
+_PLAYOUT_CHUNK_SIZE = 4096
+
+
+def _row_keys(rows: np.ndarray) -> np.ndarray:
+    # the rows as byte strings, which are much faster to compare than rows (e.g. with
+    # `np.unique(axis=0)`)
+    return (
+        np.ascontiguousarray(rows)
+        .view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1])))
+        .ravel()
+    )
+
+
+def _unique_rows(rows: np.ndarray) -> np.ndarray:
+    _, first = np.unique(_row_keys(rows), return_index=True)
+    return rows[first]
+
+
+def net_playout(
+    net,
+    initial_marking,
+    final_marking,
+    max_loop=3,
+    max_states=1000000,
+    max_variants=None,
+) -> Playout:
+    """
+    Play out a WF net and collect the label sequences of its runs from the initial to the
+    final marking.
+
+    The state space is explored breadth-first on the `CompiledNet`. A state is a
+    marking, a partial trace and the number of times every transition fired, states
+    reached by several interleavings are expanded only once. Every firing increases the
+    total count by one, so equal states are always in the same layer, and the states of
+    a layer are expanded and deduplicated as arrays. The exploration stops before a
+    layer that would exceed `max_states` explored states or when `max_variants`
+    variants are found (`None` for no limit), in which case the result is not complete.
+
+    Parameters
+    ----------
+    :param net: A workflow net
+    :param initial_marking: The initial marking of the net.
+    :param final_marking: The final marking of the net.
+    :param max_loop: The maximum number of times a transition fires in a run (in case of
+        loops ensures termination).
+    :param max_states: The maximum number of states to explore.
+    :param max_variants: The maximum number of variants to collect.
+
+    Returns
+    -------
+    :return: playout: :class:`Playout` The variants and whether they are complete
+
+    """
+    compiled = CompiledNet(net, places=set(initial_marking) | set(final_marking))
+    n_places, n_transitions = len(compiled.places), len(compiled.transitions)
+    labels = sorted(
+        {t.label for t in compiled.transitions if t.label is not None}, key=str
+    )
+    label_index = {label: i for i, label in enumerate(labels)}
+    transition_labels = np.array(
+        [label_index.get(t.label, -1) for t in compiled.transitions], dtype=np.int64
+    )
+    traces = _TraceTrie.empty(labels)
+    final = compiled.marking_vector(final_marking)
+
+    # every state is a row of the marking, the firing counts and the trace node
+    states = np.zeros((1, n_places + n_transitions + 1), dtype=np.int32)
+    states[0, :n_places] = compiled.marking_vector(initial_marking)
+    explored = 1
+    final_nodes = set()
+    complete = True
+    while len(states):
+        if max_variants is not None and len(final_nodes) >= max_variants:
+            complete = False
+            break
+        successors = []
+        for chunk in range(0, len(states), _PLAYOUT_CHUNK_SIZE):
+            block = states[chunk : chunk + _PLAYOUT_CHUNK_SIZE]
+            counts = block[:, n_places:-1]
+            rows, fired = np.nonzero(
+                compiled.enabled(block[:, :n_places]) & (counts < max_loop)
+            )
+            next_states = block[rows]
+            next_states[:, :n_places] = compiled.fire(next_states[:, :n_places], fired)
+            next_states[np.arange(len(rows)), n_places + fired] += 1
+            next_states[:, -1] = traces.extend(
+                next_states[:, -1], transition_labels[fired]
+            )
+            done = (next_states[:, :n_places] == final).all(axis=1)
+            final_nodes.update(next_states[done, -1].tolist())
+            successors.append(_unique_rows(next_states[~done]))
+        states = _unique_rows(np.concatenate(successors))
+        if max_states is not None and explored + len(states) > max_states:
+            complete = False
+            break
+        explored += len(states)
+
+    variants = {traces.trace(node) for node in final_nodes}
+    return Playout(variants=variants, complete=complete, states=explored)
+
+
+@dataclass
+class ReachabilityGraph:
+    """
+    Reachability graph of a net from an initial marking, as computed by
+    `reachability_graph`.
+    """
+
+    net: CompiledNet
+    # Marking vectors of the states, state 0 is the initial marking
+    markings: np.ndarray
+    # Edges as source state, fired transition (position in `net.transitions`) and target
+    # state
+    sources: np.ndarray
+    transitions: np.ndarray
+    targets: np.ndarray
+    # State of the final marking, -1 if it is not reachable
+    final: int
+    # Whether all reachable states were explored
+    complete: bool
+
+
+def reachability_graph(
+    net, initial_marking, final_marking, max_states=1000000
+) -> ReachabilityGraph:
+    """
+    Compute the graph of the markings that are reachable from the initial marking. As in
+    `net_playout`, no transitions fire in the final marking. The exploration stops at
+    `max_states` states (`None` for no limit), in which case the graph is not complete.
+    """
+    compiled = CompiledNet(net, places=set(initial_marking) | set(final_marking))
+    final = compiled.marking_vector(final_marking)
+    markings = [compiled.marking_vector(initial_marking)]
+    states = {markings[0].tobytes(): 0}
+    sources, transitions, targets = [], [], []
+    frontier = [] if (markings[0] == final).all() else [0]
+    complete = True
+    while frontier and complete:
+        next_frontier = []
+        for chunk in range(0, len(frontier), _PLAYOUT_CHUNK_SIZE):
+            block = np.array(frontier[chunk : chunk + _PLAYOUT_CHUNK_SIZE])
+            block_markings = np.array([markings[state] for state in block])
+            rows, fired = np.nonzero(compiled.enabled(block_markings))
+            next_markings = compiled.fire(block_markings[rows], fired)
+            # only the distinct successor markings are looked up
+            keys, first, inverse = np.unique(
+                _row_keys(next_markings), return_index=True, return_inverse=True
+            )
+            next_states = np.empty(len(keys), dtype=np.int64)
+            for i, (key, row) in enumerate(zip(keys.tolist(), first.tolist())):
+                state = states.get(key)
+                if state is None:
+                    if max_states is not None and len(markings) >= max_states:
+                        complete = False
+                        break
+                    state = states[key] = len(markings)
+                    markings.append(next_markings[row])
+                    if not (next_markings[row] == final).all():
+                        next_frontier.append(state)
+                next_states[i] = state
+            if not complete:
+                break
+            sources.append(block[rows])
+            transitions.append(fired)
+            targets.append(next_states[inverse])
+        frontier = next_frontier
+    return ReachabilityGraph(
+        net=compiled,
+        markings=np.array(markings),
+        sources=np.concatenate(sources or [np.empty(0, dtype=np.int64)]),
+        transitions=np.concatenate(transitions or [np.empty(0, dtype=np.int64)]),
+        targets=np.concatenate(targets or [np.empty(0, dtype=np.int64)]),
+        final=states.get(final.tobytes(), -1),
+        complete=complete,
+    )
+
+
+def net_variants(
+    net,
+    initial_marking,
+    final_marking,
+    max_loop=3,
+    max_states=1000000,
+    max_variants=None,
+):
     """
     Given a WF net, initial and final marking extracts a set of variants (in the form of traces).
 
@@ -342,43 +654,24 @@ def net_variants(net, initial_marking, final_marking, time_out=1, max_loop=3):
     :param net: A workflow net
     :param initial_marking: The initial marking of the net.
     :param final_marking: The final marking of the net.
-    :param time_out: The maximum time to execute the algorithm (in case of loops ensures termination).
+    :param max_loop: The maximum number of times a transition fires in a variant.
+    :param max_states: The maximum number of states to explore (see `net_playout`).
+    :param max_variants: The maximum number of variants to extract.
 
     Returns
     -------
-    :return: variants: :class:`list` Set of variants - in the form of Trace objects - obtainable executing the net
+    :return: variants: :class:`set` Set of variants - in the form of label tuples - obtainable executing the net
 
     """
-    active = {(initial_marking, (), ())}
-    variants = set()
-    start_time = time.time()
-    while active:
-        curr_marking, curr_partial_trace, current_ids = active.pop()
-        curr_triple = (curr_marking, curr_partial_trace, current_ids)
-        enabled_transitions = get_enabled_transitions(net, curr_marking)
-        for transition in enabled_transitions:
-            counter_ids = Counter(current_ids)
-
-            if counter_ids[transition.name] >= max_loop:
-                continue
-
-            next_marking = execute(transition, net, curr_marking)
-            if transition.label is not None:
-                next_partial_trace = curr_partial_trace + (transition.label,)
-            else:
-                next_partial_trace = curr_partial_trace
-            next_ids = current_ids + (transition.name,)
-            next_triple = (next_marking, next_partial_trace, next_ids)
-
-            if next_marking == final_marking:
-                variants.add(next_partial_trace)
-            else:
-                # if the next marking+partial trace is different from the current one+partial trace
-                if curr_triple != next_triple:
-                    active.add(next_triple)
-        if time.time() - start_time > time_out:
-            return variants
-    return variants
+    playout = net_playout(
+        net, initial_marking, final_marking, max_loop, max_states, max_variants
+    )
+    if not playout.complete:
+        print(
+            f"Playout stopped after {playout.states} states, "
+            f"{len(playout.variants)} variants found"
+        )
+    return playout.variants
 
 
 def remove_arc(net: PetriNet, arc: Arc) -> PetriNet:
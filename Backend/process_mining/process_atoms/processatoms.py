@@ -1,5 +1,7 @@
 from __future__ import annotations
 import json
+import multiprocessing
+import os
 from typing import Callable, List
 
 from process_mining.process_atoms.match.matcher import Matcher
@@ -15,6 +17,19 @@ from process_mining.process_atoms.signalquerybuilder import SignalQueryBuilder
 from process_mining.process_atoms.utils import aggregate_process_atoms
 
 
+_context_worker_state = None
+
+
+def _init_context_worker(state):
+    global _context_worker_state
+    _context_worker_state = state
+
+
+def _mine_context(context):
+    api, sub_logs, mining_args = _context_worker_state
+    return context, api.mine_atoms_from_log(log=sub_logs[context], **mining_args)
+
+
 class ProcessAtoms:
     def __init__(self):
         self.query_builder = SignalQueryBuilder()
@@ -57,7 +72,11 @@ class ProcessAtoms:
         )
 
     def transform_bpmn_to_atoms_with_petri(
-        self, model_id: str, model_json: str, considered_templates: list[str] = None
+        self,
+        model_id: str,
+        model_json: str,
+        considered_templates: list[str] = None,
+        structural: bool = False,
     ) -> List[ProcessAtom]:
         """
         Transforms a BPMN model to process atoms.
@@ -66,13 +85,15 @@ class ProcessAtoms:
             model_id (str): The ID of the model.
             model_json (str): The JSON representation of the model.
             considered_templates: Templates to consider during mining (optional).
+            structural (bool): Derive the atoms from the reachability graph of the
+                model's Petri net instead of its variants (optional).
 
         Returns:
             List[ProcessAtom]: A list of process atoms.
         """
         model_miner = ModelMiner(model_id=model_id, model_json=model_json)
         mined_atoms = model_miner.mine_with_petri(
-            considered_templates=considered_templates
+            considered_templates=considered_templates, structural=structural
         )
         return mined_atoms
 
@@ -85,6 +106,7 @@ class ProcessAtoms:
         local=False,
         d4py=False,
         consider_vacuity=True,
+        n_jobs=1,
     ) -> List[ProcessAtom]:
         """
         Mines process atoms from a simple log (activity sequences).
@@ -93,6 +115,8 @@ class ProcessAtoms:
             model_id (str): The ID of the model.
             log: The EventLog abstraction from PINT.
             considered_templates: Templates to consider during mining (optional).
+            n_jobs (int): Number of worker processes for regex-based discovery
+                (-1 uses all cores, default 1).
 
         Returns:
             List[ProcessAtom]: A list of mined process atoms.
@@ -104,6 +128,7 @@ class ProcessAtoms:
             local=local,
             d4py=d4py,
             consider_vacuity=consider_vacuity,
+            n_jobs=n_jobs,
         )
         return aggregate_process_atoms(mined_atoms)
 
@@ -117,21 +142,52 @@ class ProcessAtoms:
         local=False,
         d4py=False,
         consider_vacuity=True,
+        n_jobs=1,
     ):
-        print(log.schema[context_attribute])
+        """
+        Mines process atoms separately for the cases of every value of a case attribute.
+
+        Args:
+            process_id (str): The ID of the process.
+            log: The EventLog abstraction from PINT.
+            context_attribute (str): The case attribute to split the log on.
+            considered_templates: Templates to consider during mining (optional).
+            n_jobs (int): Number of worker processes that mine the sub-logs in parallel
+                (-1 uses all cores, default 1).
+
+        Returns:
+            dict: The mined process atoms for every value of the context attribute.
+        """
         sub_logs = split_on_case_attribute(log, context_attribute)
+        mining_args = {
+            "process_id": process_id,
+            "considered_templates": considered_templates,
+            "min_support": min_support,
+            "local": local,
+            "d4py": d4py,
+            "consider_vacuity": consider_vacuity,
+        }
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        if n_jobs > 1 and len(sub_logs) > 1:
+            # the sub-logs are handed to every worker once, which shares them
+            # copy-on-write when the fork start method is available
+            start_methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context(
+                "fork" if "fork" in start_methods else None
+            )
+            with ctx.Pool(
+                processes=min(n_jobs, len(sub_logs)),
+                initializer=_init_context_worker,
+                initargs=((self, sub_logs, mining_args),),
+            ) as pool:
+                return dict(pool.imap(_mine_context, list(sub_logs)))
+
         context_to_atoms = {}
-        for sub_log in sub_logs:
-            atoms = self.mine_atoms_from_log(
-                process_id=process_id,
-                log=sub_log,
-                considered_templates=considered_templates,
-                min_support=min_support,
-                local=local,
-                d4py=d4py,
-                consider_vacuity=consider_vacuity,
+        for context, sub_log in sub_logs.items():
+            context_to_atoms[context] = self.mine_atoms_from_log(
+                log=sub_log, **mining_args
             )
-            context_to_atoms[sub_log.schema[context_attribute]] = atoms
         return context_to_atoms
 
     def aggregate_atoms(self, atoms: List[ProcessAtom]) -> List[ProcessAtom]:
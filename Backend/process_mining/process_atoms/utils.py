@@ -1,5 +1,3 @@
-from itertools import groupby
-from operator import attrgetter
 from typing import List
 
 import pandas as pd
@@ -37,18 +35,19 @@ def create_variant_log(log, activity_key=XES_NAME):
 def aggregate_process_atoms(
     atoms: List[ProcessAtom], att="atom_str"
 ) -> List[ProcessAtom]:
-    # group the atoms by their atom_str
-    grouped_atoms = groupby(atoms, key=attrgetter(att))
+    # group the atoms by their atom_str, in the order of their first occurrence
+    grouped_atoms = {}
+    for atom in atoms:
+        grouped_atoms.setdefault(getattr(atom, att), []).append(atom)
     aggregated_atoms = []
-    for _, group in grouped_atoms:
-        group = list(group)
+    for group in grouped_atoms.values():
         # sum the support of the atoms in the group
-        support = sum([atom.support for atom in group])
+        support = sum(atom.support for atom in group)
         # get the first atom in the group
         atom = group[0]
         # get all atom providers
         providers = list(
-            set([provider for atom in group for provider in atom.providers])
+            dict.fromkeys(provider for atom in group for provider in atom.providers)
         )
         # create a new atom with the aggregated support
         new_atom = ProcessAtom(
@@ -79,9 +78,56 @@ def remove_useless_atoms(atoms: List[ProcessAtom]) -> List[ProcessAtom]:
     ]
 
 
+def _template_families(templates) -> pd.DataFrame:
+    # the constraint families of every template, which decide what subsumes what
+    return pd.DataFrame(
+        [
+            {
+                "undirected": template not in directed_strings,
+                "succession": template == Template.SUCCESSION.templ_str,
+                "succession_family": "Not" not in template
+                and ("Succession" in template or "Co-Existence" in template),
+                "precedence_family": "Precedence" in template
+                or "Responded" in template,
+                "response_family": "Response" in template,
+                "subsumption_hierarchy": subsumption_hierarchy.get(template, 1),
+            }
+            for template in templates
+        ],
+        index=templates,
+    )
+
+
+def _strongest_in_family(atoms_df, family, considered) -> pd.Series:
+    # within every pair of operands, keep the strongest constraint of the family if
+    # there are several of them, and all constraints of the pair otherwise
+    pairs = [atoms_df["op_0"], atoms_df["op_1"]]
+    family_size = atoms_df[family].groupby(pairs).transform("sum")
+    strongest = (
+        atoms_df[considered & atoms_df[family] & (family_size > 1)]
+        .sort_values(by="subsumption_hierarchy", kind="stable")
+        .drop_duplicates(subset=["op_0", "op_1"])["id"]
+    )
+    return pd.concat([strongest, atoms_df.loc[considered & (family_size <= 1), "id"]])
+
+
 def reduce_redundancies(atoms: List[ProcessAtom]) -> List[ProcessAtom]:
-    atom_ids_to_retain = []
-    atoms_df = atoms_to_df(atoms)
+    if not atoms:
+        return []
+    atoms_df = pd.DataFrame(
+        {
+            "id": [atom.id for atom in atoms],
+            "atom_type": [atom.atom_type for atom in atoms],
+            "atom_str": [atom.atom_str for atom in atoms],
+            "op_0": [atom.operands[0] if atom.operands else "" for atom in atoms],
+            "op_1": [
+                atom.operands[1] if len(atom.operands) > 1 else "" for atom in atoms
+            ],
+            "cardinality": [atom.cardinality for atom in atoms],
+            "confidence": [atom.attributes.get("confidence", 0.0) for atom in atoms],
+            "atom": atoms,
+        }
+    ).sort_values(by="confidence", ascending=False, kind="stable")
     atoms_df = atoms_df.drop_duplicates(
         subset=["op_0", "op_1", "atom_type", "cardinality"]
     )
@@ -90,67 +136,42 @@ def reduce_redundancies(atoms: List[ProcessAtom]) -> List[ProcessAtom]:
         ~atoms_df["atom_str"].str.contains("Optional")
         & ~atoms_df["atom_str"].str.contains("This BPMN diagram")
     ]
-    atoms_df["subsumption_hierarchy"] = atoms_df["atom_type"].apply(
-        lambda x: subsumption_hierarchy[x] if x in subsumption_hierarchy else 1
+    if atoms_df.empty:
+        return []
+    families = _template_families(atoms_df["atom_type"].unique())
+    atoms_df = atoms_df.join(families, on="atom_type")
+    # if atom_type not in directed_strings, only keep one per set of operands
+    first_op = atoms_df["op_0"].where(
+        atoms_df["op_0"] <= atoms_df["op_1"], atoms_df["op_1"]
     )
-    atoms_df["op_set"] = atoms_df.apply(
-        lambda x: frozenset([x["op_0"], x["op_1"]]), axis=1
+    second_op = atoms_df["op_1"].where(
+        atoms_df["op_0"] <= atoms_df["op_1"], atoms_df["op_0"]
     )
-    # group by op_set and atom_type
-    grouped = atoms_df.groupby(["atom_type", "op_set"])
-    # if atom_type not in directed_strings, only keep one
-    for group_name, group_df in grouped:
-        if group_name[0] not in directed_strings:
-            atom_ids_to_retain.append(group_df.iloc[0]["id"])
-    # based on subsumption: if there is a stronger constraint with the same operands, remove the weaker ones
-    # group by op_1 and op 2
-    grouped = atoms_df.groupby(["op_0", "op_1"])
-
-    for group_name, group_df in grouped:
-        # check if the group contains a succession constraint if so, keep only that
-        if Template.SUCCESSION.templ_str in group_df["atom_type"].values:
-            # filter for ones that contain 'Succession' or 'Co-Existence' but not 'Not' and keep the one with the highest subsumption hierarchy level
-            succession_constraints = group_df[
-                ~group_df["atom_type"].str.contains("Not")
-                & (
-                    group_df["atom_type"].str.contains("Succession")
-                    | group_df["atom_type"].str.contains("Co-Existence")
-                )
-            ]
-            if len(succession_constraints) > 1:
-                succession_constraints = succession_constraints.sort_values(
-                    by="subsumption_hierarchy"
-                )
-                atom_ids_to_retain.append(succession_constraints.iloc[0]["id"])
-            else:
-                atom_ids_to_retain.extend(group_df["id"].values)
-        else:
-            # filter for constraints that contrain Precedence in the constraint type and keep the one with the highest subsumption hierarchy level
-            precedence_constraints = group_df[
-                group_df["atom_type"].str.contains("Precedence")
-                | group_df["atom_type"].str.contains("Responded")
-            ]
-            if len(precedence_constraints) > 1:
-                precedence_constraints = precedence_constraints.sort_values(
-                    by="subsumption_hierarchy"
-                )
-                atom_ids_to_retain.append(precedence_constraints.iloc[0]["id"])
-            else:
-                atom_ids_to_retain.extend(group_df["id"].values)
-            # filter for constraints that contrain Response in the constraint type and keep the one with the highest subsumption hierarchy level
-            response_constraints = group_df[
-                group_df["atom_type"].str.contains("Response")
-            ]
-            if len(response_constraints) > 1:
-                response_constraints = response_constraints.sort_values(
-                    by="subsumption_hierarchy"
-                )
-                atom_ids_to_retain.append(response_constraints.iloc[0]["id"])
-            else:
-                atom_ids_to_retain.extend(group_df["id"].values)
-
-    atom_ids_to_retain = list(set(atom_ids_to_retain))
-    return list(atoms_df[atoms_df["id"].isin(atom_ids_to_retain)]["atom"].values)
+    undirected = atoms_df["undirected"]
+    atom_ids_to_retain = [
+        atoms_df.loc[
+            ~pd.concat([atoms_df["atom_type"], first_op, second_op], axis=1)
+            .duplicated()
+            .values
+            & undirected,
+            "id",
+        ]
+    ]
+    # based on subsumption: if there is a stronger constraint with the same operands,
+    # remove the weaker ones. Pairs with a succession constraint keep only the
+    # strongest succession, the others their strongest precedence and response.
+    with_succession = (
+        atoms_df["succession"].groupby([atoms_df["op_0"], atoms_df["op_1"]])
+    ).transform("any")
+    atom_ids_to_retain.append(
+        _strongest_in_family(atoms_df, "succession_family", with_succession)
+    )
+    for family in ["precedence_family", "response_family"]:
+        atom_ids_to_retain.append(
+            _strongest_in_family(atoms_df, family, ~with_succession)
+        )
+    retained = atoms_df["id"].isin(pd.concat(atom_ids_to_retain))
+    return list(atoms_df.loc[retained, "atom"].values)
 
 
 def atoms_to_df(atoms: List[ProcessAtom], sort=True) -> pd.DataFrame:
@@ -178,6 +199,6 @@ def atoms_to_df(atoms: List[ProcessAtom], sort=True) -> pd.DataFrame:
         for atom in atoms
     ]
     df = pd.DataFrame.from_records(records)
-    if not sort:
+    if not sort or df.empty:
         return df
     return df.sort_values(by="confidence", ascending=False)
@@ -0,0 +1,138 @@
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from process_mining.process_atoms.models.column_types import (
+    CaseID,
+    Categorical,
+    EventTime,
+    EventType,
+)
+from process_mining.process_atoms.models.event_log import EventLog, EventLogSchemaTypes
+
+
+def build_event_log(traces, case_attributes=None):
+    """
+    Builds an EventLog with one case per trace. Events are activity names or
+    (activity, attributes) tuples, and the events of a case are one hour apart.
+    Case attributes are given as one dict per trace. All attributes are categorical.
+    """
+    event_rows, case_rows = [], []
+    for case, trace in enumerate(traces):
+        for position, event in enumerate(trace):
+            activity, attributes = event if isinstance(event, tuple) else (event, {})
+            event_rows.append(
+                {
+                    "case:concept:name": str(case),
+                    "concept:name": activity,
+                    "time:timestamp": pd.Timestamp("2024-01-01", tz="UTC")
+                    + pd.Timedelta(days=case, hours=position),
+                    **attributes,
+                }
+            )
+        attributes = case_attributes[case] if case_attributes else {}
+        case_rows.append({"case:concept:name": str(case), **attributes})
+    events, cases = pd.DataFrame(event_rows), pd.DataFrame(case_rows)
+    event_types = {
+        "case:concept:name": CaseID,
+        "concept:name": EventType,
+        "time:timestamp": EventTime,
+    }
+    case_types = {"case:concept:name": CaseID}
+    event_types.update(
+        (column, Categorical) for column in events if column not in event_types
+    )
+    case_types.update(
+        (column, Categorical) for column in cases if column not in case_types
+    )
+    schema = EventLogSchemaTypes(cases=case_types, events=event_types)
+    return EventLog(cases, events, schema)
+
+
+def generate_traces(seed, num_traces=40, activities="abcde", max_length=7):
+    """
+    Draws reproducible random traces over `activities`, with repeated variants.
+    """
+    rng = random.Random(seed)
+    variants = [
+        [rng.choice(activities) for _ in range(rng.randint(1, max_length))]
+        for _ in range(max(1, num_traces // 3))
+    ]
+    return [list(rng.choice(variants)) for _ in range(num_traces)]
+
+
+def build_bpmn_json(nodes, flows):
+    """
+    Builds the JSON of a BPMN model from a dict of node ids to (stencil, name) and a
+    list of (source, target) sequence flows.
+    """
+    outgoing = {node: [] for node in nodes}
+    shapes = []
+    for i, (source, target) in enumerate(flows):
+        flow = f"flow_{i}"
+        outgoing[source].append(flow)
+        shapes.append(_shape(flow, "SequenceFlow", "", [target]))
+    shapes += [
+        _shape(node, stencil, name, outgoing[node])
+        for node, (stencil, name) in nodes.items()
+    ]
+    return json.dumps(
+        {
+            "resourceId": "root",
+            "childShapes": shapes,
+            "properties": {},
+            "stencil": {"id": "BPMNDiagram"},
+        }
+    )
+
+
+def _shape(resource_id, stencil, name, outgoing):
+    return {
+        "resourceId": resource_id,
+        "stencil": {"id": stencil},
+        "properties": {"name": name},
+        "outgoing": [{"resourceId": target} for target in outgoing],
+        "childShapes": [],
+    }
+
+
+def xor_model_json():
+    # start -> a -> (b xor c) -> d -> end
+    nodes = {
+        "start": ("StartNoneEvent", ""),
+        "a": ("Task", "a"),
+        "split": ("Exclusive_Databased_Gateway", ""),
+        "b": ("Task", "b"),
+        "c": ("Task", "c"),
+        "join": ("Exclusive_Databased_Gateway", ""),
+        "d": ("Task", "d"),
+        "end": ("EndNoneEvent", ""),
+    }
+    flows = [
+        ("start", "a"),
+        ("a", "split"),
+        ("split", "b"),
+        ("split", "c"),
+        ("b", "join"),
+        ("c", "join"),
+        ("join", "d"),
+        ("d", "end"),
+    ]
+    return build_bpmn_json(nodes, flows)
+
+
+@pytest.fixture
+def make_event_log():
+    return build_event_log
+
+
+@pytest.fixture
+def random_traces():
+    return generate_traces
+
+
+@pytest.fixture
+def xor_model():
+    return xor_model_json()
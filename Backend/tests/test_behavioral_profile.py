@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from process_mining.process_atoms.mine import behavioral_profile
+from process_mining.process_atoms.mine.behavioral_profile import (
+    _get_weak_order_matrix,
+    get_behavioral_profile_as_df,
+)
+
+
+def reference_weak_order_matrix(log, event_classes):
+    # count every pair of events of every case, as the original implementation
+    wom = np.zeros((len(event_classes), len(event_classes)))
+    for case in log:
+        for i in range(len(case) - 1):
+            for j in range(i + 1, len(case)):
+                wom[event_classes.index(case[i]), event_classes.index(case[j])] += 1
+    return wom
+
+
+def reference_relations(wom, event_classes):
+    relations = {}
+    for i, a in enumerate(event_classes):
+        for j, b in enumerate(event_classes):
+            if wom[i, j] and not wom[j, i]:
+                relations[a, b] = "->"
+            elif wom[j, i] and not wom[i, j]:
+                relations[a, b] = "<-"
+            elif wom[i, j] and wom[j, i]:
+                relations[a, b] = "||"
+            else:
+                relations[a, b] = "+"
+    return relations
+
+
+@pytest.fixture(params=range(3))
+def log(request, random_traces):
+    # cases with a single event do not order any events
+    return random_traces(request.param) + [["f"], ["a"]]
+
+
+@pytest.mark.parametrize("max_pairs", [behavioral_profile._MAX_PAIRS, 4, 1])
+def test_weak_order_matrix_matches_counting_every_pair(log, monkeypatch, max_pairs):
+    monkeypatch.setattr(behavioral_profile, "_MAX_PAIRS", max_pairs)
+    wom = _get_weak_order_matrix(log, as_df=True)
+    event_classes = wom.columns.tolist()
+    assert sorted(event_classes) == sorted({e for case in log for e in case})
+    np.testing.assert_array_equal(
+        wom.to_numpy(), reference_weak_order_matrix(log, event_classes)
+    )
+
+
+def test_behavioral_profile_matches_relations_of_weak_order(log):
+    profile = get_behavioral_profile_as_df(log, as_df=True)
+    event_classes = profile.columns.tolist()
+    relations = reference_relations(
+        reference_weak_order_matrix(log, event_classes), event_classes
+    )
+    assert {
+        (a, b): profile.loc[a, b] for a in event_classes for b in event_classes
+    } == relations
+    strict_order, reverse_strict_order, exclusive, interleaving = (
+        get_behavioral_profile_as_df(log)
+    )
+    for pairs, relation in [
+        (strict_order, "->"),
+        (reverse_strict_order, "<-"),
+        (exclusive, "+"),
+        (interleaving, "||"),
+    ]:
+        assert pairs == {pair for pair, r in relations.items() if r == relation}
@@ -0,0 +1,29 @@
+import json
+import warnings
+
+import pytest
+
+from process_mining.process_atoms.mine.conversion.bpmnjsonanalyzer import (
+    compute_finite_paths_of_tasks,
+    parse_model_elements,
+)
+
+
+@pytest.fixture
+def xor_model_elements(xor_model):
+    _, follows, labels = parse_model_elements("m", json.loads(xor_model))
+    tasks = [shape for shape, label in labels.items() if label in {"a", "b", "c", "d"}]
+    return follows, labels, tasks
+
+
+def test_finite_paths_of_tasks(xor_model_elements):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        paths = compute_finite_paths_of_tasks(*xor_model_elements)
+    assert paths == [["ma", "mb", "md"], ["ma", "mc", "md"]]
+
+
+def test_truncated_path_enumeration_warns(xor_model_elements):
+    with pytest.warns(UserWarning, match="incomplete"):
+        paths = compute_finite_paths_of_tasks(*xor_model_elements, max_paths=1)
+    assert paths == [["ma", "mb", "md"]]
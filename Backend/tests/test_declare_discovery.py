@@ -0,0 +1,67 @@
+from itertools import combinations
+
+import pytest
+
+from process_mining.process_atoms.mine.declare.declare import Declare
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    Template,
+    binary_strings,
+    unary_strings,
+)
+from process_mining.process_atoms.mine.declare.functions import (
+    discover_binary_constraints,
+    discover_constraint,
+)
+from process_mining.process_atoms.mine.declare.regexchecker import RegexChecker
+
+XOR_TRACES = [["s", "a", "e"], ["s", "b", "e"]]
+
+
+def test_pair_supports_include_pairs_that_never_co_occur_for_zero_support(
+    make_event_log,
+):
+    d4py = Declare(make_event_log(XOR_TRACES))
+    d4py.compute_frequent_itemsets(min_support=0, len_itemset=2, algorithm="pairs")
+    supports = dict(
+        zip(d4py.frequent_item_sets["itemsets"], d4py.frequent_item_sets["support"])
+    )
+    assert len(supports) == 4 + 6
+    assert supports[frozenset(["a", "b"])] == 0
+    assert supports[frozenset(["s", "a"])] == 0.5
+
+    d4py.compute_frequent_itemsets(min_support=0.1, len_itemset=2, algorithm="pairs")
+    assert frozenset(["a", "b"]) not in set(d4py.frequent_item_sets["itemsets"])
+
+
+@pytest.mark.parametrize(
+    "atom_str", ["Not Co-Existence[a, b] | | |", "Exclusive Choice[a, b] | | |"]
+)
+def test_regex_discovery_mines_exclusive_branches(make_event_log, atom_str):
+    checker = RegexChecker("xor", make_event_log(XOR_TRACES))
+    atoms = checker.run(sorted(binary_strings | unary_strings), min_support=0.0)
+    assert atom_str in {atom.atom_str for atom in atoms}
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("consider_vacuity", [True, False])
+def test_binary_template_scan_matches_discovering_templates_one_by_one(
+    make_event_log, random_traces, seed, consider_vacuity
+):
+    log = make_event_log(random_traces(seed))
+    variant_positions = Declare(log).trace_variant_positions()
+    templates = Template.get_binary_templates()
+    for pair in combinations(log.unique_activities(), 2):
+        expected = {}
+        for template in templates:
+            for activities in (list(pair), list(reversed(pair))):
+                constraint = {
+                    "template": template,
+                    "activities": activities,
+                    "condition": ("", "", ""),
+                }
+                expected |= discover_constraint(log, constraint, consider_vacuity)
+        result = discover_binary_constraints(
+            variant_positions, list(pair), templates, consider_vacuity
+        )
+        # CheckerResult has no equality, its representation holds all counts
+        assert repr(result) == repr(expected), pair
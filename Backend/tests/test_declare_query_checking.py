@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    binary_strings,
+    unary_strings,
+)
+from process_mining.process_atoms.mine.declare.functions import query_candidates
+
+# variants with (a and b), only b, only a, neither
+A_VARIANTS = np.array([True, False, True, False])
+B_VARIANTS = np.array([True, True, False, False])
+
+
+def test_query_candidates_keep_vacuously_satisfied_variants():
+    assert query_candidates("Precedence", A_VARIANTS, B_VARIANTS, True).tolist() == [
+        True,
+        False,
+        True,
+        True,
+    ]
+    assert query_candidates("Response", A_VARIANTS, B_VARIANTS, True).tolist() == [
+        True,
+        True,
+        False,
+        True,
+    ]
+
+
+@pytest.mark.parametrize("template", sorted(binary_strings | unary_strings))
+@pytest.mark.parametrize("consider_vacuity", [True, False])
+@pytest.mark.parametrize("conditions", [("A.x is y", ""), ("", "T.x is y")])
+def test_query_candidates_do_not_prune_conditioned_constraints(
+    template, consider_vacuity, conditions
+):
+    candidates = query_candidates(
+        template, A_VARIANTS, B_VARIANTS, consider_vacuity, *conditions
+    )
+    assert candidates.all()
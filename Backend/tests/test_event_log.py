@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from process_mining.process_atoms.models.column_types import (
+    CaseID,
+    Categorical,
+    EventTime,
+    EventType,
+)
+from process_mining.process_atoms.models.event_log import EventLog, EventLogSchemaTypes
+
+ACTIVITIES = ["a", "b", "c[1]", "d|e"]
+
+
+def random_frames(seed, num_cases=30):
+    # unsorted cases and events, with equal timestamps within cases
+    rng = np.random.default_rng(seed)
+    case_ids = [f"c{i}" for i in rng.permutation(num_cases)]
+    lengths = rng.integers(1, 7, size=num_cases)
+    events = pd.DataFrame(
+        {
+            "case:concept:name": np.repeat(case_ids, lengths),
+            "concept:name": rng.choice(ACTIVITIES, size=lengths.sum()),
+            "time:timestamp": pd.Timestamp("2024-01-01", tz="UTC")
+            + pd.to_timedelta(rng.integers(0, 4, size=lengths.sum()), unit="h"),
+            "org:resource": rng.choice(["r1", "r2"], size=lengths.sum()),
+        }
+    )
+    events = events.iloc[rng.permutation(len(events))].reset_index(drop=True)
+    cases = pd.DataFrame(
+        {"case:concept:name": case_ids, "kind": rng.choice(["x", "y"], num_cases)}
+    )
+    return cases, events
+
+
+def make_log(cases, events):
+    schema = EventLogSchemaTypes(
+        cases={"case:concept:name": CaseID, "kind": Categorical},
+        events={
+            "case:concept:name": CaseID,
+            "concept:name": EventType,
+            "time:timestamp": EventTime,
+            "org:resource": Categorical,
+        },
+    )
+    return EventLog(cases.copy(), events.copy(), schema)
+
+
+def reference_events(cases, events):
+    # events sorted by case ID and time, keeping the input order of equal timestamps,
+    # with sanitized activity labels
+    expected = events.sort_values(
+        ["case:concept:name", "time:timestamp"], kind="stable"
+    ).reset_index(drop=True)
+    expected["concept:name"] = (
+        expected["concept:name"]
+        .str.replace("[", "(")
+        .str.replace("]", ")")
+        .str.replace("|", " ")
+    )
+    positions = {case_id: i for i, case_id in enumerate(cases["case:concept:name"])}
+    case_positions = expected["case:concept:name"].map(positions).to_numpy()
+    return expected, case_positions
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_construction_sorts_and_sanitizes_events(seed):
+    cases, events = random_frames(seed)
+    log = make_log(cases, events)
+    expected, case_positions = reference_events(cases, events)
+    pd.testing.assert_frame_equal(
+        log.events.reset_index(drop=True), expected, check_dtype=False
+    )
+    assert log.events.index.get_level_values("case_id").tolist() == (
+        case_positions.tolist()
+    )
+    assert log.events.index.get_level_values("event_id").tolist() == list(
+        range(len(events))
+    )
+    assert log.cases.index.tolist() == list(range(len(cases)))
+    assert sorted(log.unique_activities()) == sorted(expected["concept:name"].unique())
+    assert log.activity_counts() == expected["concept:name"].value_counts().to_dict()
+
+
+def reference_trace_variants(expected):
+    # grouping of the events by case as in the original implementation, on the ids and
+    # activities of the sorted events
+    cases = expected["case:concept:name"].to_numpy()
+    activities = expected["concept:name"].to_numpy()
+    timestamps = (
+        expected["time:timestamp"].dt.tz_convert(None).to_numpy("datetime64[ns]")
+    )
+    c_unq, c_ind, c_counts = np.unique(cases, return_index=True, return_counts=True)
+    variants, durations, sequences = {}, {}, []
+    for case_id, si, count in zip(c_unq, c_ind, c_counts):
+        ei = si + count
+        acts = tuple(activities[si:ei])
+        sequences.append(acts)
+        variants.setdefault(acts, []).append(case_id)
+        durations.setdefault(acts, []).append(int(timestamps[ei - 1] - timestamps[si]))
+    return variants, durations, sequences
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_variant_index_matches_grouping_events_by_case(seed):
+    cases, events = random_frames(seed)
+    log = make_log(cases, events)
+    expected, _ = reference_events(cases, events)
+    variants, durations, sequences = reference_trace_variants(expected)
+    assert log.trace_variants == variants
+    assert list(log.trace_variants) == list(variants)
+    assert log.trace_variant_durations == durations
+    assert log.activity_sequences() == sequences
+    index = log.variant_index
+    assert index.frequencies.tolist() == [len(ids) for ids in variants.values()]
+    assert [index.variants[v] for v in index.case_variants] == sequences
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_case_index_matches_grouping_events_by_case(seed):
+    cases, events = random_frames(seed)
+    log = make_log(cases, events)
+    expected, _ = reference_events(cases, events)
+    index = log.case_index
+    groups = expected.groupby("case:concept:name", sort=True)
+    assert index.case_ids.tolist() == list(groups.groups)
+    assert index.case_lengths.tolist() == groups.size().tolist()
+    for case, (case_id, case_events) in enumerate(groups):
+        assert index.get_case(case_id) == case
+        assert log.get_case_activities(case_id).tolist() == (
+            case_events["concept:name"].tolist()
+        )
+        positions = np.arange(len(expected))[index.case_slice(case)]
+        assert positions.tolist() == case_events.index.tolist()
+    for activity in log.unique_activities() + ["missing"]:
+        first = [
+            (
+                case_events.index[case_events["concept:name"] == activity][0]
+                if (case_events["concept:name"] == activity).any()
+                else -1
+            )
+            for _, case_events in groups
+        ]
+        assert index.first_occurrences(activity).tolist() == first
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_case_views_match_the_events_of_each_case(seed):
+    cases, events = random_frames(seed)
+    cases = pd.concat(
+        [cases, pd.DataFrame({"case:concept:name": ["empty"], "kind": ["x"]})],
+        ignore_index=True,
+    )
+    log = make_log(cases, events)
+    expected, _ = reference_events(cases, events)
+    views = list(log.iter_cases(event_attributes=["org:resource"]))
+    assert [view.position for view in views] == list(range(len(cases)))
+    for view, case in zip(views, cases.itertuples(index=False)):
+        case_events = expected[expected["case:concept:name"] == case[0]]
+        assert view.attributes == {"case:concept:name": case[0], "kind": case[1]}
+        assert view.get_activity_sequence() == case_events["concept:name"].tolist()
+        assert (
+            view.timestamps.tolist()
+            == (
+                case_events["time:timestamp"]
+                .dt.tz_convert(None)
+                .to_numpy("datetime64[ns]")
+            ).tolist()
+        )
+        assert view.event_attributes["org:resource"].tolist() == (
+            case_events["org:resource"].tolist()
+        )
+    assert len(views[-1]) == 0
@@ -0,0 +1,24 @@
+import pytest
+
+from process_mining.process_atoms.mine.modelminer import ModelMiner
+from process_mining.process_atoms.models import petri
+
+
+def test_complete_playout_is_reported(xor_model):
+    model_miner = ModelMiner("xor", xor_model)
+    variant_log = model_miner.variant_generator.extract_variants()
+    assert model_miner.variant_generator.playout_complete
+    assert set(variant_log.trace_variants) == {("a", "b", "d"), ("a", "c", "d")}
+
+
+def test_incomplete_playout_warns(xor_model, monkeypatch):
+    net_playout = petri.net_playout
+
+    def truncated_playout(net, initial_marking, final_marking):
+        return net_playout(net, initial_marking, final_marking, max_states=2)
+
+    monkeypatch.setattr(petri, "net_playout", truncated_playout)
+    model_miner = ModelMiner("xor", xor_model)
+    with pytest.warns(UserWarning, match="incomplete"):
+        model_miner.mine_with_petri(["Existence"])
+    assert model_miner.variant_generator.playout_complete is False
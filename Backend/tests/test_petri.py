@@ -0,0 +1,112 @@
+from collections import Counter
+
+import pytest
+
+from process_mining.process_atoms.models import petri
+from process_mining.process_atoms.models.petri import (
+    Marking,
+    PetriNet,
+    Place,
+    Transition,
+)
+
+
+def build_net(arcs):
+    # arcs are (place, transition, weight) or (transition, place, weight), transitions
+    # are named "t<label>" and silent transitions start with "tau"
+    net = PetriNet("test")
+    elements = {}
+
+    def element(name):
+        if name not in elements:
+            if name.startswith("tau"):
+                elements[name] = Transition(name)
+                net.transitions.add(elements[name])
+            elif name.startswith("t"):
+                elements[name] = Transition(name, name[1:])
+                net.transitions.add(elements[name])
+            else:
+                elements[name] = Place(name)
+                net.places.add(elements[name])
+        return elements[name]
+
+    for source, target, weight in arcs:
+        petri.add_arc_from_to(element(source), element(target), net, weight)
+    return net, Marking({elements["start"]: 1}), Marking({elements["end"]: 1})
+
+
+def reference_variants(net, initial_marking, final_marking, max_loop):
+    # token game over every interleaving, as the original net_variants without time-out
+    active = {(initial_marking, (), ())}
+    variants = set()
+    while active:
+        marking, trace, fired = active.pop()
+        for transition in petri.get_enabled_transitions(net, marking):
+            if Counter(fired)[transition.name] >= max_loop:
+                continue
+            next_marking = petri.execute(transition, net, marking)
+            next_trace = trace
+            if transition.label is not None:
+                next_trace += (transition.label,)
+            if next_marking == final_marking:
+                variants.add(next_trace)
+            else:
+                active.add((next_marking, next_trace, fired + (transition.name,)))
+    return variants
+
+
+NETS = {
+    "xor": [
+        ("start", "ta", 1),
+        ("ta", "p1", 1),
+        ("p1", "tb", 1),
+        ("p1", "tc", 1),
+        ("tb", "p2", 1),
+        ("tc", "p2", 1),
+        ("p2", "td", 1),
+        ("td", "end", 1),
+    ],
+    "parallel": [
+        ("start", "tau_split", 1),
+        ("tau_split", "p1", 1),
+        ("tau_split", "p2", 1),
+        ("p1", "ta", 1),
+        ("p2", "tb", 1),
+        ("ta", "p3", 1),
+        ("tb", "p4", 1),
+        ("p3", "tau_join", 1),
+        ("p4", "tau_join", 1),
+        ("tau_join", "p5", 1),
+        ("p5", "tc", 1),
+        ("tc", "end", 1),
+    ],
+    "loop": [
+        ("start", "ta", 1),
+        ("ta", "p1", 1),
+        ("p1", "tb", 1),
+        ("tb", "p2", 1),
+        ("p2", "tau_redo", 1),
+        ("tau_redo", "p1", 1),
+        ("p2", "tc", 1),
+        ("tc", "end", 1),
+    ],
+    "weighted": [
+        ("start", "ta", 1),
+        ("ta", "p1", 2),
+        ("p1", "tb", 1),
+        ("tb", "p2", 1),
+        ("p2", "tc", 2),
+        ("tc", "end", 1),
+    ],
+}
+
+
+@pytest.mark.parametrize("name", sorted(NETS))
+@pytest.mark.parametrize("max_loop", [1, 2, 3])
+def test_playout_matches_token_game_over_every_interleaving(name, max_loop):
+    net, initial_marking, final_marking = build_net(NETS[name])
+    expected = reference_variants(net, initial_marking, final_marking, max_loop)
+    playout = petri.net_playout(net, initial_marking, final_marking, max_loop)
+    assert playout.complete
+    assert playout.variants == expected
+    assert petri.net_variants(net, initial_marking, final_marking, max_loop) == expected
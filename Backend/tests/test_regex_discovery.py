@@ -0,0 +1,92 @@
+from itertools import combinations, permutations
+
+import pytest
+
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    binary_strings,
+    unary_strings,
+)
+from process_mining.process_atoms.mine.declare.regexchecker import (
+    RegexChecker,
+    is_activated,
+)
+
+
+def reference_supports(checker, considered_templates, consider_vacuity, min_support):
+    # support and confidence of every atom, checking the regex on every variant
+    activity_map = checker._map_activities_to_letters(checker.log.unique_activities())
+    variant_frame = checker.create_variant_frame_from_log(activity_map)
+    variants = list(
+        zip(variant_frame["enc_variant_string"], variant_frame["variant_frequency"])
+    )
+    num_traces = len(checker.log)
+    supports = {}
+    for template in considered_templates:
+        if template in unary_strings:
+            for activity, a in activity_map.items():
+                satisfactions = sum(
+                    frequency
+                    for string, frequency in variants
+                    if checker.check_unary_regex(template, a, 1, 1, string)
+                )
+                activations = sum(
+                    frequency
+                    for string, frequency in variants
+                    if is_activated(template, a, None, string)
+                )
+                if satisfactions and satisfactions / num_traces >= min_support:
+                    supports[f"{template}1[{activity}] | |"] = (
+                        satisfactions / num_traces,
+                        satisfactions / activations if activations else 0,
+                    )
+            continue
+        for (first, a), (second, b) in permutations(activity_map.items(), 2):
+            satisfactions = satisfactions_when_activated = activations = 0
+            for string, frequency in variants:
+                activated = is_activated(template, a, b, string)
+                satisfied = checker.check_binary_regex(template, a, b, string)
+                activations += frequency * activated
+                satisfactions_when_activated += frequency * (satisfied and activated)
+                satisfactions += frequency * (
+                    satisfied if consider_vacuity else satisfied and activated
+                )
+            if activations == 0 or satisfactions == 0:
+                continue
+            if satisfactions / num_traces >= min_support:
+                supports[f"{template}[{first}, {second}] | | |"] = (
+                    satisfactions / num_traces,
+                    satisfactions_when_activated / activations,
+                )
+    return supports
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("consider_vacuity", [True, False])
+@pytest.mark.parametrize("min_support", [0.0, 0.3])
+def test_discovery_with_activity_bitsets_matches_checking_every_variant(
+    make_event_log, random_traces, seed, consider_vacuity, min_support
+):
+    checker = RegexChecker("random", make_event_log(random_traces(seed)))
+    templates = sorted(binary_strings | unary_strings)
+    activities = checker.log.unique_activities()
+    activity_map = checker._map_activities_to_letters(activities)
+    variant_frame = checker.create_variant_frame_from_log(activity_map)
+    activity_bitsets = checker.create_activity_bitsets(variant_frame, activity_map)
+    atoms = []
+    for item_set in [[a] for a in activities] + list(combinations(activities, 2)):
+        atoms += checker.discover_item_set(
+            list(item_set),
+            templates,
+            variant_frame,
+            activity_map,
+            activity_bitsets,
+            consider_vacuity,
+            min_support,
+        )
+    supports = {
+        atom.atom_str: (atom.support, atom.attributes["confidence"]) for atom in atoms
+    }
+    expected = reference_supports(checker, templates, consider_vacuity, min_support)
+    assert supports.keys() == expected.keys()
+    for atom_str, (support, confidence) in expected.items():
+        assert supports[atom_str] == pytest.approx((support, confidence)), atom_str
@@ -0,0 +1,45 @@
+from itertools import product
+
+import pytest
+
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    binary_strings,
+    unary_strings,
+)
+from process_mining.process_atoms.mine.declare.regexchecker import (
+    RegexChecker,
+    template_automaton,
+)
+
+
+def automaton_accepts(template, cardinality, string):
+    transitions, accepting = template_automaton(template, cardinality)
+    state = 0
+    for symbol in string:
+        state = transitions[state][symbol]
+    return accepting[state]
+
+
+def strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for string in product(symbols, repeat=length):
+            yield "".join(string)
+
+
+@pytest.mark.parametrize("template", sorted(unary_strings))
+@pytest.mark.parametrize("cardinality", [1, 2, 5, 6])
+def test_unary_automata_match_their_regex(template, cardinality):
+    for string in strings("ac", cardinality + 3):
+        assert automaton_accepts(
+            template, cardinality, string
+        ) == RegexChecker.check_unary_regex(
+            template, "a", cardinality, cardinality, string
+        ), string
+
+
+@pytest.mark.parametrize("template", sorted(binary_strings))
+def test_binary_automata_match_their_regex(template):
+    for string in strings("abc", 6):
+        assert automaton_accepts(template, 1, string) == (
+            RegexChecker.check_binary_regex(template, "a", "b", string)
+        ), string
@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from process_mining.process_atoms.mine.declare.enums.mp_constants import (
+    Template,
+    directed_strings,
+    subsumption_hierarchy,
+)
+from process_mining.process_atoms.models.processatom import (
+    ProcessAtom,
+    nat_lang_templates,
+)
+from process_mining.process_atoms.utils import (
+    aggregate_process_atoms,
+    atoms_to_df,
+    reduce_redundancies,
+)
+
+TEMPLATES = sorted(nat_lang_templates)
+
+
+def make_atom(atom_id, template, operands, confidence, support=1.0, providers=()):
+    return ProcessAtom(
+        id=atom_id,
+        atom_type=template,
+        atom_str=f"{template}[{', '.join(operands)}]",
+        signal_query="",
+        arity=len(operands),
+        cardinality=1,
+        level="",
+        operands=operands,
+        support=support,
+        provision_type="",
+        providers=list(providers),
+        activation_conditions=[],
+        target_conditions=[],
+        attributes={"confidence": confidence},
+    )
+
+
+def random_atoms(seed):
+    # atoms over few activities, so that many atoms share their operands, with ties
+    # in confidence
+    rng = random.Random(seed)
+    activities = ["a", "b", "c", "d"]
+    atoms = []
+    for i in range(rng.randint(20, 80)):
+        operands = rng.sample(activities, 2 if rng.random() < 0.8 else 1)
+        atoms.append(
+            make_atom(
+                f"id{i}", rng.choice(TEMPLATES), operands, rng.choice([0.5, 0.8, 1.0])
+            )
+        )
+    atoms[0] = atoms[0].model_copy(update={"atom_str": atoms[0].atom_str + " Optional"})
+    return atoms
+
+
+def reference_reduce_redundancies(atoms):
+    # the original implementation, grouping the atoms data frame (sorted stably by
+    # confidence) for every rule
+    atoms_df = atoms_to_df(atoms, sort=False).sort_values(
+        by="confidence", ascending=False, kind="stable"
+    )
+    atoms_df = atoms_df.drop_duplicates(
+        subset=["op_0", "op_1", "atom_type", "cardinality"]
+    )
+    atoms_df = atoms_df[
+        ~atoms_df["atom_str"].str.contains("Optional")
+        & ~atoms_df["atom_str"].str.contains("This BPMN diagram")
+    ]
+    atoms_df["subsumption_hierarchy"] = atoms_df["atom_type"].apply(
+        lambda x: subsumption_hierarchy.get(x, 1)
+    )
+    atoms_df["op_set"] = atoms_df.apply(
+        lambda x: frozenset([x["op_0"], x["op_1"]]), axis=1
+    )
+    retain = []
+    for (atom_type, _), group_df in atoms_df.groupby(["atom_type", "op_set"]):
+        if atom_type not in directed_strings:
+            retain.append(group_df.iloc[0]["id"])
+
+    def strongest(constraints, group_df):
+        if len(constraints) > 1:
+            constraints = constraints.sort_values(
+                by="subsumption_hierarchy", kind="stable"
+            )
+            return [constraints.iloc[0]["id"]]
+        return list(group_df["id"].values)
+
+    for _, group_df in atoms_df.groupby(["op_0", "op_1"]):
+        types = group_df["atom_type"]
+        if Template.SUCCESSION.templ_str in types.values:
+            retain += strongest(
+                group_df[
+                    ~types.str.contains("Not")
+                    & (
+                        types.str.contains("Succession")
+                        | types.str.contains("Co-Existence")
+                    )
+                ],
+                group_df,
+            )
+        else:
+            retain += strongest(
+                group_df[
+                    types.str.contains("Precedence") | types.str.contains("Responded")
+                ],
+                group_df,
+            )
+            retain += strongest(group_df[types.str.contains("Response")], group_df)
+    return list(atoms_df[atoms_df["id"].isin(set(retain))]["id"])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_reduce_redundancies_matches_grouping_atoms_per_rule(seed):
+    atoms = random_atoms(seed)
+    assert [atom.id for atom in reduce_redundancies(atoms)] == (
+        reference_reduce_redundancies(atoms)
+    )
+
+
+def test_aggregate_merges_duplicates_that_are_not_adjacent():
+    first = make_atom("1", "Response", ["a", "b"], 1.0, 0.5, ["p1"])
+    other = make_atom("2", "Precedence", ["c", "d"], 1.0, 0.5, ["p1"])
+    duplicate = make_atom("3", "Response", ["a", "b"], 1.0, 0.25, ["p2", "p1"])
+    aggregated = aggregate_process_atoms([first, other, duplicate])
+    assert [atom.id for atom in aggregated] == ["1", "2"]
+    assert aggregated[0].support == 0.75
+    assert aggregated[0].providers == ["p1", "p2"]
+    assert aggregate_process_atoms([]) == []